@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_ckeditor_5',
 
     'rb_books',
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'rb_books.profiling.QueryProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -118,6 +120,39 @@ if DEBUG:
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# Cover files deletion, see rb_books.files
+FILE_DELETION_WORKER = True
+FILE_DELETION_BATCH_SIZE = 100
+FILE_DELETION_MAX_ATTEMPTS = 5
+FILE_DELETION_RETRY_DELAY = 60
+
+# Cover renditions widths, see rb_books.thumbnails
+THUMBNAIL_WIDTHS = [100, 300, 600]
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The local memory cache is private to each process: when several processes serve the site, use a shared backend,
+# e.g. 'django.core.cache.backends.filebased.FileBasedCache' with a directory as LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rb_books',
+    }
+}
+
+# Books and series object cache, see rb_books.object_cache
+OBJECT_CACHE_ALIAS = 'default'
+OBJECT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Reviews feeds, see rb_books.feeds
+REVIEWS_FEED_SIZE = 20
+REVIEWS_FEED_LINK = 'https://lesvictimesdekelith.blogspot.com/'
+
+# SQL queries profiler, see rb_books.profiling
+QUERY_PROFILER_ENABLED = False
+QUERY_PROFILER_ALLOW_HEADER = DEBUG
+QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = 5
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
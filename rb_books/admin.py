@@ -1,6 +1,24 @@
-from django.contrib import admin
-
+import io
+from pathlib import Path
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.postgres.aggregates import StringAgg
+from django.core.exceptions import ValidationError
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .imports import IMPORT_FORMATS, BookImporter, BookImportError
 from .models import Author, Editor, Audience, Genre, Rating, Series, Book, Category, Illustrator
+from .propagation import PROPAGATED_RELATIONS, inherit_series_fields, inherit_series_relations, propagate_to_books
+from .search import search_documents
+from .services import bulk_update_books, mark_books_incoming, publish_books
+from .streaming_export import streaming_export_response
 
 
 class CustomModelAdmin(admin.ModelAdmin):
@@ -10,6 +28,25 @@ class CustomModelAdmin(admin.ModelAdmin):
     exclude = ['slug']
 
 
+class SearchDocumentModelAdmin(CustomModelAdmin):
+    """
+    A model admin searching its objects through their indexed search document (see `rb_books.search`), instead of
+    `icontains` lookups on the joined `search_fields`. The `search_fields` are only used to display the search box.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Returns the objects matching the search term, sorted by descending rank, unless a column is sorted: the
+        changelist orders its queryset before searching it, so the ordering is decided here.
+        """
+        if not search_term:
+            return queryset, False
+        results = search_documents(queryset, search_term)
+        if ORDER_VAR in request.GET:
+            return results.order_by(*queryset.query.order_by), False
+        return results.order_by('-rank', '-pk'), False
+
+
 class AuthorAdmin(CustomModelAdmin):
     search_fields = ['first_name', 'last_name']
 
@@ -29,6 +66,15 @@ class AudienceAdmin(CustomModelAdmin):
 
 class GenreAdmin(CustomModelAdmin):
     list_display = ['label', 'example_book']
+    list_select_related = ['example_book']
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """
+        Only loads the stored full title of the books proposed as example, which is all their label needs.
+        """
+        if db_field.name == 'example_book':
+            kwargs['queryset'] = Book.objects.only('pk', 'full_title').order_by('full_title')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 class CategoryAdmin(CustomModelAdmin):
@@ -40,10 +86,10 @@ class RatingAdmin(CustomModelAdmin):
     list_display_links = ['label', 'rating']
 
 
-class SeriesAdmin(CustomModelAdmin):
+class SeriesAdmin(SearchDocumentModelAdmin):
     list_display = [
-        'img_preview', 'title', 'illustrator', 'editor', 'audience', 'volumes_count',
-        'complete',
+        'img_preview', 'title', 'illustrator', 'editor', 'audience', 'volumes_count', 'books_count', 'published_count',
+        'average_rating', 'last_published_at', 'complete',
     ]
     list_display_links = [
         'img_preview', 'title',
@@ -51,6 +97,9 @@ class SeriesAdmin(CustomModelAdmin):
     list_editable = [
         'complete',
     ]
+    list_select_related = [
+        'illustrator', 'editor', 'audience',
+    ]
 
     fieldsets = [
         (
@@ -64,22 +113,67 @@ class SeriesAdmin(CustomModelAdmin):
             {
                 'fields': ['audience', 'category', 'genres', 'summary', 'volumes_count', 'complete',]
             }
+        ),
+        (
+            'Statistiques',
+            {
+                'fields': [
+                    'books_count', 'published_count', 'current_reading_count', 'incoming_reading_count',
+                    'average_rating', 'last_published_at', 'next_unread_volume',
+                ]
+            }
         )
     ]
     readonly_fields = [
-        'img_preview',
+        'img_preview', 'books_count', 'published_count', 'current_reading_count', 'incoming_reading_count',
+        'average_rating', 'last_published_at', 'next_unread_volume',
     ]
 
     list_filter = [
         'audience', 'complete',
     ]
     search_fields = [
-        'title', 'author__first_name', 'author__last_name', 'illustrator__first_name', 'illustrator__last_name',
-        'editor__name',
+        'title',
     ]
+    actions = [
+        'propagate_to_books',
+    ]
+
+    @admin.action(description='Propager les attributs aux livres')
+    def propagate_to_books(self, request, queryset):
+        """
+        Fills the empty illustrator, editor, audience, category, authors and genres of the books of the selected series
+        with those of their series, with a few set-based queries (see `rb_books.propagation.propagate_to_books`).
+        """
+        counts = propagate_to_books(queryset)
+        self.message_user(request, 'Livres mis à jour : ' + ', '.join(
+            f'{Book._meta.get_field(name).verbose_name} {count}' for name, count in counts.items()
+        ))
+
+
+class BookActionForm(ActionForm):
+    """
+    The form of the actions of the `Book` changelist, with the rating and the editor applied by the
+    `attribuer une note` and `changer d'éditeur` actions.
+    """
+    rating = forms.ModelChoiceField(Rating.objects.all(), required=False, label='Note')
+    editor = forms.ModelChoiceField(Editor.objects.all(), required=False, label='Éditeur')
 
 
-class BookAdmin(CustomModelAdmin):
+class ImportBooksForm(forms.Form):
+    """
+    The form of the import view of the `Book` admin, see `rb_books.imports`.
+    """
+    file = forms.FileField(label='Fichier', help_text='Export CSV ou JSONL, par exemple de Livraddict.')
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if Path(file.name).suffix.lstrip('.').lower() not in IMPORT_FORMATS:
+            raise ValidationError('Le fichier doit être au format CSV ou JSONL.')
+        return file
+
+
+class BookAdmin(SearchDocumentModelAdmin):
     """
     The `BookAdmin` class is a custom model admin class that is used to customize the administration interface for the
      `Book` model in the application.
@@ -89,11 +183,18 @@ class BookAdmin(CustomModelAdmin):
         interface.
         - `list_editable`: A tuple of fields that can be edited directly in the list view of the administration
         interface.
+        - `list_select_related`: The foreign keys joined by the list view query, so that a page costs a constant
+        number of queries.
         - `fieldsets`: A list of fieldsets to be displayed in the create/update forms of the administration interface.
         - `readonly_fields`: A list of fields that are readonly in the administration interface.
-        - `search_fields`: A list of fields that can be searched in the administration interface.
+        - `search_fields`: A list of fields that can be searched in the administration interface. The search itself
+        runs on the search document of the books, which also contains their authors, illustrator and editor.
         - `list_filter`: A list of fields that can be used for filtering in the administration interface.
-    Note: This class extends the `CustomModelAdmin` class.
+        - `actions`: The bulk actions of the list view. Each one changes the selected books with a single UPDATE
+        following the reading state rules (see `rb_books.services`), instead of saving them one by one, or stream
+        their export (see `rb_books.streaming_export`).
+        - `change_list_template`: The list view template, which links to the import view (see `import_view()`).
+    Note: This class extends the `SearchDocumentModelAdmin` class.
     """
     # List parameters
     list_display = [
@@ -107,6 +208,9 @@ class BookAdmin(CustomModelAdmin):
     list_editable = (
         'show_series_title', 'show_volume', 'incoming_reading', 'current_reading', 'published',
     )
+    list_select_related = [
+        'series', 'volume', 'illustrator', 'editor', 'audience', 'rating',
+    ]
 
     # Create/Update forms
     fieldsets = [
@@ -140,18 +244,121 @@ class BookAdmin(CustomModelAdmin):
 
     # Search/Filter
     search_fields = [
-        'title', 'volume__label', 'author__first_name', 'author__last_name', 'illustrator__first_name',
-        'illustrator__last_name', 'editor__name',
+        'full_title',
     ]
     list_filter = [
         'audience', 'rating', 'incoming_reading', 'current_reading', 'published', 'published_at',
     ]
 
+    # Actions
+    action_form = BookActionForm
+    actions = [
+        'publish', 'mark_incoming', 'set_rating', 'set_editor', 'export_csv', 'export_jsonl',
+    ]
+
+    change_list_template = 'admin/rb_books/book/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='rb_books_book_import'),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        """
+        Imports the books of an uploaded CSV or JSONL export, streamed from the uploaded file in batches (see
+        `rb_books.imports.BookImporter`), then redirects to the list view.
+        """
+        if not self.has_add_permission(request):
+            return redirect('admin:rb_books_book_changelist')
+        form = ImportBooksForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                counts = BookImporter().import_file(
+                    io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''),
+                    Path(upload.name).suffix.lstrip('.').lower(),
+                )
+            except BookImportError as error:
+                self.message_user(request, str(error), messages.ERROR)
+            else:
+                self.message_user(
+                    request,
+                    f"{counts['imported']} livre(s) importé(s), {counts['duplicates']} doublon(s) ignoré(s), "
+                    f"{counts['untitled']} enregistrement(s) sans titre, {counts['unmatched']} note(s) sans "
+                    f"correspondance.",
+                )
+                return redirect('admin:rb_books_book_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Importer des livres',
+            'form': form,
+            'opts': self.model._meta,
+        }
+        return TemplateResponse(request, 'admin/rb_books/book/import.html', context)
+
+    def get_action_value(self, request, field):
+        """
+        Returns the object chosen in a field of the `BookActionForm`, or None with an error message if it is missing.
+        """
+        try:
+            value = self.action_form.base_fields[field].clean(request.POST.get(field))
+        except ValidationError:
+            value = None
+        if value is None:
+            label = self.action_form.base_fields[field].label
+            self.message_user(request, f'Choisissez une valeur pour le champ « {label} ».', messages.ERROR)
+        return value
+
+    @admin.action(description='Publier')
+    def publish(self, request, queryset):
+        self.message_user(request, f'{len(publish_books(queryset))} livre(s) publié(s).')
+
+    @admin.action(description='Marquer à lire')
+    def mark_incoming(self, request, queryset):
+        self.message_user(request, f'{len(mark_books_incoming(queryset))} livre(s) ajouté(s) aux lectures à venir.')
+
+    @admin.action(description='Attribuer une note')
+    def set_rating(self, request, queryset):
+        rating = self.get_action_value(request, 'rating')
+        if rating is not None:
+            count = len(bulk_update_books(queryset.exclude(rating=rating), rating=rating))
+            self.message_user(request, f'{count} livre(s) noté(s) « {rating} ».')
+
+    @admin.action(description="Changer d'éditeur")
+    def set_editor(self, request, queryset):
+        editor = self.get_action_value(request, 'editor')
+        if editor is not None:
+            count = len(bulk_update_books(queryset.exclude(editor=editor), editor=editor))
+            self.message_user(request, f'{count} livre(s) édité(s) par {editor}.')
+
+    @admin.action(description='Exporter en CSV')
+    def export_csv(self, request, queryset):
+        return streaming_export_response(request, Book.objects.filter(pk__in=queryset.values('pk')), 'csv')
+
+    @admin.action(description='Exporter en JSONL')
+    def export_jsonl(self, request, queryset):
+        return streaming_export_response(request, Book.objects.filter(pk__in=queryset.values('pk')), 'jsonl')
+
+    def get_queryset(self, request):
+        """
+        Annotates the books with the names of their authors, aggregated by a subquery, so that the list view does not
+        query the authors of every row.
+        """
+        authors_names = Book.author.through.objects.filter(book=OuterRef('pk')).values('book').annotate(
+            names=StringAgg(
+                Concat('author__first_name', Value(' '), 'author__last_name'), delimiter=', ', ordering='id'
+            )
+        ).values('names')
+        return super().get_queryset(request).annotate(authors_names=Subquery(authors_names))
+
     @admin.display(description='Auteur(s)')
     def get_authors(self, obj):
+        if hasattr(obj, 'authors_names'):
+            return obj.authors_names
         return ', '.join([author.full_name for author in obj.author.all()])
 
-    get_authors.admin_order_field = 'author__last_name'
+    get_authors.admin_order_field = 'authors_names'
 
     @admin.display(description='Note')
     def get_rating(self, obj):
@@ -163,25 +370,20 @@ class BookAdmin(CustomModelAdmin):
         if form.instance.belongs_to_series:
             if form.instance.title_is_empty:
                 form.instance.title = form.instance.series.title
-            if not form.instance.illustrator:
-                form.instance.illustrator = form.instance.series.illustrator
-            if not form.instance.editor:
-                form.instance.editor = form.instance.series.editor
-            if not form.instance.audience:
-                form.instance.audience = form.instance.series.audience
-            if not form.instance.category:
-                form.instance.category = form.instance.series.category
+            inherit_series_fields(form.instance)
         super().save_model(request, obj, form, change)
 
     def save_related(self, request, form, formsets, change):
+        """
+        Saves the many-to-many relations of the book, then gives a book of a series the authors and genres of its
+        series when they were left empty, with a single insert per relation. The emptiness is read from the cleaned
+        data of the form, already evaluated by the save of the relations, so that it costs no query.
+        """
         super().save_related(request, form, formsets, change)
         if form.instance.belongs_to_series:
-            if not form.instance.author.exists():
-                for author in form.instance.series.author.all():
-                    form.instance.author.add(author)
-            if not form.instance.genres.exists():
-                for genre in form.instance.series.genres.all():
-                    form.instance.genres.add(genre)
+            inherit_series_relations(
+                form.instance, [relation for relation in PROPAGATED_RELATIONS if not form.cleaned_data.get(relation)]
+            )
 
 
 admin.site.register(Author, AuthorAdmin)
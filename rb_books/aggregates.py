@@ -0,0 +1,196 @@
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Book, Rating, Series
+
+
+BOOK_STATE_FIELDS = [
+    'series_id', 'published', 'current_reading', 'incoming_reading', 'rating_id', 'published_at', 'volume_id',
+]
+COUNTER_FILTERS = {
+    'books_count': Q(),
+    'published_count': Q(published=True),
+    'current_reading_count': Q(current_reading=True),
+    'incoming_reading_count': Q(incoming_reading=True),
+    'ratings_count': Q(rating__isnull=False),
+}
+SERIES_AGGREGATE_FIELDS = [
+    *COUNTER_FILTERS, 'ratings_sum', 'average_rating', 'last_published_at', 'next_unread_volume',
+]
+
+
+def _books_subquery(book_model, aggregate):
+    """
+    Returns the aggregate of the books of the outer series, as a correlated subquery.
+    """
+    return Subquery(
+        book_model.objects.filter(series=OuterRef('pk')).order_by().values('series').annotate(
+            value=aggregate
+        ).values('value')
+    )
+
+
+def last_published_at_expression(book_model=Book):
+    return Subquery(
+        book_model.objects.filter(
+            series=OuterRef('pk'), published=True, published_at__isnull=False
+        ).order_by('-published_at').values('published_at')[:1]
+    )
+
+
+def next_unread_volume_expression(book_model=Book):
+    return Subquery(
+        book_model.objects.filter(
+            series=OuterRef('pk'), published=False, volume__isnull=False
+        ).order_by('volume__index', 'volume_id').values('volume_id')[:1]
+    )
+
+
+def series_aggregate_expressions(book_model=Book, fields=None) -> dict:
+    """
+    Returns the expressions computing the aggregate columns of a series from its books, to be given to
+    `QuerySet.update()`.
+    Parameters:
+    - book_model: The `Book` model class, which may be the historical model of a migration.
+    - fields: The aggregate columns to compute, all of them by default.
+    Returns:
+    - dict: The expression of each column.
+    """
+    expressions = {
+        name: Coalesce(_books_subquery(book_model, Count('pk', filter=condition)), 0)
+        for name, condition in COUNTER_FILTERS.items()
+    }
+    expressions.update({
+        'ratings_sum': Coalesce(_books_subquery(book_model, Sum('rating__rating')), 0),
+        'average_rating': _books_subquery(book_model, Avg('rating__rating', output_field=FloatField())),
+        'last_published_at': last_published_at_expression(book_model),
+        'next_unread_volume': next_unread_volume_expression(book_model),
+    })
+    return {name: expressions[name] for name in fields or SERIES_AGGREGATE_FIELDS}
+
+
+def rebuild_series_aggregates(queryset=None, fields=None) -> int:
+    """
+    Recomputes the aggregate columns of series from their books with a single UPDATE, e.g. after books were changed
+    by queryset updates or bulk inserts, which send no signal.
+    Parameters:
+    - queryset: The queryset of the series to rebuild, all of them by default.
+    - fields: The aggregate columns to rebuild, all of them by default.
+    Returns:
+    - int: The number of series updated.
+    """
+    if queryset is None:
+        queryset = Series.objects.all()
+    return queryset.update(**series_aggregate_expressions(Book, fields), modified_at=timezone.now())
+
+
+def get_book_state(book, initial=False) -> dict:
+    """
+    Returns the values of a book the aggregates of its series depend on.
+    Parameters:
+    - book: The `Book` instance.
+    - initial: Whether to return the values the book had when it was loaded or last saved, rather than its current
+    values, see `rb_books.models.SlugifiedModel.get_initial_value()`.
+    Returns:
+    - dict: The values, by attname.
+    """
+    return {
+        field: book.get_initial_value(field) if initial and book.has_changed(field) else getattr(book, field)
+        for field in BOOK_STATE_FIELDS
+    }
+
+
+def get_counters(state) -> dict:
+    """
+    Returns the contribution of a book to the counters of its series.
+    """
+    if state is None:
+        return dict.fromkeys(COUNTER_FILTERS, 0)
+    return {
+        'books_count': 1,
+        'published_count': int(state['published']),
+        'current_reading_count': int(state['current_reading']),
+        'incoming_reading_count': int(state['incoming_reading']),
+        'ratings_count': int(state['rating_id'] is not None),
+    }
+
+
+def _rating_value(state):
+    if state is None or state['rating_id'] is None:
+        return Value(0)
+    return Coalesce(Subquery(Rating.objects.filter(pk=state['rating_id']).values('rating')[:1]), 0)
+
+
+def _get_delta_changes(before, after) -> dict:
+    """
+    Returns the `QuerySet.update()` arguments moving the aggregates of a series from the contribution of a book in
+    state `before` to its contribution in state `after`, None meaning out of the series. The counters and the sum of
+    the ratings are shifted by their delta, while the last publication date and the next unread volume are only
+    computed again when the change can move them.
+    """
+    changes = {}
+    old, new = get_counters(before), get_counters(after)
+    for name in COUNTER_FILTERS:
+        if new[name] != old[name]:
+            changes[name] = F(name) + (new[name] - old[name])
+
+    old_rating = before['rating_id'] if before else None
+    new_rating = after['rating_id'] if after else None
+    if old_rating != new_rating:
+        ratings_sum = F('ratings_sum') + _rating_value(after) - _rating_value(before)
+        ratings_count = F('ratings_count') + (new['ratings_count'] - old['ratings_count'])
+        changes['ratings_sum'] = ratings_sum
+        changes['average_rating'] = Cast(ratings_sum, FloatField()) / NullIf(ratings_count, 0)
+
+    def get(state, *fields):
+        return tuple(state[field] for field in fields) if state else None
+
+    if get(before, 'published', 'published_at') != get(after, 'published', 'published_at'):
+        changes['last_published_at'] = last_published_at_expression()
+    if get(before, 'published', 'volume_id') != get(after, 'published', 'volume_id'):
+        changes['next_unread_volume'] = next_unread_volume_expression()
+    return changes
+
+
+def update_series_aggregates(before, after) -> list:
+    """
+    Applies the change of a book to the aggregates of its series, with a single delta UPDATE per series involved: the
+    series it left and the series it joined, or its series.
+    Parameters:
+    - before: The state of the book before the change (see `get_book_state()`), or None if it has just been created.
+    - after: The state of the book after the change, or None if it has been deleted.
+    Returns:
+    - list: The primary keys of the series updated.
+    Note: The subqueries of the UPDATE read the books as the current transaction sees them, so the change must already
+    have been written, e.g. from a `post_save` or `post_delete` receiver.
+    """
+    updated = []
+    series_ids = {state['series_id'] for state in [before, after] if state and state['series_id'] is not None}
+    for series_id in sorted(series_ids):
+        changes = _get_delta_changes(
+            before if before and before['series_id'] == series_id else None,
+            after if after and after['series_id'] == series_id else None,
+        )
+        if changes and Series.objects.filter(pk=series_id).update(**changes, modified_at=timezone.now()):
+            updated.append(series_id)
+    return updated
+
+
+def release_series_current_reading(books) -> list:
+    """
+    Decrements the `current_reading_count` of the series of books about to be released from the current reading by
+    `rb_books.services.release_current_reading()`, whose UPDATE sends no signal.
+    Parameters:
+    - books: The queryset of the books about to be released.
+    Returns:
+    - list: The primary keys of the series updated.
+    Note: The partial unique index `unique_current_reading` guarantees that at most one book is released, so that a
+    series is never decremented twice.
+    """
+    series_ids = list(books.filter(series__isnull=False).values_list('series_id', flat=True))
+    if series_ids:
+        Series.objects.filter(pk__in=series_ids).update(
+            current_reading_count=F('current_reading_count') - 1, modified_at=timezone.now()
+        )
+    return series_ids
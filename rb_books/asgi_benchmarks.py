@@ -0,0 +1,161 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import override_settings
+from django.urls import include, path, reverse
+
+from . import views
+from .benchmarks import BenchmarkError
+from .models import Book
+
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_REQUESTS = 500
+DEFAULT_THREADS = 8
+DEFAULT_CLIENT_DELAY = 0.05
+
+# The names of the benchmarked endpoints, see `get_benchmark_paths()`.
+BENCHMARK_ENDPOINTS = ['book_list', 'book_detail', 'series_detail', 'reading_widget']
+
+
+# Serves the synchronous versions of the async read endpoints at the same paths, see `run_asgi()`.
+SYNC_URLCONF = __name__
+
+urlpatterns = [
+    path('', include(([
+        path('api/books/', views.sync_book_list, name='book_list'),
+        path('api/books/<int:pk>/', views.sync_book_detail, name='book_detail'),
+        path('api/reading/', views.sync_reading_widget, name='reading_widget'),
+        path('api/series/<int:pk>/', views.sync_series_detail, name='series_detail'),
+    ], 'rb_books'))),
+]
+
+
+def get_benchmark_paths() -> dict:
+    """
+    Returns the paths of the async read endpoints, for the first published book and series of the database.
+    Raises:
+        BenchmarkError: If the database holds no published book in a series.
+    """
+    book = Book.objects.filter(published=True, series__isnull=False).order_by('pk').first()
+    if book is None:
+        raise BenchmarkError('No published book in a series: seed the database first (manage.py seed).')
+    return {
+        'book_list': reverse('rb_books:book_list'),
+        'book_detail': reverse('rb_books:book_detail', args=[book.pk]),
+        'series_detail': reverse('rb_books:series_detail', args=[book.series_id]),
+        'reading_widget': reverse('rb_books:reading_widget'),
+    }
+
+
+def run_wsgi(path, requests=DEFAULT_REQUESTS, threads=DEFAULT_THREADS, client_delay=DEFAULT_CLIENT_DELAY) -> dict:
+    """
+    Serves requests through the WSGI handler from a pool of threads, like a threaded WSGI worker: a thread is held
+    for the whole request, including the time the client takes to read the response.
+    Parameters:
+    - path: The requested path.
+    - requests: The number of requests.
+    - threads: The number of threads of the worker.
+    - client_delay: The time, in seconds, a slow client takes to read the response.
+    Returns:
+    - float: The number of requests served per second.
+    """
+    handler = WSGIHandler()
+
+    def request():
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        }
+        response = handler(environ, lambda status, headers: None)
+        for _ in response:
+            time.sleep(client_delay)
+        response.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(lambda _: request(), range(requests)))
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+def run_asgi(path, requests=DEFAULT_REQUESTS, concurrency=DEFAULT_CONCURRENCY, client_delay=DEFAULT_CLIENT_DELAY,
+             urlconf=None):
+    """
+    Serves requests through the ASGI handler on a single event loop, like a single ASGI worker, with at most
+    `concurrency` connections at a time. A slow client only holds its connection, not a thread: the client delay is
+    spent in the server, between two `send()` calls, whether the view is async or not.
+    Parameters: see `run_wsgi()`, and:
+    - urlconf: The URLconf serving the requests, e.g. `SYNC_URLCONF`, `ROOT_URLCONF` by default.
+    Returns:
+    - float: The number of requests served per second.
+    Note: The latencies of both servers are not compared: a threaded worker queues the connections it has no thread
+    for before accepting them, while the event loop accepts them all and interleaves them.
+    """
+    handler = ASGIHandler()
+
+    async def request(semaphore):
+        async with semaphore:
+            disconnected = asyncio.Event()
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                    await asyncio.sleep(client_delay)
+
+            scope = {
+                'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+                'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            }
+            await handler(scope, receive, send)
+            disconnected.set()
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(request(semaphore) for _ in range(requests)))
+
+    start = time.perf_counter()
+    with override_settings(**({'ROOT_URLCONF': urlconf} if urlconf else {})):
+        asyncio.run(run())
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+def run_asgi_benchmarks(names=None, requests=DEFAULT_REQUESTS, threads=DEFAULT_THREADS,
+                        concurrency=DEFAULT_CONCURRENCY, client_delay=DEFAULT_CLIENT_DELAY) -> dict:
+    """
+    Compares the async read endpoints served by a single ASGI worker with the same endpoints served by a threaded
+    WSGI worker, and with their synchronous versions served by the same ASGI worker, against the current database,
+    seeded with `manage.py seed`.
+    Parameters:
+    - names: The endpoints to benchmark, see `get_benchmark_paths()`, all of them by default.
+    - requests: The number of requests per endpoint and server.
+    - threads: The number of threads of the WSGI worker.
+    - concurrency: The number of concurrent connections served by the ASGI worker.
+    - client_delay: The time, in seconds, a slow client takes to read a response.
+    Returns:
+    - dict: The requests served per second, by endpoint and run: `wsgi`, `asgi` and `asgi_sync`.
+    Notes:
+    The requests are served in process, without any network, so that only the handling of the concurrent connections
+    differs between both servers.
+    The ASGI handler runs the synchronous views one at a time, in its single thread-sensitive worker thread.
+    """
+    paths = get_benchmark_paths()
+    return {
+        name: {
+            'wsgi': run_wsgi(paths[name], requests, threads, client_delay),
+            'asgi': run_asgi(paths[name], requests, concurrency, client_delay),
+            'asgi_sync': run_asgi(paths[name], requests, concurrency, client_delay, SYNC_URLCONF),
+        }
+        for name in names or paths
+    }
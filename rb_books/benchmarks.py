@@ -0,0 +1,233 @@
+import json
+import os
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .models import Book, Series
+
+
+BENCHMARKS = {}
+
+# The baseline the results are compared to, kept with the app so that it does not depend on the working directory.
+# It is recorded on the machine running the comparison, e.g. the CI, with `manage.py benchmark --update-baseline`.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+CHANGELIST_SIZES = [25, 100, 500]
+
+
+class BenchmarkError(Exception):
+    """
+    Raised when the database does not hold the data a benchmark needs.
+    """
+
+
+def benchmark(name):
+    """
+    Decorator registering a benchmark. The decorated function prepares the benchmark, without being timed, and returns
+    the function which is timed and whose queries are counted.
+    Parameters:
+    - name: The name of the benchmark in the results.
+    Returns:
+    - function: The decorator.
+    """
+    def decorator(prepare):
+        BENCHMARKS[name] = prepare
+        return prepare
+    return decorator
+
+
+class BenchmarkContext:
+    """
+    The objects shared by the benchmarks: an admin user and a request factory.
+    """
+
+    def __init__(self):
+        self.factory = RequestFactory()
+        self.user = User(username='benchmark', is_active=True, is_staff=True, is_superuser=True)
+
+    def get_request(self, path='/', data=None):
+        request = self.factory.get(path, data or {})
+        request.user = self.user
+        return request
+
+    def get_book(self, **filters):
+        book = Book.objects.filter(**filters).order_by('pk').first()
+        if book is None:
+            raise BenchmarkError(f'No book matching {filters}: seed the database first (manage.py seed).')
+        return book
+
+
+@benchmark('book_save')
+def prepare_book_save(context):
+    book = context.get_book(series__isnull=False, published=True)
+
+    def run():
+        book.title = f'{book.title} (bis)'
+        book.save()
+    return run
+
+
+@benchmark('book_save_unchanged')
+def prepare_book_save_unchanged(context):
+    book = context.get_book()
+    return book.save
+
+
+@benchmark('current_reading')
+def prepare_current_reading(context):
+    book = context.get_book(published=False, current_reading=False)
+
+    def run():
+        book.current_reading = True
+        book.save()
+    return run
+
+
+@benchmark('full_title_100')
+def prepare_full_title(context):
+    books = list(Book.objects.order_by('pk')[:100])
+
+    def run():
+        return [str(book) for book in books]
+    return run
+
+
+def prepare_changelist(context, size, query=None):
+    """
+    Prepares the rendering of a page of `size` rows of the `Book` changelist, or of its search results for `query`.
+    """
+    if Book.objects.count() < size:
+        raise BenchmarkError(f'The changelist benchmarks need {size} books: seed the database first (manage.py seed).')
+    model_admin = admin.site._registry[Book]
+
+    def run():
+        list_per_page = model_admin.list_per_page
+        model_admin.list_per_page = size
+        try:
+            response = model_admin.changelist_view(context.get_request(data={'q': query} if query else None))
+            response.render()
+        finally:
+            model_admin.list_per_page = list_per_page
+        return response
+    return run
+
+
+for changelist_size in CHANGELIST_SIZES:
+    benchmark(f'changelist_{changelist_size}')(
+        lambda context, size=changelist_size: prepare_changelist(context, size)
+    )
+
+
+@benchmark('admin_search')
+def prepare_admin_search(context):
+    book = context.get_book(series__isnull=False)
+    return prepare_changelist(context, CHANGELIST_SIZES[0], book.series.title.split()[0])
+
+
+@benchmark('series_inheritance_save')
+def prepare_series_inheritance_save(context):
+    """
+    Prepares the creation of a book of a series through the `BookAdmin` form, without authors, genres, illustrator,
+    editor, audience nor category, so that `save_model` and `save_related` inherit them from the series.
+    """
+    series = Series.objects.filter(author__isnull=False, genres__isnull=False).order_by('pk').first()
+    if series is None:
+        raise BenchmarkError('No series with authors and genres: seed the database first (manage.py seed).')
+    book = context.get_book(series=series)
+    model_admin = admin.site._registry[Book]
+    request = context.get_request()
+    form_class = model_admin.get_form(request, None, change=False)
+    data = {
+        'title': 'Benchmark',
+        'series': series.pk,
+        'volume': book.volume_id,
+        'show_series_title': 'on',
+        'show_volume': 'on',
+    }
+
+    def run():
+        form = form_class(data)
+        if not form.is_valid():
+            raise BenchmarkError(f'Invalid book form: {form.errors.as_json()}')
+        obj = form.save(commit=False)
+        model_admin.save_model(request, obj, form, False)
+        model_admin.save_related(request, form, [], False)
+    return run
+
+
+def run_benchmark(prepare, context, repeat):
+    """
+    Runs a benchmark `repeat` times. Each run is rolled back, so that every run starts from the same data and the
+    database is left untouched.
+    Returns:
+    - dict: The number of `queries` of a run, and the `median_ms` and `min_ms` durations.
+    """
+    durations, queries = [], []
+    for _ in range(repeat):
+        with transaction.atomic():
+            run = prepare(context)
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                run()
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured.captured_queries))
+            transaction.set_rollback(True)
+    return {
+        'queries': max(queries),
+        'median_ms': round(statistics.median(durations), 3),
+        'min_ms': round(min(durations), 3),
+    }
+
+
+def run_benchmarks(names=None, repeat=5) -> dict:
+    """
+    Runs the benchmarks against the current database, which should have been seeded with `manage.py seed`.
+    Parameters:
+    - names: The names of the benchmarks to run, all of them by default.
+    - repeat: The number of runs of each benchmark.
+    Returns:
+    - dict: The results of each benchmark, see `run_benchmark()`.
+    Raises:
+        BenchmarkError: If the database does not hold the data a benchmark needs.
+    """
+    context = BenchmarkContext()
+    return {name: run_benchmark(BENCHMARKS[name], context, repeat) for name in names or BENCHMARKS}
+
+
+def compare_results(results, baseline, time_tolerance=0.5) -> list[str]:
+    """
+    Compares benchmark results to a baseline.
+    Parameters:
+    - results: The results of `run_benchmarks()`.
+    - baseline: The results of a previous run, e.g. loaded with `load_results()`.
+    - time_tolerance: The relative slowdown of the median duration tolerated, e.g. 0.5 for 50%. Durations depend on
+    the machine, while the query counts must never grow.
+    Returns:
+    - list[str]: The description of each regression, empty if there is none.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['queries'] > reference['queries']:
+            regressions.append(f"{name}: {result['queries']} queries instead of {reference['queries']}")
+        if result['median_ms'] > reference['median_ms'] * (1 + time_tolerance):
+            regressions.append(f"{name}: {result['median_ms']} ms instead of {reference['median_ms']} ms")
+    return regressions
+
+
+def load_results(path) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
@@ -0,0 +1,131 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections
+from django.views.decorators.http import condition
+
+
+def get_change_stamps(querysets) -> list[tuple[int, object]]:
+    """
+    Returns the change stamp of several querysets, i.e. their number of rows and their latest `modified_at`, with a
+    single query.
+    Parameters:
+    - querysets: The querysets whose rows make a response, e.g. the published books and the reference tables they are
+    serialized with. They must share the same database.
+    Returns:
+    - list[tuple[int, datetime | None]]: The number of rows and the latest `modified_at` of each queryset, in order.
+    Notes:
+    The row count catches the deletions, which leave no `modified_at` behind.
+    """
+    parts, params = [], []
+    for index, queryset in enumerate(querysets):
+        sql, sql_params = queryset.order_by().values('modified_at').query.sql_with_params()
+        parts.append(f'(SELECT {index}, COUNT(*), MAX(stamp.modified_at) FROM ({sql}) AS stamp)')
+        params.extend(sql_params)
+    with connections[querysets[0].db].cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(parts), params)
+        rows = sorted(cursor.fetchall())
+    return [(count, last_modified) for _, count, last_modified in rows]
+
+
+def _conditional(etag_func, last_modified_func, aprepare):
+    """
+    Returns the `condition` decorator of Django for the given validator functions. For an async view, `aprepare` is
+    awaited first with the arguments of the view: it computes and stores on the request what the validator functions
+    need, so that they run without any query nor cache access inside the event loop.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+        if not iscoroutinefunction(view):
+            return conditional_view
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            await aprepare(request, *args, **kwargs)
+            return await conditional_view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+def conditional_on(get_querysets):
+    """
+    Decorator answering the conditional GET requests of a read endpoint: a client or a reverse proxy sending back the
+    `ETag` or `Last-Modified` of a response gets a 304 without the view being called, as long as the rows the response
+    is made of have not changed.
+    Parameters:
+    - get_querysets: A function called with the arguments of the view and returning the querysets whose rows make the
+    response, the first one being its subject. The validators are derived from their change stamps, see
+    `get_change_stamps()`, computed once per request.
+    Returns:
+    - function: The decorator.
+    Notes:
+    The decorated view may be async: the change stamps are then computed in a worker thread.
+    No validator is sent when the subject queryset is empty, so that a 404 is never turned into a 304.
+    The `ETag` includes the query string, since the page returned by a list endpoint depends on it. `Last-Modified`
+    has a one second resolution: the `ETag`, which takes precedence when both are sent, is the exact validator.
+    Usage:
+        @conditional_on(lambda request, pk: [Book.objects.filter(pk=pk), Author.objects.all()])
+        def book_detail(request, pk):
+            ...
+    """
+    def get_stamps(request, *args, **kwargs):
+        if not hasattr(request, '_change_stamps'):
+            stamps = get_change_stamps(get_querysets(request, *args, **kwargs))
+            request._change_stamps = stamps if stamps[0][0] else None
+        return request._change_stamps
+
+    def get_etag(request, *args, **kwargs):
+        stamps = get_stamps(request, *args, **kwargs)
+        if stamps is None:
+            return None
+        return hashlib.md5(repr((request.get_full_path(), stamps)).encode(), usedforsecurity=False).hexdigest()
+
+    def get_last_modified(request, *args, **kwargs):
+        stamps = get_stamps(request, *args, **kwargs)
+        if stamps is None:
+            return None
+        return max((last_modified for _, last_modified in stamps if last_modified is not None), default=None)
+
+    return _conditional(get_etag, get_last_modified, sync_to_async(get_stamps))
+
+
+def conditional_on_cached_entry(get_entry):
+    """
+    Decorator answering the conditional GET requests of a detail endpoint served from the object cache (see
+    `rb_books.object_cache`), without any query when the object is cached: the `ETag` and `Last-Modified` are the
+    `etag` and `last_modified` of the cache entry, derived from the cached data (see
+    `rb_books.object_cache.get_validators()`), so that every process sends the same validators for the same data.
+    Parameters:
+    - get_entry: A function called with the arguments of the view and returning the cache entry of the object, or
+    raising `DoesNotExist`, in which case no validator is sent. It is a coroutine function when the decorated view is
+    async, e.g. calling `rb_books.object_cache.aget_cached_entry()`.
+    Returns:
+    - function: The decorator.
+    """
+    def get_cached_entry(request, *args, **kwargs):
+        if not hasattr(request, '_cache_entry'):
+            try:
+                request._cache_entry = get_entry(request, *args, **kwargs)
+            except ObjectDoesNotExist:
+                request._cache_entry = None
+        return request._cache_entry
+
+    async def aget_cached_entry(request, *args, **kwargs):
+        if not hasattr(request, '_cache_entry'):
+            try:
+                request._cache_entry = await get_entry(request, *args, **kwargs)
+            except ObjectDoesNotExist:
+                request._cache_entry = None
+
+    def get_etag(request, *args, **kwargs):
+        entry = get_cached_entry(request, *args, **kwargs)
+        return entry['etag'] if entry else None
+
+    def get_last_modified(request, *args, **kwargs):
+        entry = get_cached_entry(request, *args, **kwargs)
+        return entry['last_modified'] if entry else None
+
+    return _conditional(get_etag, get_last_modified, aget_cached_entry)
@@ -0,0 +1,170 @@
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import render_to_string
+
+from .conditional import get_change_stamps
+from .serializers import serialize_book, serialize_series
+from .views import BOOK_RELATED_MODELS, SERIES_RELATED_MODELS, get_books_queryset, get_series_queryset
+
+
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_BATCH_SIZE = 100
+
+
+class ExportKind:
+    """
+    Describes how a kind of object is exported.
+    Attributes:
+        name (str): The name of the kind, used as the name of its directory and of its section of the manifest.
+        get_queryset (function): Returns the queryset of the exported objects, with their related objects joined or
+        prefetched, see `rb_books.views`.
+        related_models (list): The models the objects are serialized with: when one of them changes, every object is
+        exported again.
+        serialize (function): Returns the JSON payload of an object.
+        template_name (str): The template rendering the HTML fragment of an object from its payload.
+    """
+
+    def __init__(self, name, get_queryset, related_models, serialize, template_name):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.related_models = related_models
+        self.serialize = serialize
+        self.template_name = template_name
+
+    @property
+    def model(self):
+        return self.get_queryset().model
+
+
+EXPORT_KINDS = [
+    ExportKind(
+        'books',
+        lambda: get_books_queryset(detailed=True),
+        BOOK_RELATED_MODELS,
+        lambda book: serialize_book(book, detailed=True),
+        'rb_books/export/book.html',
+    ),
+    ExportKind(
+        'series',
+        lambda: get_series_queryset(detailed=True),
+        SERIES_RELATED_MODELS,
+        lambda series: serialize_series(series, detailed=True),
+        'rb_books/export/series.html',
+    ),
+]
+
+
+def _write_file(path, content: str):
+    """
+    Writes a file atomically, so that a static file server never serves a half-written document.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_files(directory, slug):
+    for extension in ['json', 'html']:
+        path = os.path.join(directory, f'{slug}.{extension}')
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def read_manifest(output_dir) -> dict:
+    """
+    Returns the manifest of a previous export, or an empty one.
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def export_kind(kind, output_dir, manifest, full=False, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Exports the objects of a kind that changed since the previous export to `<output_dir>/<kind>/<slug>.json` and
+    `<output_dir>/<kind>/<slug>.html`, and removes the documents of the objects which are no longer exported.
+    Parameters:
+    - kind: The `ExportKind` to export.
+    - output_dir: The directory of the export.
+    - manifest: The manifest of the previous export, updated in place.
+    - full: Whether to export every object, even the unchanged ones.
+    - batch_size: The number of objects loaded, with their related objects, per batch.
+    Returns:
+    - dict: The number of objects `exported`, `unchanged` and `removed`.
+    Notes:
+    The manifest records the `modified_at` and the slug of every exported object, and the change stamps of the related
+    models (see `rb_books.conditional.get_change_stamps()`): an object is exported again when its `modified_at` or one
+    of these stamps changed. The objects are streamed in batches of `batch_size`, with one query per batch and per
+    prefetched relation, so that the memory used does not depend on the size of the catalog.
+    """
+    directory = os.path.join(output_dir, kind.name)
+    os.makedirs(directory, exist_ok=True)
+    section = manifest.setdefault(kind.name, {'related_stamps': None, 'objects': {}})
+    previous_objects = section['objects']
+
+    related_stamps = json.loads(json.dumps(
+        get_change_stamps([model.objects.all() for model in kind.related_models]), cls=DjangoJSONEncoder
+    ))
+    if related_stamps != section['related_stamps']:
+        full = True
+
+    queryset = kind.get_queryset()
+    current = {str(pk): (slug, modified_at) for pk, slug, modified_at in queryset.order_by().values_list(
+        'pk', 'slug', 'modified_at'
+    )}
+    to_export = [
+        pk for pk, (slug, modified_at) in current.items()
+        if full or previous_objects.get(pk) != {'slug': slug, 'modified_at': modified_at.isoformat()}
+    ]
+
+    objects = {pk: entry for pk, entry in previous_objects.items() if pk in current}
+    for pk in set(previous_objects) - set(current):
+        _remove_files(directory, previous_objects[pk]['slug'])
+
+    exported = 0
+    for obj in queryset.filter(pk__in=to_export).order_by('pk').iterator(chunk_size=batch_size):
+        previous = previous_objects.get(str(obj.pk))
+        if previous and previous['slug'] != obj.slug:
+            _remove_files(directory, previous['slug'])
+        payload = kind.serialize(obj)
+        _write_file(
+            os.path.join(directory, f'{obj.slug}.json'),
+            json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False)
+        )
+        _write_file(
+            os.path.join(directory, f'{obj.slug}.html'),
+            render_to_string(kind.template_name, {kind.model._meta.model_name: payload})
+        )
+        objects[str(obj.pk)] = {'slug': obj.slug, 'modified_at': obj.modified_at.isoformat()}
+        exported += 1
+
+    section['related_stamps'] = related_stamps
+    section['objects'] = objects
+    return {
+        'exported': exported,
+        'unchanged': len(current) - len(to_export),
+        'removed': len(set(previous_objects) - set(current)),
+    }
+
+
+def export_catalog(output_dir, full=False, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Exports the published books and the series to static JSON documents and HTML fragments, which can be served by
+    any static file server, incrementally: only the objects changed since the previous export are rendered again.
+    Parameters:
+    - output_dir: The directory of the export. It holds a `books` and a `series` directory and the manifest.
+    - full: Whether to export every object, even the unchanged ones.
+    - batch_size: The number of objects loaded per batch.
+    Returns:
+    - dict: The counts returned by `export_kind()`, by kind.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = read_manifest(output_dir)
+    results = {kind.name: export_kind(kind, output_dir, manifest, full, batch_size) for kind in EXPORT_KINDS}
+    _write_file(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2))
+    return results
@@ -0,0 +1,86 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import models
+from django.db.models import Case, OuterRef, Subquery, When
+
+
+SEARCH_CONFIG = 'french_unaccent'
+
+
+class ConcatWS(models.Func):
+    """
+    PostgreSQL `CONCAT_WS()` function: concatenates its arguments with a separator, skipping the NULL ones.
+    Usage:
+        ConcatWS('first_name', 'last_name', separator=' ')
+    """
+    function = 'CONCAT_WS'
+    output_field = models.CharField()
+
+    def __init__(self, *expressions, separator, **extra):
+        super().__init__(models.Value(separator), *expressions, **extra)
+
+
+def full_title_expression(series_model, volume_model):
+    """
+    Returns an expression computing the full title of a book in the database, like `Book.get_full_title()` does in
+    Python, so that the `full_title` column of many books can be refreshed by a single UPDATE.
+    Parameters:
+    - series_model: The `Series` model class.
+    - volume_model: The `Volume` model class.
+    Returns:
+    - Case: The full title expression, to be evaluated on the `Book` table.
+    Note: The model classes are given as parameters so that migrations can use their historical models.
+    """
+    series_title = Subquery(series_model.objects.filter(pk=OuterRef('series_id')).values('title')[:1])
+    volume_label = Subquery(volume_model.objects.filter(pk=OuterRef('volume_id')).values('label')[:1])
+    return Case(
+        When(
+            series__isnull=False,
+            show_series_title=True,
+            then=ConcatWS(series_title, volume_label, 'title', separator=' - ')
+        ),
+        When(
+            series__isnull=False,
+            then=ConcatWS('title', volume_label, separator=' - ')
+        ),
+        default=ConcatWS('title', separator=' - '),
+        output_field=models.CharField(),
+    )
+
+
+def search_document_expression(model, title_field):
+    """
+    Returns an expression computing the search document of a book or a series: its title, weighted A, the names of
+    its authors, weighted B, and the names of its illustrator and editor, weighted C, parsed with the `SEARCH_CONFIG`
+    text search configuration (French stemming on unaccented words).
+    Parameters:
+    - model: The `Book` or `Series` model class.
+    - title_field: The name of the field holding the title, e.g. `full_title` for a book.
+    Returns:
+    - SearchVector: The search document expression, to be evaluated on the table of `model`.
+    Note: The related models are read from the fields of `model`, so that migrations can use their historical models.
+    """
+    author_field = model._meta.get_field('author')
+    owner_field = author_field.m2m_field_name()
+    authors_names = Subquery(
+        author_field.remote_field.through.objects
+        .filter(**{owner_field: OuterRef('pk')})
+        .values(owner_field)
+        .annotate(names=StringAgg(
+            ConcatWS('author__first_name', 'author__last_name', separator=' '), delimiter=' '
+        ))
+        .values('names')
+    )
+    illustrator_name = Subquery(
+        model._meta.get_field('illustrator').related_model.objects
+        .filter(pk=OuterRef('illustrator_id'))
+        .values(name=ConcatWS('first_name', 'last_name', separator=' '))[:1]
+    )
+    editor_name = Subquery(
+        model._meta.get_field('editor').related_model.objects.filter(pk=OuterRef('editor_id')).values('name')[:1]
+    )
+    return (
+        SearchVector(title_field, weight='A', config=SEARCH_CONFIG)
+        + SearchVector(authors_names, weight='B', config=SEARCH_CONFIG)
+        + SearchVector(illustrator_name, editor_name, weight='C', config=SEARCH_CONFIG)
+    )
@@ -0,0 +1,139 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import require_GET
+
+from .conditional import conditional_on_cached_entry
+from .models import Book
+from .object_cache import get_cache, get_cache_timeout, get_version
+from .serializers import serialize_cover
+
+
+DEFAULT_REVIEWS_FEED_SIZE = 20
+DEFAULT_REVIEWS_FEED_LINK = '/'
+
+FEED_VERSION_KEY = 'rb_books:feed:version'
+
+
+class LatestReviewsFeed(Feed):
+    """
+    RSS feed of the latest published reviews: the short opinion, the rating, the cover and the authors of the books,
+    by descending publication date. Its size and link are read from `settings.REVIEWS_FEED_SIZE` and
+    `settings.REVIEWS_FEED_LINK` on every rendering.
+    """
+    title = 'Les Victimes de Kelith - Dernières chroniques'
+    description = 'Les dernières chroniques publiées.'
+    description_template = 'rb_books/feeds/review_description.html'
+
+    def link(self):
+        return getattr(settings, 'REVIEWS_FEED_LINK', DEFAULT_REVIEWS_FEED_LINK)
+
+    def items(self):
+        return Book.objects.filter(published=True).select_related(
+            'series', 'volume', 'rating'
+        ).prefetch_related('author').only(
+            'pk', 'slug', 'full_title', 'image', 'has_renditions', 'short_opinion_html', 'published_at', 'modified_at',
+            'series__title', 'volume__label', 'rating__label', 'rating__rating',
+        ).order_by('-published_at', '-id')[:getattr(settings, 'REVIEWS_FEED_SIZE', DEFAULT_REVIEWS_FEED_SIZE)]
+
+    def item_title(self, item):
+        return item.full_title
+
+    def item_link(self, item):
+        return reverse('rb_books:book_page', args=[item.slug])
+
+    def item_guid(self, item):
+        return f'rb_books:book:{item.pk}'
+
+    item_guid_is_permalink = False
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.modified_at
+
+    def item_author_name(self, item):
+        return ', '.join(author.full_name for author in item.author.all()) or None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        book = kwargs['item']
+        context['cover_url'] = serialize_cover(book)['src'] if book.image else None
+        context['authors'] = [author.full_name for author in book.author.all()]
+        return context
+
+
+class LatestReviewsAtomFeed(LatestReviewsFeed):
+    """
+    Atom version of `LatestReviewsFeed`.
+    """
+    feed_type = Atom1Feed
+    subtitle = LatestReviewsFeed.description
+
+
+def invalidate_feeds():
+    """
+    Invalidates all the cached feeds at once, by moving them to a new version.
+    """
+    get_cache().set(FEED_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_feed_entry(feed, request) -> dict:
+    """
+    Returns the cached rendering of a feed, rendering and storing it when it is not cached yet.
+    Parameters:
+    - feed: The `Feed` instance.
+    - request: The HTTP request. The host is part of the cache key, since the links of a feed are absolute.
+    Returns:
+    - dict: The rendered feed (`content`) with its `content_type`, and its validators, see
+    `rb_books.conditional.conditional_on_cached_entry()`: a hash of the content (`etag`) and the latest `modified_at`
+    of its items (`last_modified`), the same in every process.
+    Notes:
+    The feeds are invalidated by `rb_books.signals` when a book is published, edited while published, unpublished or
+    deleted. The key also holds the version of the `Book` namespace of the object cache, which moves when a
+    reference object such as an author or a rating changes (see `rb_books.object_cache.bump_version()`).
+    """
+    cache = get_cache()
+    feed_version = cache.get(FEED_VERSION_KEY)
+    if feed_version is None:
+        cache.add(FEED_VERSION_KEY, uuid.uuid4().hex, None)
+        feed_version = cache.get(FEED_VERSION_KEY)
+    key = f'rb_books:feed:{type(feed).__name__}:{feed_version}:{get_version(Book)}:{request.get_host()}'
+    entry = cache.get(key)
+    if entry is None:
+        response = feed(request)
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': hashlib.md5(response.content, usedforsecurity=False).hexdigest(),
+            'last_modified': max(feed.items().values_list('modified_at', flat=True), default=None),
+        }
+        cache.set(key, entry, get_cache_timeout())
+    return entry
+
+
+def cached_feed_view(feed):
+    """
+    Returns a view serving a feed from the cache, and answering the conditional GET requests of feed readers with a
+    304 without any query.
+    Parameters:
+    - feed: The `Feed` instance.
+    Returns:
+    - function: The view.
+    """
+    @require_GET
+    @conditional_on_cached_entry(lambda request: get_feed_entry(feed, request))
+    def view(request):
+        entry = get_feed_entry(feed, request)
+        return HttpResponse(entry['content'], content_type=entry['content_type'])
+    return view
+
+
+latest_reviews_rss = cached_feed_view(LatestReviewsFeed())
+latest_reviews_atom = cached_feed_view(LatestReviewsAtomFeed())
@@ -0,0 +1,236 @@
+import atexit
+import logging
+import queue
+import threading
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage, storages
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import PendingFileDeletion
+
+
+logger = logging.getLogger(__name__)
+
+FILE_DELETION_DEFAULTS = {
+    'FILE_DELETION_WORKER': True,
+    'FILE_DELETION_BATCH_SIZE': 100,
+    'FILE_DELETION_MAX_ATTEMPTS': 5,
+    'FILE_DELETION_RETRY_DELAY': 60,
+}
+
+_deletion_queue = queue.SimpleQueue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def get_setting(name):
+    """
+    Returns a setting of the file deletions, see `FILE_DELETION_DEFAULTS`. The settings are read on every call, so that
+    they can be overridden by the tests.
+    """
+    return getattr(settings, name, FILE_DELETION_DEFAULTS[name])
+
+
+def get_storage_alias(storage) -> str:
+    """
+    Returns the alias of a storage in `settings.STORAGES`, saved along with the pending file deletions so that they are
+    retried against the storage of the file.
+    Parameters:
+    - storage: The storage instance.
+    Returns:
+    - str: The alias of the storage, or the alias of the default storage if the storage is not configured in
+    `settings.STORAGES`, e.g. a storage passed directly to a file field.
+    """
+    if storage is default_storage:
+        return 'default'
+    for alias in storages.backends:
+        if storages[alias] is storage:
+            return alias
+    logger.warning('Storage %r is not configured in STORAGES, using the default storage', storage)
+    return 'default'
+
+
+def save_pending_deletions(failures):
+    """
+    Saves failed file deletions as `PendingFileDeletion` rows, or increments their attempts if they already exist, so
+    that a file whose deletion keeps failing is eventually given up.
+    Parameters:
+    - failures: An iterable of `(storage, name, error)` tuples.
+    Returns:
+    - None
+    Note: The rows are upserted with a single `INSERT ... ON CONFLICT DO UPDATE` statement each, which `bulk_create()`
+    cannot express since the attempts are incremented from their stored value.
+    """
+    table = connection.ops.quote_name(PendingFileDeletion._meta.db_table)
+    delay = get_setting('FILE_DELETION_RETRY_DELAY')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (storage, name, attempts, last_error, created_at, next_attempt_at) '
+            f"VALUES (%s, %s, 1, %s, NOW(), NOW() + %s * INTERVAL '1 second') "
+            f'ON CONFLICT (storage, name) DO UPDATE SET attempts = {table}.attempts + 1, '
+            f'last_error = EXCLUDED.last_error, '
+            f"next_attempt_at = NOW() + %s * POWER(2, {table}.attempts + 1) * INTERVAL '1 second'",
+            [(get_storage_alias(storage), name, str(error), delay, delay) for storage, name, error in failures]
+        )
+
+
+def schedule_file_deletion(file, storage=None):
+    """
+    Schedules the deletion of a file once the current transaction is committed.
+    Parameters:
+    - file: The `FieldFile` to delete, or its name.
+    - storage: The storage of the file, when a name is given. Defaults to the default storage.
+    Return Type:
+    - None
+    Notes:
+    Nothing is deleted if the transaction is rolled back. Outside a transaction, the deletion is queued immediately.
+    The queued files are deleted in batches by a background thread, or saved as `PendingFileDeletion` rows for the
+    `delete_pending_files` management command when `FILE_DELETION_WORKER` is False.
+    """
+    name = getattr(file, 'name', file)
+    if not name:
+        return
+    storage = getattr(file, 'storage', storage or default_storage)
+    transaction.on_commit(partial(_enqueue, storage, name))
+
+
+def _enqueue(storage, name):
+    """
+    Hands a committed file deletion over to the background thread, or saves it for the management command.
+    """
+    if get_setting('FILE_DELETION_WORKER'):
+        _deletion_queue.put((storage, name))
+        _start_worker()
+    else:
+        # A file scheduled again is due immediately, without resetting its failed attempts.
+        PendingFileDeletion.objects.bulk_create(
+            [PendingFileDeletion(storage=get_storage_alias(storage), name=name)],
+            update_conflicts=True,
+            unique_fields=['storage', 'name'],
+            update_fields=['next_attempt_at'],
+        )
+
+
+def delete_files(files) -> int:
+    """
+    Deletes a batch of files through the storage API. The failed deletions are saved as `PendingFileDeletion` rows to
+    be retried later.
+    Parameters:
+    - files: An iterable of `(storage, name)` tuples.
+    Returns:
+    - int: The number of deleted files.
+    """
+    failures = []
+    deleted = 0
+    for storage, name in files:
+        try:
+            storage.delete(name)
+            deleted += 1
+        except Exception as error:
+            logger.warning('Unable to delete file %s: %s', name, error)
+            failures.append((storage, name, error))
+    if failures:
+        save_pending_deletions(failures)
+    return deleted
+
+
+def delete_pending_files(batch_size=None) -> tuple[int, int]:
+    """
+    Retries a batch of pending file deletions whose next attempt is due, each against the storage it was saved with.
+    Parameters:
+    - batch_size: The maximum number of files to delete, `FILE_DELETION_BATCH_SIZE` by default.
+    Returns:
+    - tuple[int, int]: The number of deleted files and the number of failed deletions.
+    Notes:
+    The rows are locked with `SKIP LOCKED`, so the background thread and the management command can run at the same
+    time. A failed deletion is retried with an exponential backoff, until `FILE_DELETION_MAX_ATTEMPTS` is reached.
+    """
+    batch_size = batch_size or get_setting('FILE_DELETION_BATCH_SIZE')
+    with transaction.atomic():
+        pending_files = list(
+            PendingFileDeletion.objects
+            .select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=timezone.now(), attempts__lt=get_setting('FILE_DELETION_MAX_ATTEMPTS'))
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        deleted_ids = []
+        failures = []
+        for pending_file in pending_files:
+            try:
+                storages[pending_file.storage].delete(pending_file.name)
+                deleted_ids.append(pending_file.pk)
+            except Exception as error:
+                pending_file.attempts += 1
+                pending_file.last_error = str(error)
+                pending_file.next_attempt_at = timezone.now() + timedelta(
+                    seconds=get_setting('FILE_DELETION_RETRY_DELAY') * 2 ** pending_file.attempts
+                )
+                failures.append(pending_file)
+        PendingFileDeletion.objects.filter(pk__in=deleted_ids).delete()
+        PendingFileDeletion.objects.bulk_update(failures, ['attempts', 'last_error', 'next_attempt_at'])
+    return len(deleted_ids), len(failures)
+
+
+def _next_batch(timeout):
+    """
+    Waits for a queued file deletion, then collects the ones already queued up to `FILE_DELETION_BATCH_SIZE`.
+    """
+    batch = [_deletion_queue.get(timeout=timeout)]
+    batch_size = get_setting('FILE_DELETION_BATCH_SIZE')
+    while len(batch) < batch_size:
+        try:
+            batch.append(_deletion_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run_worker():
+    """
+    Main loop of the background thread: deletes the queued files in batches and, when idle, retries the pending file
+    deletions.
+    """
+    while True:
+        try:
+            delete_files(_next_batch(timeout=get_setting('FILE_DELETION_RETRY_DELAY')))
+        except queue.Empty:
+            try:
+                delete_pending_files()
+            except Exception:
+                logger.exception('Unable to process the pending file deletions')
+        except Exception:
+            logger.exception('Unable to delete the queued files')
+        finally:
+            close_old_connections()
+
+
+def _start_worker():
+    """
+    Starts the background thread the first time a file deletion is queued.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name='file-deletion-worker', daemon=True)
+            _worker.start()
+
+
+@atexit.register
+def _flush_queue():
+    """
+    Deletes the files still queued when the process exits.
+    """
+    while True:
+        try:
+            storage, name = _deletion_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            storage.delete(name)
+        except Exception as error:
+            logger.warning('Unable to delete file %s: %s', name, error)
@@ -0,0 +1,433 @@
+import csv
+import json
+import math
+import re
+import time
+from datetime import datetime, time as datetime_time
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .aggregates import rebuild_series_aggregates
+from .feeds import invalidate_feeds
+from .models import Author, Book, Editor, Genre, Rating, Series, Volume
+from .object_cache import bump_version
+from .search import refresh_search_document
+from .services import apply_reading_state_rules
+from .slugs import get_base_slug
+
+
+DEFAULT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ['csv', 'jsonl']
+
+# The columns of the supported exports, e.g. Livraddict or Goodreads, mapped to the fields of an imported record.
+COLUMN_ALIASES = {
+    'title': 'title', 'titre': 'title',
+    'authors': 'authors', 'author': 'authors', 'auteur': 'authors', 'auteurs': 'authors',
+    'series': 'series', 'saga': 'series', 'série': 'series', 'serie': 'series',
+    'volume': 'volume', 'tome': 'volume',
+    'editor': 'editor', 'publisher': 'editor', 'éditeur': 'editor', 'editeur': 'editor',
+    'genres': 'genres', 'genre': 'genres',
+    'pages': 'pages', 'number of pages': 'pages', 'nombre de pages': 'pages',
+    'rating': 'rating', 'my rating': 'rating', 'note': 'rating',
+    'status': 'status', 'exclusive shelf': 'status', 'statut': 'status', 'étagère': 'status',
+    'read_at': 'read_at', 'date read': 'read_at', 'date de lecture': 'read_at', 'lu le': 'read_at',
+    'summary': 'summary', 'résumé': 'summary', 'resume': 'summary',
+    'opinion': 'opinion', 'my review': 'opinion', 'avis': 'opinion', 'critique': 'opinion',
+    'short_opinion': 'short_opinion', 'avis résumé': 'short_opinion',
+    'quotation': 'quotation', 'citation': 'quotation',
+}
+STATUS_ALIASES = {
+    'published': {'read', 'lu', 'lus', 'publié', 'published'},
+    'current_reading': {'currently-reading', 'reading', 'en cours', 'en cours de lecture', 'current_reading'},
+    'incoming_reading': {'to-read', 'à lire', 'a lire', 'pal', 'wishlist', 'incoming_reading'},
+}
+LIST_SEPARATORS = re.compile(r'\s*[;|]\s*|\s*,\s*')
+# The largest value of an integer column, e.g. `Book.pages`.
+MAX_INTEGER = 2 ** 31 - 1
+
+
+class BookImportError(Exception):
+    """
+    Raised when an import file cannot be parsed.
+    """
+
+
+def normalize_key(value) -> str:
+    return ' '.join(str(value).split()).casefold()
+
+
+def read_records(file, file_format):
+    """
+    Yields the records of an import file one at a time, without loading the whole file, with their fields renamed
+    after `COLUMN_ALIASES`. The unknown columns are dropped, and the NUL characters, which no text column can store.
+    Parameters:
+    - file: The file, opened in text mode.
+    - file_format: `csv`, whose delimiter is sniffed, or `jsonl`, one JSON object per line.
+    Raises:
+        BookImportError: If a line of a JSONL file is not a JSON object.
+    """
+    if file_format == 'csv':
+        sample = file.read(4096)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        rows = csv.DictReader(file, dialect=dialect)
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
+    for line_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise BookImportError(f'Enregistrement {line_number} invalide : un objet JSON est attendu.')
+        record = {}
+        for key, value in row.items():
+            field = COLUMN_ALIASES.get(normalize_key(key or ''))
+            if isinstance(value, str):
+                value = value.replace('\x00', '')
+            if field is not None and value not in [None, '']:
+                record[field] = value
+        yield record
+
+
+def clip(value, model, field_name) -> str:
+    """
+    Returns a text stripped and truncated to the maximum length of a field, e.g. `clip(name, Editor, 'name')`, so
+    that it is stored and looked up as the same value.
+    """
+    return str(value).strip()[:model._meta.get_field(field_name).max_length]
+
+
+def split_author_name(name) -> tuple[str, str]:
+    """
+    Returns the first and last names of an author name, whose last word is the last name, e.g. `Robin Hobb`.
+    """
+    first_name, _, last_name = name.rpartition(' ')
+    return clip(first_name, Author, 'first_name'), clip(last_name, Author, 'last_name')
+
+
+def get_author_key(name) -> tuple[str, str]:
+    """
+    Returns the lookup key of an author name, see `split_author_name()`.
+    """
+    first_name, last_name = split_author_name(name)
+    return normalize_key(first_name), normalize_key(last_name)
+
+
+def split_list(value) -> list[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item for item in LIST_SEPARATORS.split(str(value).strip()) if item]
+
+
+def parse_number(value):
+    """
+    Parses a decimal number, with a dot or a comma, or returns None if it is not a finite number.
+    """
+    try:
+        number = float(str(value).replace(',', '.'))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_int(value, maximum=MAX_INTEGER):
+    """
+    Parses a positive integer, or returns None if it is not one or if it exceeds `maximum`.
+    """
+    number = parse_number(value)
+    return int(number) if number is not None and 1 <= number <= maximum else None
+
+
+def get_volume_label(index) -> str | None:
+    """
+    Returns the label of a new volume, e.g. `Tome 2`, or None if it would not fit in `Volume.label`.
+    """
+    label = f"Tome {int(index) if index.is_integer() else index}"
+    return label if len(label) <= Volume._meta.get_field('label').max_length else None
+
+
+def parse_read_at(value):
+    """
+    Parses a reading date: an ISO 8601 date or date and time, or a French `dd/mm/yyyy` date.
+    """
+    value = str(value).strip().replace('/', '-')
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value) or datetime.strptime(value, '%d-%m-%Y').date()
+            parsed = datetime.combine(date, datetime_time())
+    except ValueError:
+        return None
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class BookImporter:
+    """
+    Imports a reading history from a CSV or JSONL export, e.g. from Livraddict, in batches.
+    Attributes:
+        batch_size (int): The number of books inserted per `bulk_create`, each batch in its own transaction.
+        stdout: An optional stream the progress is written to.
+    Methods:
+        import_file(file, file_format): Imports the records of a file.
+    Notes:
+    The references (authors, editors, series, volumes and genres) are resolved through lookup maps loaded once, and
+    the missing ones are created with one `bulk_create` per model and batch. The ratings are only mapped onto the
+    existing ones, the scale of the blog: a book whose rating has no match is imported without rating and counted as
+    `unmatched`.
+    The books go through neither `save()` nor the signals: their slugs, full titles, reading state and rich text
+    columns are computed in Python, and the search documents, the series aggregates, the object cache and the feeds
+    are refreshed per batch or once at the end.
+    A book whose full title and authors already exist is counted as a duplicate and not imported, so that an
+    interrupted import resumes where it stopped when the same file is imported again, and importing a file twice does
+    not duplicate its books. Two books sharing a title but not their authors are both imported.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, stdout=None):
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.counts = {'imported': 0, 'duplicates': 0, 'untitled': 0, 'unmatched': 0}
+        self.series_ids = set()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def load_lookups(self):
+        """
+        Loads the lookup maps of the references, the taken slugs and the keys of the existing books, see
+        `get_book_key()`.
+        """
+        self.authors = {
+            (normalize_key(first_name), normalize_key(last_name)): pk
+            for pk, first_name, last_name in Author.objects.values_list('pk', 'first_name', 'last_name')
+        }
+        self.editors = {normalize_key(name): pk for pk, name in Editor.objects.values_list('pk', 'name')}
+        self.genres = {normalize_key(label): pk for pk, label in Genre.objects.values_list('pk', 'label')}
+        self.series = {normalize_key(series.title): series for series in Series.objects.only('pk', 'title')}
+        self.volumes = {volume.index: volume for volume in Volume.objects.all()}
+        self.ratings = {rating.rating: rating for rating in Rating.objects.all()}
+        self.slugs = {
+            model: set(model.objects.values_list('slug', flat=True))
+            for model in [Author, Editor, Genre, Series, Volume, Book]
+        }
+        book_authors = {}
+        for book_id, author_id in Book.author.through.objects.values_list('book_id', 'author_id'):
+            book_authors.setdefault(book_id, set()).add(author_id)
+        self.book_keys = {
+            (normalize_key(full_title), tuple(sorted(book_authors.get(pk, ()))))
+            for pk, full_title in Book.objects.values_list('pk', 'full_title')
+        }
+        self.has_current_reading = Book.objects.filter(current_reading=True).exists()
+
+    def allocate_slug(self, model, text) -> str:
+        """
+        Returns a free slug for a new object, like `rb_books.slugs.allocate_slug()` but against the slugs loaded in
+        memory, so that it costs no query.
+        """
+        base = get_base_slug(model, text)
+        taken = self.slugs[model]
+        slug, suffix = base, 2
+        while slug in taken:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        taken.add(slug)
+        return slug
+
+    def resolve_references(self, records):
+        """
+        Creates the references of a batch of records missing from the lookup maps, with one `bulk_create` per model.
+        """
+        authors, editors, genres, series, volumes = {}, {}, {}, {}, {}
+        for record in records:
+            for name in split_list(record.get('authors', '')):
+                key = get_author_key(name)
+                if key not in self.authors and key not in authors:
+                    first_name, last_name = split_author_name(name)
+                    authors[key] = Author(
+                        first_name=first_name, last_name=last_name, slug=self.allocate_slug(Author, name)
+                    )
+            if 'editor' in record:
+                name = clip(record['editor'], Editor, 'name')
+                if normalize_key(name) not in self.editors and normalize_key(name) not in editors:
+                    editors[normalize_key(name)] = Editor(name=name, slug=self.allocate_slug(Editor, name))
+            for label in split_list(record.get('genres', '')):
+                label = clip(label, Genre, 'label')
+                if normalize_key(label) not in self.genres and normalize_key(label) not in genres:
+                    genres[normalize_key(label)] = Genre(label=label, slug=self.allocate_slug(Genre, label))
+            if 'series' in record:
+                title = clip(record['series'], Series, 'title')
+                if normalize_key(title) not in self.series and normalize_key(title) not in series:
+                    series[normalize_key(title)] = Series(title=title, slug=self.allocate_slug(Series, title))
+            index = parse_number(record.get('volume', ''))
+            if index is not None and index not in self.volumes and index not in volumes and get_volume_label(index):
+                label = get_volume_label(index)
+                volumes[index] = Volume(label=label, index=index, slug=self.allocate_slug(Volume, label))
+
+        for key, author in zip(authors, Author.objects.bulk_create(authors.values())):
+            self.authors[key] = author.pk
+        for key, editor in zip(editors, Editor.objects.bulk_create(editors.values())):
+            self.editors[key] = editor.pk
+        for key, genre in zip(genres, Genre.objects.bulk_create(genres.values())):
+            self.genres[key] = genre.pk
+        created_series = Series.objects.bulk_create(series.values())
+        self.series.update(zip(series, created_series))
+        if created_series:
+            refresh_search_document(Series.objects.filter(pk__in=[obj.pk for obj in created_series]))
+        self.volumes.update(zip(volumes, Volume.objects.bulk_create(volumes.values())))
+
+    def get_rating(self, record):
+        """
+        Returns the existing rating matching the rating of a record, or None. A rating of 0, which the exports use for
+        the books left unrated, is no rating.
+        """
+        rating = parse_number(record.get('rating', ''))
+        if not rating:
+            return None
+        if round(rating) not in self.ratings:
+            self.batch_counts['unmatched'] += 1
+            return None
+        return self.ratings[round(rating)]
+
+    def get_book_key(self, full_title, record) -> tuple[str, tuple[int, ...]]:
+        """
+        Returns the key identifying a book among the existing and imported ones: its normalized full title and the
+        primary keys of its authors.
+        """
+        author_ids = {self.authors[key] for key in map(get_author_key, split_list(record.get('authors', '')))}
+        return normalize_key(full_title), tuple(sorted(author_ids))
+
+    def build_book(self, record):
+        """
+        Returns the unsaved book of a record, or None if the record has no title nor series (counted as `untitled`),
+        or if its book already exists (counted as a duplicate).
+        """
+        series = self.series.get(normalize_key(clip(record['series'], Series, 'title'))) if 'series' in record else None
+        index = parse_number(record.get('volume', ''))
+        volume = self.volumes.get(index) if series is not None and index is not None else None
+        title = clip(record.get('title', ''), Book, 'title') or None
+        if title is None and volume is None:
+            self.batch_counts['untitled'] += 1
+            return None
+        editor = normalize_key(clip(record['editor'], Editor, 'name')) if 'editor' in record else None
+        status = normalize_key(record.get('status', ''))
+        book = Book(
+            title=title,
+            series=series if volume is not None else None,
+            volume=volume,
+            show_series_title=volume is not None,
+            editor_id=self.editors.get(editor),
+            pages=parse_int(record.get('pages', '')),
+            summary=record.get('summary'),
+            opinion=record.get('opinion'),
+            short_opinion=record.get('short_opinion'),
+            quotation=record.get('quotation'),
+            published=status in STATUS_ALIASES['published'] or (not status and 'read_at' in record),
+            published_at=parse_read_at(record['read_at']) if 'read_at' in record else None,
+            incoming_reading=status in STATUS_ALIASES['incoming_reading'],
+        )
+        book.full_title = clip(book.get_full_title(), Book, 'full_title')
+        key = self.get_book_key(book.full_title, record)
+        if key in self.book_keys:
+            self.batch_counts['duplicates'] += 1
+            return None
+        self.book_keys.add(key)
+        if status in STATUS_ALIASES['current_reading']:
+            book.current_reading = not self.has_current_reading
+            book.incoming_reading = self.has_current_reading
+            self.has_current_reading = True
+        if not book.published:
+            book.published_at = None
+        apply_reading_state_rules(book)
+        book.rating = self.get_rating(record)
+        book.slug = self.allocate_slug(Book, book.full_title)
+        book.render_text_fields()
+        book._import_record = record
+        return book
+
+    def create_relations(self, relation, books, lookup, get_keys):
+        field = Book._meta.get_field(relation)
+        through = field.remote_field.through
+        target_name = f'{field.m2m_reverse_field_name()}_id'
+        through.objects.bulk_create([
+            through(book_id=book.pk, **{target_name: lookup[key]})
+            for book in books
+            for key in dict.fromkeys(get_keys(book._import_record))
+            if key in lookup
+        ], ignore_conflicts=True)
+
+    def import_batch(self, records, first_number=1):
+        """
+        Imports a batch of records in a transaction: their missing references, their books, their authors and genres.
+        A batch the database rejects is imported again record by record, so that the records before the failing one
+        are imported.
+        Parameters:
+        - records: The records of the batch.
+        - first_number: The number of the first record of the batch in the file, starting at 1.
+        Raises:
+            BookImportError: If the database rejects a record, named by its number.
+        """
+        try:
+            self._import_batch(records)
+        except DatabaseError as error:
+            if len(records) == 1:
+                raise BookImportError(f'Enregistrement {first_number} invalide : {error}'.strip()) from error
+            # The lookup maps hold the references of the batch rolled back.
+            self.load_lookups()
+            for number, record in enumerate(records, start=first_number):
+                self.import_batch([record], number)
+
+    def _import_batch(self, records):
+        self.batch_counts = {'duplicates': 0, 'untitled': 0, 'unmatched': 0}
+        with transaction.atomic():
+            self.resolve_references(records)
+            books = [book for book in map(self.build_book, records) if book is not None]
+            books = Book.objects.bulk_create(books)
+            self.create_relations('author', books, self.authors, lambda record: [
+                get_author_key(name) for name in split_list(record.get('authors', ''))
+            ])
+            self.create_relations('genres', books, self.genres, lambda record: [
+                normalize_key(clip(label, Genre, 'label')) for label in split_list(record.get('genres', ''))
+            ])
+            refresh_search_document(Book.objects.filter(pk__in=[book.pk for book in books]))
+        self.series_ids.update(book.series_id for book in books if book.series_id is not None)
+        self.counts['imported'] += len(books)
+        for name, count in self.batch_counts.items():
+            self.counts[name] += count
+
+    def import_file(self, file, file_format) -> dict:
+        """
+        Imports the records of a file, batch by batch. A failure leaves the previous batches imported: importing the
+        file again resumes after them.
+        Parameters:
+        - file: The file, opened in text mode.
+        - file_format: `csv` or `jsonl`.
+        Returns:
+        - dict: The number of books `imported`, of records not imported because their book already exists
+        (`duplicates`) or because they have no title (`untitled`), and of books imported without their `unmatched`
+        rating.
+        Raises:
+            BookImportError: If the file cannot be parsed, or if the database rejects a record.
+        """
+        self.load_lookups()
+        start = time.perf_counter()
+        batch = []
+        try:
+            for number, record in enumerate(read_records(file, file_format), start=1):
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    self.import_batch(batch, number - len(batch) + 1)
+                    batch = []
+                    self.log(f"{self.counts['imported']} books imported in {time.perf_counter() - start:.1f} s")
+            if batch:
+                self.import_batch(batch, number - len(batch) + 1)
+        except (csv.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+            raise BookImportError(f'Fichier illisible : {error}') from error
+        finally:
+            if self.series_ids:
+                rebuild_series_aggregates(Series.objects.filter(pk__in=self.series_ids))
+            bump_version(Book)
+            bump_version(Series)
+            invalidate_feeds()
+        self.log(f"{self.counts['imported']} books imported in {time.perf_counter() - start:.1f} s")
+        return self.counts
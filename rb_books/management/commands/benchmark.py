@@ -0,0 +1,76 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rb_books.benchmarks import (
+    BENCHMARKS, DEFAULT_BASELINE, BenchmarkError, compare_results, load_results, run_benchmarks, save_results
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the ORM hot paths and counts their queries against the current database, seeded with `manage.py '
+        'seed`, and compares the results to a baseline, failing if there is none: record it first with '
+        '`--update-baseline`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"The benchmarks to run, among {', '.join(BENCHMARKS)}, all of them by default.",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='The number of runs of each benchmark.',
+        )
+        parser.add_argument(
+            '--output',
+            help='The JSON file the results are written to.',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=DEFAULT_BASELINE,
+            help='The JSON file of the baseline results, rb_books/benchmark_baseline.json by default.',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Writes the results to the baseline file instead of comparing them.',
+        )
+        parser.add_argument(
+            '--time-tolerance',
+            type=float,
+            default=0.5,
+            help='The relative slowdown tolerated before a duration is reported as a regression, e.g. 0.5 for 50%%.',
+        )
+
+    def handle(self, *args, **options):
+        unknown = [name for name in options['names'] if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}. Choose among: {', '.join(BENCHMARKS)}.")
+        try:
+            results = run_benchmarks(options['names'], options['repeat'])
+        except BenchmarkError as error:
+            raise CommandError(error)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name}: {result['queries']} queries, median {result['median_ms']} ms, min {result['min_ms']} ms"
+            )
+        if options['output']:
+            save_results(results, options['output'])
+
+        if options['update_baseline']:
+            baseline = load_results(options['baseline']) if os.path.exists(options['baseline']) else {}
+            save_results({**baseline, **results}, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+        if not os.path.exists(options['baseline']):
+            raise CommandError(f"No baseline at {options['baseline']}: run with --update-baseline to record one.")
+        regressions = compare_results(results, load_results(options['baseline']), options['time_tolerance'])
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regression against the baseline'))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rb_books.asgi_benchmarks import (
+    BENCHMARK_ENDPOINTS, DEFAULT_CLIENT_DELAY, DEFAULT_CONCURRENCY, DEFAULT_REQUESTS, DEFAULT_THREADS,
+    run_asgi_benchmarks,
+)
+from rb_books.benchmarks import BenchmarkError
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the async read endpoints served by a single ASGI worker with the same endpoints served by a '
+        'threaded WSGI worker, and with their synchronous versions served by the ASGI worker, against the current '
+        'database, seeded with `manage.py seed`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"The endpoints to benchmark, among {', '.join(BENCHMARK_ENDPOINTS)}, all of them by default.",
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=DEFAULT_REQUESTS,
+            help='The number of requests per endpoint and run.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=DEFAULT_THREADS,
+            help='The number of threads of the WSGI worker.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help='The number of concurrent connections of the ASGI worker.',
+        )
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=DEFAULT_CLIENT_DELAY,
+            help='The time, in seconds, a slow client takes to read a response.',
+        )
+
+    def handle(self, *args, **options):
+        unknown = [name for name in options['names'] if name not in BENCHMARK_ENDPOINTS]
+        if unknown:
+            raise CommandError(
+                f"Unknown endpoint(s): {', '.join(unknown)}. Choose among: {', '.join(BENCHMARK_ENDPOINTS)}."
+            )
+        try:
+            results = run_asgi_benchmarks(
+                options['names'], options['requests'], options['threads'], options['concurrency'],
+                options['client_delay'],
+            )
+        except BenchmarkError as error:
+            raise CommandError(error) from error
+        for name, servers in results.items():
+            self.stdout.write(
+                f"{name:<16}WSGI {servers['wsgi']:>8} req/s   ASGI {servers['asgi']:>8} req/s   "
+                f"ASGI sync {servers['asgi_sync']:>8} req/s   x{servers['asgi'] / servers['wsgi']:.2f}"
+            )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rb_books.query_plans import QUERY_PLANS, check_query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs EXPLAIN on the key queries against the current database, seeded with `manage.py seed`, and fails if '
+        'one of them scans the books sequentially.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"The queries to check, among {', '.join(QUERY_PLANS)}, all of them by default.",
+        )
+        parser.add_argument(
+            '--force-index',
+            action='store_true',
+            help='Disables the sequential scans wherever an index can be used, e.g. on a small database.',
+        )
+
+    def handle(self, *args, **options):
+        unknown = [name for name in options['names'] if name not in QUERY_PLANS]
+        if unknown:
+            raise CommandError(f"Unknown query(ies): {', '.join(unknown)}. Choose among: {', '.join(QUERY_PLANS)}.")
+        results = check_query_plans(options['names'], options['force_index'])
+        for name, scans in results.items():
+            if scans:
+                self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {', '.join(sorted(set(scans)))}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        if any(results.values()):
+            raise CommandError('Some key queries scan the books sequentially.')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from rb_books.files import delete_pending_files, get_setting
+
+
+class Command(BaseCommand):
+    help = 'Deletes the cover files whose deletion is pending, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of files deleted per batch, FILE_DELETION_BATCH_SIZE by default.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or get_setting('FILE_DELETION_BATCH_SIZE')
+        total_deleted = total_failed = 0
+        while True:
+            deleted, failed = delete_pending_files(batch_size=batch_size)
+            total_deleted += deleted
+            total_failed += failed
+            if deleted + failed < batch_size:
+                break
+        self.stdout.write(self.style.SUCCESS(f'{total_deleted} file(s) deleted, {total_failed} failure(s)'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from rb_books.export import DEFAULT_BATCH_SIZE, export_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports the published books and the series to static JSON documents and HTML fragments. Only the objects '
+        'changed since the previous export are rendered again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir',
+            help='The directory of the export.',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Exports every object, even the unchanged ones.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='The number of objects loaded per batch.',
+        )
+
+    def handle(self, *args, **options):
+        results = export_catalog(options['output_dir'], options['full'], options['batch_size'])
+        for kind, counts in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind}: {counts['exported']} exported, {counts['unchanged']} unchanged, {counts['removed']} removed"
+            ))
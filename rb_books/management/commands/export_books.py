@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from rb_books.streaming_export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, iter_catalog_rows, iter_export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports the whole catalog of books, with their series, volume, authors, genres and rating, to a CSV or JSONL '
+        'file which can be imported again with import_books. The books are streamed, so that the memory used does '
+        'not depend on the size of the catalog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            help='The file to write, the standard output by default.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='The format of the export.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='The number of books fetched from the database at a time.',
+        )
+
+    def handle(self, *args, **options):
+        lines = iter_export_lines(iter_catalog_rows(chunk_size=options['chunk_size']), options['format'])
+        if options['path'] is None:
+            sys.stdout.writelines(lines)
+            return
+        with open(options['path'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(lines)
+        self.stdout.write(self.style.SUCCESS(f"Catalog exported to {options['path']}"))
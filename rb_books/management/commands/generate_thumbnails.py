@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from rb_books.feeds import invalidate_feeds
+from rb_books.models import Book, Series
+from rb_books.object_cache import bump_version
+from rb_books.services import generate_cover_renditions
+from rb_books.thumbnails import get_thumbnail_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the missing renditions of the book and series covers, and serves the covers whose renditions '
+        'exist from them. Run it once after the migration adding `has_renditions`: until then, the covers are served '
+        'from their original upload.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerates the renditions even if they already exist.',
+        )
+
+    def handle(self, *args, **options):
+        generated = recorded = 0
+        for model in [Book, Series]:
+            storage = model._meta.get_field('image').storage
+            covers = model.objects.exclude(image='').exclude(image=None).values_list('pk', 'image', 'has_renditions')
+            for pk, image, has_renditions in covers.iterator():
+                if options['force'] or not all(storage.exists(name) for name in get_thumbnail_names(image)):
+                    try:
+                        generate_cover_renditions(model, pk, storage, image)
+                        generated += 1
+                    except Exception as error:
+                        self.stderr.write(f'{image}: {error}')
+                elif not has_renditions:
+                    recorded += model.objects.filter(pk=pk, image=image).update(
+                        has_renditions=True, modified_at=timezone.now()
+                    )
+            bump_version(model)
+        invalidate_feeds()
+        self.stdout.write(self.style.SUCCESS(f'{generated} cover(s) processed, {recorded} existing rendition(s) used'))
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rb_books.imports import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, BookImporter, BookImportError
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports books from a CSV or JSONL export, e.g. from Livraddict, in batches. The books whose full title and '
+        'authors already exist are skipped, so that an interrupted import resumes when the same file is imported '
+        'again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='The file to import.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='The format of the file, guessed from its extension by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='The number of books inserted per batch.',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f'Unknown format {file_format!r}, use --format.')
+        importer = BookImporter(options['batch_size'], self.stdout)
+        try:
+            with path.open(encoding='utf-8-sig', newline='') as file:
+                counts = importer.import_file(file, file_format)
+        except (OSError, BookImportError) as error:
+            raise CommandError(error) from error
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['imported']} imported, {counts['duplicates']} duplicate(s), {counts['untitled']} without title, "
+            f"{counts['unmatched']} unmatched rating(s)"
+        ))
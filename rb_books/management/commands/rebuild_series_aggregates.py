@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from rb_books.aggregates import rebuild_series_aggregates
+from rb_books.models import Series
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the aggregates of the series (books counts, average rating, last publication, next unread volume) '
+        'from their books, e.g. after books were imported or changed by raw SQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'series',
+            nargs='*',
+            type=int,
+            help='The primary keys of the series to rebuild, all of them by default.',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Series.objects.filter(pk__in=options['series']) if options['series'] else None
+        count = rebuild_series_aggregates(queryset)
+        self.stdout.write(self.style.SUCCESS(f'{count} series rebuilt'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from rb_books.seed import DEFAULT_BATCH_SIZE, CatalogSeeder
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic catalog of books and series for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--books',
+            type=int,
+            default=1000,
+            help='The number of books to create.',
+        )
+        parser.add_argument(
+            '--series',
+            type=int,
+            default=100,
+            help='The number of series to create.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='The seed of the random generator: the same seed generates the same catalog.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='The number of rows inserted per query.',
+        )
+
+    def handle(self, *args, **options):
+        seeder = CatalogSeeder(options['seed'], options['batch_size'], self.stdout)
+        counts = seeder.seed_catalog(options['books'], options['series'])
+        self.stdout.write(self.style.SUCCESS(f"{counts['books']} book(s) and {counts['series']} series created"))
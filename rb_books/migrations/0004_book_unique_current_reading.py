@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:12
+
+from django.db import migrations, models
+
+
+def keep_single_current_reading(apps, schema_editor):
+    """
+    Keeps the last created of the books flagged as currently read, so that the unique index can be created.
+    """
+    Book = apps.get_model('rb_books', 'Book')
+    current_ids = list(Book.objects.filter(current_reading=True).order_by('-pk').values_list('pk', flat=True))
+    Book.objects.filter(pk__in=current_ids[1:]).update(current_reading=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0003_remove_series_show_title_book_show_series_title_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_single_current_reading, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('current_reading', True)), fields=('current_reading',), name='unique_current_reading'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+import rb_books.expressions
+
+
+def fill_full_title(apps, schema_editor):
+    Book = apps.get_model('rb_books', 'Book')
+    Series = apps.get_model('rb_books', 'Series')
+    Volume = apps.get_model('rb_books', 'Volume')
+    Book.objects.update(full_title=rb_books.expressions.full_title_expression(Series, Volume))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0005_pendingfiledeletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='full_title',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=350, verbose_name='Titre complet'),
+        ),
+        migrations.RunPython(fill_full_title, migrations.RunPython.noop),
+    ]
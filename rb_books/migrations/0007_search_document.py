@@ -0,0 +1,78 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:21
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations
+
+import rb_books.expressions
+
+
+def fill_search_document(apps, schema_editor):
+    Book = apps.get_model('rb_books', 'Book')
+    Series = apps.get_model('rb_books', 'Series')
+    Book.objects.update(search_document=rb_books.expressions.search_document_expression(Book, 'full_title'))
+    Series.objects.update(search_document=rb_books.expressions.search_document_expression(Series, 'title'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0006_book_full_title'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        django.contrib.postgres.operations.UnaccentExtension(),
+        migrations.RunSQL(
+            sql=[
+                'CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french)',
+                'ALTER TEXT SEARCH CONFIGURATION french_unaccent '
+                'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem',
+            ],
+            reverse_sql='DROP TEXT SEARCH CONFIGURATION french_unaccent',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='author_first_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='author_last_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='book_search_document'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_title'], name='book_full_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='illustrator',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='illustrator_first_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='illustrator',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='illustrator_last_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='series_search_document'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='series_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0007_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='author_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-published_at', '-id'], name='book_published_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['title', 'id'], name='series_keyset'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audience',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='editor',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='illustrator',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='rating',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+        migrations.AddField(
+            model_name='volume',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date modification'),
+        ),
+    ]
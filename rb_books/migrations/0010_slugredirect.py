@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0009_modified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugRedirect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Modèle')),
+                ('old_slug', models.SlugField(max_length=150, verbose_name='Ancien slug')),
+                ('object_id', models.PositiveBigIntegerField(db_index=True, verbose_name='Objet')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date création')),
+            ],
+            options={
+                'verbose_name': 'Redirection de slug',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='slugredirect',
+            constraint=models.UniqueConstraint(fields=('model', 'old_slug'), name='unique_slug_redirect'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+import rb_books.richtext
+
+
+BOOK_RICH_TEXT_FIELDS = ['summary', 'quotation', 'opinion', 'short_opinion', 'about']
+BOOK_EXCERPT_SOURCE_FIELDS = ['short_opinion', 'opinion', 'summary']
+DERIVED_FIELDS = ['plain_text', 'excerpt', 'word_count', 'reading_time']
+BATCH_SIZE = 500
+
+
+def render_model(model, rich_text_fields, excerpt_source_fields):
+    update_fields = [f'{field}_html' for field in rich_text_fields] + DERIVED_FIELDS
+    batch = []
+    for obj in model.objects.only('pk', *rich_text_fields).iterator(chunk_size=BATCH_SIZE):
+        rb_books.richtext.render_text_fields(obj, rich_text_fields, excerpt_source_fields)
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_update(batch, update_fields)
+            batch = []
+    model.objects.bulk_update(batch, update_fields)
+
+
+def fill_rich_text_columns(apps, schema_editor):
+    render_model(apps.get_model('rb_books', 'Book'), BOOK_RICH_TEXT_FIELDS, BOOK_EXCERPT_SOURCE_FIELDS)
+    render_model(apps.get_model('rb_books', 'Series'), ['summary'], ['summary'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0010_slugredirect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='about_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Au sujet du livre (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Extrait'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='opinion_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Avis détaillé (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='plain_text',
+            field=models.TextField(blank=True, editable=False, verbose_name='Texte brut'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='quotation_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Citation (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Temps de lecture (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='short_opinion_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Avis résumé (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='summary_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Résumé (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de mots'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Extrait'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='plain_text',
+            field=models.TextField(blank=True, editable=False, verbose_name='Texte brut'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Temps de lecture (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='summary_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Résumé (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de mots'),
+        ),
+        migrations.RunPython(fill_rich_text_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import rb_books.aggregates
+
+
+def fill_series_aggregates(apps, schema_editor):
+    Book = apps.get_model('rb_books', 'Book')
+    Series = apps.get_model('rb_books', 'Series')
+    Series.objects.update(**rb_books.aggregates.series_aggregate_expressions(Book))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0011_rich_text_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='series',
+            name='average_rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Note moyenne'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='books_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Livres possédés'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='current_reading_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='En cours de lecture'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='incoming_reading_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Lectures à venir'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Dernière publication'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='next_unread_volume',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='rb_books.volume', verbose_name='Prochain tome à lire'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Chroniques publiées'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de notes'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='ratings_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Somme des notes'),
+        ),
+        migrations.RunPython(fill_series_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0012_series_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('incoming_reading', True)), fields=['created_at', 'id'], name='book_incoming_reading'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['series', 'volume'], name='book_series_volume'),
+        ),
+        # The composite index is created before the index of the series foreign key is dropped.
+        migrations.AlterField(
+            model_name='book',
+            name='series',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='rb_books.series', verbose_name='Saga'),
+        ),
+    ]
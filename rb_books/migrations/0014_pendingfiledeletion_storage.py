@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0013_index_pack'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingfiledeletion',
+            name='storage',
+            field=models.CharField(default='default', max_length=50, verbose_name='Stockage'),
+        ),
+        migrations.AlterField(
+            model_name='pendingfiledeletion',
+            name='name',
+            field=models.CharField(max_length=255, verbose_name='Fichier'),
+        ),
+        migrations.AddConstraint(
+            model_name='pendingfiledeletion',
+            constraint=models.UniqueConstraint(fields=('storage', 'name'), name='pending_file_deletion_unique_file'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0014_pendingfiledeletion_storage'),
+    ]
+
+    # The existing covers are served from their original upload until `manage.py generate_thumbnails` records their
+    # renditions.
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Miniatures générées'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Miniatures générées'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rb_books', '0015_cover_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('published', True)), fields=['modified_at'], name='book_published_modified_at'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['modified_at'], name='series_modified_at'),
+        ),
+    ]
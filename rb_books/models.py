@@ -1,41 +1,142 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
 from django.utils.html import mark_safe
 from django.templatetags.static import static
 
 from django_ckeditor_5.fields import CKEditor5Field
 
-from slugify import slugify
-
+from .richtext import EXCERPT_LENGTH, render_text_fields
+from .services import apply_reading_state_rules, is_current_reading_conflict
+from .slugs import allocate_slug
+from .thumbnails import get_srcset, get_thumbnail_url
 from .utils import dynamic_upload_img_path
 
 
 class SlugifiedModel(models.Model):
     """
-    A base class that provides slugification functionality for models.
+    A base class that provides slugification and field-level change tracking functionality for models.
     Attributes:
         FIELDS_TO_SLUGIFY (list): A list of fields to slugify.
+        SLUG_SOURCE_FIELDS (list): The fields `__str__()` depends on, used to know if the slug must be regenerated when
+        FIELDS_TO_SLUGIFY is empty. If both lists are empty, the slug is regenerated on every save.
     Fields:
         slug (SlugField): The slug field to store the slugified value.
+        modified_at (DateTimeField): The date and time of the last change, used as a change stamp by the conditional
+        GET of the API (see `rb_books.conditional`).
     Meta:
         abstract (bool): Specifies that this model is an abstract base class.
     Methods:
+        from_db(db, field_names, values): Snapshots the values loaded from the database.
+        has_changed(field): Checks if a field has changed since the instance was loaded or last saved.
+        changed_fields(): Returns the names of the fields that have changed.
+        get_initial_value(field): Returns the value of a field when the instance was loaded or last saved.
         _convert_fields_name_to_value(): Converts the values of fields specified in FIELDS_TO_SLUGIFY to strings and
         returns them as a list.
         _get_string_to_slugify(): Returns the string to slugify by joining the converted field values with space.
-        save(*args, **kwargs): Overrides the save method of the parent class to slugify the string and save it to the
-        slug field.
+        save(*args, **kwargs): Overrides the save method of the parent class to slugify the string and save a free slug
+        to the slug field.
+        _save_table(...): Writes only the changed columns of an existing row, including those set by `pre_save`.
     """
     FIELDS_TO_SLUGIFY = []
+    SLUG_SOURCE_FIELDS = []
 
     slug = models.SlugField(
         max_length=150,
         unique=True
     )
+    modified_at = models.DateTimeField(
+        verbose_name='Date modification',
+        auto_now=True
+    )
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from a database row and snapshots the loaded values.
+        Parameters:
+        - db: The alias of the database the row comes from.
+        - field_names: The names of the loaded fields.
+        - values: The loaded values, in the order of `field_names`.
+        Returns:
+        - SlugifiedModel: The loaded instance.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._snapshot()
+        return instance
+
+    @staticmethod
+    def _normalize_value(value):
+        """
+        Returns a comparable version of a field value: files are compared on their name.
+        """
+        return value.name if isinstance(value, FieldFile) else value
+
+    def _snapshot(self) -> dict:
+        """
+        Returns the current values of the loaded concrete fields, keyed by attname.
+        """
+        return {
+            field.attname: self._normalize_value(self.__dict__[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def get_initial_value(self, field: str):
+        """
+        Returns the value of a field when the instance was loaded from the database or last saved.
+        Parameters:
+        - field: The name or attname of the field.
+        Returns:
+        - The initial value of the field, or None for an unsaved instance.
+        """
+        attname = self._meta.get_field(field).attname
+        return getattr(self, '_loaded_values', {}).get(attname)
+
+    def has_changed(self, field: str) -> bool:
+        """
+        Checks if a field has changed since the instance was loaded from the database or last saved.
+        Parameters:
+        - field: The name or attname of the field.
+        Returns:
+        - bool: True if the field has changed, or if the instance has never been saved, False otherwise.
+        """
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is None:
+            return True
+        attname = self._meta.get_field(field).attname
+        if attname not in loaded_values:
+            return attname in self.__dict__
+        return self._normalize_value(getattr(self, attname)) != loaded_values[attname]
+
+    @property
+    def changed_fields(self) -> list[str]:
+        """
+        Returns the names of the concrete fields that have changed since the instance was loaded from the database or
+        last saved.
+        Returns:
+            list[str]: The names of the changed fields.
+        """
+        return [field.name for field in self._meta.concrete_fields if self.has_changed(field.name)]
+
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Reloads the fields from the database and updates the snapshot of the loaded values accordingly.
+        """
+        super().refresh_from_db(using=using, fields=fields)
+        if getattr(self, '_loaded_values', None) is not None:
+            attnames = None if fields is None else {self._meta.get_field(field).attname for field in fields}
+            self._loaded_values.update({
+                attname: value for attname, value in self._snapshot().items()
+                if attnames is None or attname in attnames
+            })
+
     def _convert_fields_name_to_value(self) -> list[str]:
         """
         Method Name: _convert_fields_name_to_value
@@ -65,19 +166,68 @@ class SlugifiedModel(models.Model):
             return self.__str__()
         return " ".join(self._convert_fields_name_to_value())
 
+    def _slug_needs_update(self) -> bool:
+        """
+        Checks if the slug must be regenerated, i.e. if the object has no slug yet or if one of the fields the slug is
+        computed from has changed.
+        Returns:
+            bool: True if the slug must be regenerated, False otherwise.
+        """
+        source_fields = self.FIELDS_TO_SLUGIFY or self.SLUG_SOURCE_FIELDS
+        if not self.slug or not source_fields:
+            return True
+        return any(self.has_changed(field) for field in source_fields)
+
+    def _get_update_fields(self):
+        """
+        Returns the fields to write when saving an instance loaded from the database: the changed fields and the
+        `auto_now` fields. Returns None, i.e. all the fields, for a new instance, and an empty list, i.e. no query at
+        all, when nothing has changed, so that `modified_at` is only bumped by actual changes.
+        """
+        if self._state.adding or self.pk is None or getattr(self, '_loaded_values', None) is None:
+            return None
+        if not self.changed_fields:
+            return []
+        auto_now_fields = [
+            field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+        ]
+        return self.changed_fields + [field for field in auto_now_fields if field not in self.changed_fields]
+
     def save(self, *args, **kwargs):
         """
         Save method.
         Sets the slug attribute of the object by slugifying the string obtained from `_get_string_to_slugify()` method
-        and then calls the `save()` method of the superclass.
+        when the source fields have changed, with a numeric suffix if another object already uses it (see
+        `rb_books.slugs.allocate_slug()`), and then calls the `save()` method of the superclass. When no
+        `update_fields` is given, an instance loaded from the database only writes its changed columns (see
+        `_save_table()`).
         Parameters:
         - *args: Variable length argument list.
         - **kwargs: Arbitrary keyword arguments.
         Returns:
         - None.
         """
-        self.slug = slugify(self._get_string_to_slugify())
-        return super().save(*args, **kwargs)
+        if self._slug_needs_update():
+            self.slug = allocate_slug(type(self), self._get_string_to_slugify(), self.slug, self.pk)
+        result = super().save(*args, **kwargs)
+        self._loaded_values = self._snapshot()
+        return result
+
+    def _save_table(self, raw=False, cls=None, force_insert=False, force_update=False, using=None,
+                    update_fields=None):
+        """
+        Writes the row of the instance. When no `update_fields` is given, an instance loaded from the database only
+        writes its changed columns, computed here rather than in `save()`, i.e. after the `pre_save` signal, so that
+        the fields set by its receivers are written too. When nothing has changed, no query is run, but the signals
+        are sent as for any save.
+        Returns:
+        - bool: True if an existing row was updated, False if a row was inserted.
+        """
+        if update_fields is None and not (raw or force_insert):
+            update_fields = self._get_update_fields()
+            if update_fields == []:
+                return True
+        return super()._save_table(raw, cls, force_insert, force_update, using, update_fields)
 
 
 class Volume(SlugifiedModel):
@@ -94,6 +244,8 @@ class Volume(SlugifiedModel):
         volume = Volume(label='Volume 1', index=1.0)
         print(volume)  # Output: 'Volume 1'
     """
+    SLUG_SOURCE_FIELDS = ['label']
+
     label = models.CharField(
         verbose_name='Label',
         max_length=15,
@@ -122,6 +274,8 @@ class Author(SlugifiedModel):
         __str__(): Returns a string representation of the author.
         full_name(): Returns the full name of the author.
     """
+    SLUG_SOURCE_FIELDS = ['first_name', 'last_name']
+
     first_name = models.CharField(
         verbose_name='Prénom',
         max_length=50
@@ -133,6 +287,11 @@ class Author(SlugifiedModel):
 
     class Meta:
         verbose_name = 'Auteur'
+        indexes = [
+            GinIndex(fields=['first_name'], opclasses=['gin_trgm_ops'], name='author_first_name_trgm'),
+            GinIndex(fields=['last_name'], opclasses=['gin_trgm_ops'], name='author_last_name_trgm'),
+            models.Index(fields=['last_name', 'first_name', 'id'], name='author_keyset'),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -160,6 +319,8 @@ class Illustrator(SlugifiedModel):
         __str__(): Returns a string representation of the object.
         full_name(): Returns the full name of the illustrator.
     """
+    SLUG_SOURCE_FIELDS = ['first_name', 'last_name']
+
     first_name = models.CharField(
         verbose_name='Prénom',
         max_length=50
@@ -171,6 +332,10 @@ class Illustrator(SlugifiedModel):
 
     class Meta:
         verbose_name = 'Illustrateur'
+        indexes = [
+            GinIndex(fields=['first_name'], opclasses=['gin_trgm_ops'], name='illustrator_first_name_trgm'),
+            GinIndex(fields=['last_name'], opclasses=['gin_trgm_ops'], name='illustrator_last_name_trgm'),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -199,6 +364,8 @@ class Editor(SlugifiedModel):
     Inherited Methods:
         - All methods inherited from the SlugifiedModel base class.
     """
+    SLUG_SOURCE_FIELDS = ['name']
+
     name = models.CharField(
         verbose_name='Nom',
         max_length=150,
@@ -223,6 +390,8 @@ class Audience(SlugifiedModel):
     Methods:
         __str__(): Returns the capitalized label of the audience.
     """
+    SLUG_SOURCE_FIELDS = ['label']
+
     label = models.CharField(
         verbose_name='Label',
         max_length=50,
@@ -261,6 +430,8 @@ class Genre(SlugifiedModel):
     Methods:
         __str__(): Returns the capitalized label of the genre.
     """
+    SLUG_SOURCE_FIELDS = ['label']
+
     label = models.CharField(
         verbose_name='Label',
         max_length=50,
@@ -304,6 +475,8 @@ class Rating(SlugifiedModel):
     - __str__(): Returns the capitalized label of the rating as a string.
 
     """
+    SLUG_SOURCE_FIELDS = ['rating']
+
     label = models.CharField(
         verbose_name='Label',
         max_length=150
@@ -342,6 +515,8 @@ class Category(SlugifiedModel):
         __str__(): Returns the capitalized label of the category.
 
     """
+    SLUG_SOURCE_FIELDS = ['label']
+
     label = models.CharField(
         verbose_name='Label',
         max_length=50,
@@ -374,7 +549,19 @@ class BookBase(SlugifiedModel):
     book.
     - `summary`: A `TextField` that stores the summary of the book.
     - `image`: An `ImageField` that stores the cover image of the book.
+    - `has_renditions`: A `BooleanField` telling whether the renditions of the cover have been generated (see
+    `rb_books.thumbnails`). It is reset when the cover changes and set once they are, the original upload being
+    served meanwhile.
+    - `search_document`: A `SearchVectorField` that stores the full-text search document of the book, kept up to date
+    by the signals of `rb_books.signals` (see `rb_books.search`). Its title part is read from the `SEARCH_TITLE_FIELD`
+    field of the concrete model.
+    - `summary_html`, `plain_text`, `excerpt`, `word_count` and `reading_time`: The sanitized HTML of the summary, and
+    the plain text, the excerpt, the number of words and the reading time in minutes of the CKEditor fields listed by
+    `RICH_TEXT_FIELDS`. They are computed by `save()` when one of these fields has changed, so that the pages, the API
+    and the feeds never parse nor sanitize HTML (see `rb_books.richtext`).
     Methods:
+    - `render_text_fields()`: Computes the derived columns of the CKEditor fields.
+    - `get_text_derived_fields()`: Returns the names of the derived columns of the CKEditor fields.
     - `img_preview()`: Returns an HTML string containing an `img` tag with the URL of the book's cover image. If the
     book doesn't have a cover image, a default image URL is used.
     Note: This is an abstract class and should not be instantiated directly.
@@ -432,21 +619,100 @@ class BookBase(SlugifiedModel):
         null=True,
         blank=True
     )
+    has_renditions = models.BooleanField(
+        verbose_name='Miniatures générées',
+        default=False,
+        editable=False
+    )
+    search_document = SearchVectorField(
+        null=True,
+        editable=False
+    )
+    summary_html = models.TextField(
+        verbose_name='Résumé (HTML)',
+        blank=True,
+        editable=False
+    )
+    plain_text = models.TextField(
+        verbose_name='Texte brut',
+        blank=True,
+        editable=False
+    )
+    excerpt = models.CharField(
+        verbose_name='Extrait',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False
+    )
+    word_count = models.PositiveIntegerField(
+        verbose_name='Nombre de mots',
+        default=0,
+        editable=False
+    )
+    reading_time = models.PositiveIntegerField(
+        verbose_name='Temps de lecture (minutes)',
+        default=0,
+        editable=False
+    )
+
+    RICH_TEXT_FIELDS = ['summary']
+    EXCERPT_SOURCE_FIELDS = ['summary']
 
     class Meta:
         abstract = True
 
+    def render_text_fields(self):
+        """
+        Computes the sanitized HTML of each field of `RICH_TEXT_FIELDS`, stored in its `<field>_html` column, and the
+        plain text, the excerpt, taken from the first non-empty field of `EXCERPT_SOURCE_FIELDS`, the number of words
+        and the reading time of all of them.
+        """
+        render_text_fields(self, self.RICH_TEXT_FIELDS, self.EXCERPT_SOURCE_FIELDS)
+
+    def get_text_derived_fields(self) -> list[str]:
+        """
+        Returns the names of the derived columns computed by `render_text_fields()`.
+        """
+        html_fields = [f'{field}_html' for field in self.RICH_TEXT_FIELDS]
+        return html_fields + ['plain_text', 'excerpt', 'word_count', 'reading_time']
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the object, after computing the derived columns of the CKEditor fields when one of them has changed, so
+        that they are written along with the changed fields, including when `update_fields` only lists the CKEditor
+        fields. A new cover is served as uploaded until its renditions are generated.
+        """
+        update_fields = kwargs.get('update_fields')
+        if any(self.has_changed(field) for field in self.RICH_TEXT_FIELDS):
+            self.render_text_fields()
+            if update_fields is not None and set(update_fields) & set(self.RICH_TEXT_FIELDS):
+                kwargs['update_fields'] = [*update_fields, *(
+                    field for field in self.get_text_derived_fields() if field not in update_fields
+                )]
+        if self.has_changed('image'):
+            self.has_renditions = False
+        return super().save(*args, **kwargs)
+
     def img_preview(self):
         """
         Generates an HTML code for displaying an image preview.
         Parameters:
         self (object): The current instance of the class.
         Returns:
-        str: HTML code for displaying the image preview.
+        str: HTML code for displaying the image preview, lazily loaded. The cover is served from its pre-generated
+        WebP and JPEG renditions (see `rb_books.thumbnails`) rather than from the original upload, once they exist.
         """
-        image_url = self.image.url if self.image else static('/img/empty-book.jpg')
-        return mark_safe(f'<img src = "{image_url}" width = "100" />')
-
+        if not self.image:
+            return mark_safe(f'<img src = "{static("/img/empty-book.jpg")}" width = "100" loading = "lazy" />')
+        if not self.has_renditions:
+            return mark_safe(f'<img src = "{self.image.url}" width = "100" loading = "lazy" />')
+        return mark_safe(
+            f'<picture>'
+            f'<source type = "image/webp" srcset = "{get_srcset(self.image, "webp")}" sizes = "100px" />'
+            f'<img src = "{get_thumbnail_url(self.image, 100)}" srcset = "{get_srcset(self.image, "jpg")}" '
+            f'sizes = "100px" width = "100" loading = "lazy" />'
+            f'</picture>'
+        )
 
 
 class Series(BookBase):
@@ -457,6 +723,13 @@ class Series(BookBase):
         volumes_count (PositiveIntegerField): The number of volumes in the series. Can be null or blank.
         complete (BooleanField): Indicates if the series is complete or not. Default is False.
         show_title (BooleanField): Indicates if the title should be shown or not. Default is True.
+        books_count, published_count, current_reading_count, incoming_reading_count (PositiveIntegerField): The
+        number of books of the series owned, published, currently read and incoming.
+        ratings_count, ratings_sum, average_rating: The number, the sum and the average of the ratings of its books.
+        last_published_at (DateTimeField): The publication date of its last published book.
+        next_unread_volume (ForeignKey): The first volume, by index, of its books not published yet.
+        These aggregates are maintained by delta UPDATEs when a book joins, leaves or changes state (see
+        `rb_books.aggregates`), so that the series listings never aggregate the books.
 
     Meta:
         verbose_name (str): The verbose name for the series.
@@ -465,6 +738,9 @@ class Series(BookBase):
         __str__(): Returns the string representation of the series.
 
     """
+    SLUG_SOURCE_FIELDS = ['title']
+    SEARCH_TITLE_FIELD = 'title'
+
     volumes_count = models.PositiveIntegerField(
         verbose_name='Nombre de volumes',
         null=True,
@@ -474,9 +750,67 @@ class Series(BookBase):
         verbose_name='Collection complète',
         default=False
     )
+    books_count = models.PositiveIntegerField(
+        verbose_name='Livres possédés',
+        default=0,
+        editable=False
+    )
+    published_count = models.PositiveIntegerField(
+        verbose_name='Chroniques publiées',
+        default=0,
+        editable=False
+    )
+    current_reading_count = models.PositiveIntegerField(
+        verbose_name='En cours de lecture',
+        default=0,
+        editable=False
+    )
+    incoming_reading_count = models.PositiveIntegerField(
+        verbose_name='Lectures à venir',
+        default=0,
+        editable=False
+    )
+    ratings_count = models.PositiveIntegerField(
+        verbose_name='Nombre de notes',
+        default=0,
+        editable=False
+    )
+    ratings_sum = models.PositiveIntegerField(
+        verbose_name='Somme des notes',
+        default=0,
+        editable=False
+    )
+    average_rating = models.FloatField(
+        verbose_name='Note moyenne',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    last_published_at = models.DateTimeField(
+        verbose_name='Dernière publication',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    next_unread_volume = models.ForeignKey(
+        Volume,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        editable=False,
+        verbose_name='Prochain tome à lire'
+    )
 
     class Meta:
         verbose_name = 'Saga'
+        indexes = [
+            GinIndex(fields=['search_document'], name='series_search_document'),
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='series_title_trgm'),
+            models.Index(fields=['title', 'id'], name='series_keyset'),
+            # Serves the change stamp of the series list, see `rb_books.conditional.get_change_stamps()`.
+            models.Index(fields=['modified_at'], name='series_modified_at'),
+        ]
 
     def __str__(self):
         return self.title
@@ -503,6 +837,10 @@ class Book(BookBase):
         published_at (datetime): The date and time when the book was published.
         current_reading (bool): Whether the book is currently being read.
         incoming_reading (bool): Whether the book is in the reading list.
+        full_title (char): The full title of the book, stored and indexed. It is kept up to date by `save()`, and by
+        the signals of `rb_books.signals` when the title of its series or the label of its volume changes.
+        quotation_html, opinion_html, short_opinion_html, about_html (text): The sanitized HTML of the CKEditor
+        fields, see `BookBase`. The excerpt is taken from the short opinion, or else the opinion or the summary.
 
     Methods:
         __str__(): Returns the full title of the book.
@@ -510,10 +848,15 @@ class Book(BookBase):
         save(*args, **kwargs): Saves the book to the database.
         title_is_empty() -> bool: Checks if the title of the book is empty.
         _get_title_parts(): Returns a list of title parts for constructing the full title.
-        full_title(): Returns the full title of the book.
+        get_full_title(): Computes the full title of the book.
         belongs_to_series(): Checks if the book belongs to a series.
         _match_collection_attributes(): Matches the collection attributes of the book with the series attributes.
     """
+    SLUG_SOURCE_FIELDS = ['title', 'series', 'volume', 'show_series_title']
+    SEARCH_TITLE_FIELD = 'full_title'
+    RICH_TEXT_FIELDS = ['summary', 'quotation', 'opinion', 'short_opinion', 'about']
+    EXCERPT_SOURCE_FIELDS = ['short_opinion', 'opinion', 'summary']
+
     title = models.CharField(
         verbose_name='Titre',
         max_length=150,
@@ -525,7 +868,8 @@ class Book(BookBase):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        verbose_name='Saga'
+        verbose_name='Saga',
+        db_index=False
     )
     volume = models.ForeignKey(
         Volume,
@@ -573,14 +917,30 @@ class Book(BookBase):
         null=True,
         blank=True,
     )
+    quotation_html = models.TextField(
+        verbose_name='Citation (HTML)',
+        blank=True,
+        editable=False
+    )
+    opinion_html = models.TextField(
+        verbose_name='Avis détaillé (HTML)',
+        blank=True,
+        editable=False
+    )
+    short_opinion_html = models.TextField(
+        verbose_name='Avis résumé (HTML)',
+        blank=True,
+        editable=False
+    )
+    about_html = models.TextField(
+        verbose_name='Au sujet du livre (HTML)',
+        blank=True,
+        editable=False
+    )
     created_at = models.DateTimeField(
         verbose_name='Date création',
         auto_now_add=True
     )
-    modified_at = models.DateTimeField(
-        verbose_name='Date modification',
-        auto_now=True
-    )
     published = models.BooleanField(
         verbose_name='Publié',
         default=False
@@ -606,9 +966,42 @@ class Book(BookBase):
         verbose_name='Afficher tome',
         default=True
     )
+    full_title = models.CharField(
+        verbose_name='Titre complet',
+        max_length=350,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
 
     class Meta:
         verbose_name = 'Livre'
+        indexes = [
+            GinIndex(fields=['search_document'], name='book_search_document'),
+            GinIndex(fields=['full_title'], opclasses=['gin_trgm_ops'], name='book_full_title_trgm'),
+            models.Index(
+                fields=['-published_at', '-id'],
+                condition=models.Q(published=True),
+                name='book_published_keyset',
+            ),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(incoming_reading=True),
+                name='book_incoming_reading',
+            ),
+            # Serves the change stamp of the published books, see `rb_books.conditional.get_change_stamps()`: their
+            # count and latest `modified_at` are read from this index rather than from the table.
+            models.Index(fields=['modified_at'], condition=models.Q(published=True), name='book_published_modified_at'),
+            # Also serves the lookups on the series alone, so that the series foreign key has no index of its own.
+            models.Index(fields=['series', 'volume'], name='book_series_volume'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['current_reading'],
+                condition=models.Q(current_reading=True),
+                name='unique_current_reading',
+            ),
+        ]
 
     def __str__(self):
         """
@@ -622,8 +1015,9 @@ class Book(BookBase):
         Example:
             obj = MyClass()
             print(obj.__str__())  # Prints the string representation of obj
+        Note: The stored `full_title` is used, so no query is run to fetch the series and the volume.
         """
-        return self.full_title
+        return self.full_title or self.get_full_title()
 
     def clean(self):
         """
@@ -634,19 +1028,19 @@ class Book(BookBase):
         Returns:
             The cleaned form data after validation.
         """
-        if self.volume is None and self.series is not None:
+        if self.volume_id is None and self.series_id is not None:
             raise ValidationError('Un livre ne peut pas appartenir à une saga sans avoir un numéro de tome.')
-        elif self.volume is not None and self.series is None:
+        elif self.volume_id is not None and self.series_id is None:
             raise ValidationError('Un livre ne peut pas être un tome sans appartenir à une saga.')
         return super().clean()
 
     def save(self, *args, **kwargs):
         """
         Save the object to the database.
-        This method saves the object to the database. If the object belongs to a series, it calls the
-        `_match_collection_attributes` method to match the collection attributes. Then, it cleans
-        * the object using the `clean` method. Finally, it calls the `save` method of the superclass to save the object
-         to the database.
+        This method cleans the object using the `clean` method, applies the reading state rules and refreshes the
+        stored full title when one of its parts has changed. Then, it calls the `save` method of the superclass to save
+        the object to the database, inside a transaction so that the release of the previous current reading done by
+        the `pre_save` signal is committed or rolled back together with this save.
         Parameters:
             *args: Optional arguments.
             **kwargs: Optional keyword arguments.
@@ -656,7 +1050,19 @@ class Book(BookBase):
             save()
         """
         self.clean()
-        return super().save(*args, **kwargs)
+        apply_reading_state_rules(self)
+        if any(self.has_changed(field) for field in self.SLUG_SOURCE_FIELDS):
+            self.full_title = self.get_full_title()
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as error:
+                if not (self.current_reading and is_current_reading_conflict(error)):
+                    raise
+            # A concurrent transition flagged another book between the release of the previous current reading and
+            # this save, and has committed since: saving again releases it, as if both transitions were serialized.
+            return super().save(*args, **kwargs)
 
     @property
     def title_is_empty(self) -> bool:
@@ -683,10 +1089,10 @@ class Book(BookBase):
             return [self.series.title, self.volume.label, self.title]
         return [self.title, self.volume.label] if self.belongs_to_series else [self.title]
 
-    @property
-    def full_title(self):
+    def get_full_title(self):
         """
-        Returns the full title of the object.
+        Computes the full title of the object. Use the stored `full_title` field to read it without fetching the
+        series and the volume.
         Returns:
             str: The full title of the object, composed by joining non-None parts with a hyphen.
         Example:
@@ -716,3 +1122,94 @@ class Book(BookBase):
 
         """
         return self.series is not None
+
+
+class PendingFileDeletion(models.Model):
+    """
+    A file whose deletion failed and must be retried.
+    Attributes:
+        storage (CharField): The alias of the storage of the file in `settings.STORAGES`.
+        name (CharField): The name of the file in its storage.
+        attempts (PositiveIntegerField): The number of failed deletion attempts.
+        last_error (TextField): The error raised by the last attempt.
+        created_at (datetime): The date and time when the deletion was first attempted.
+        next_attempt_at (datetime): The date and time from which the deletion can be retried.
+    Meta:
+        verbose_name (str): The verbose name of the pending file deletion.
+    Note: The deletions are processed by `rb_books.files`, see `delete_pending_files()`.
+    """
+    storage = models.CharField(
+        verbose_name='Stockage',
+        max_length=50,
+        default='default'
+    )
+    name = models.CharField(
+        verbose_name='Fichier',
+        max_length=255
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Tentatives',
+        default=0
+    )
+    last_error = models.TextField(
+        verbose_name='Dernière erreur',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Date création',
+        auto_now_add=True
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Prochaine tentative',
+        default=timezone.now,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Fichier à supprimer'
+        constraints = [
+            models.UniqueConstraint(fields=['storage', 'name'], name='pending_file_deletion_unique_file'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class SlugRedirect(models.Model):
+    """
+    A former slug of an object, kept so that its old URLs redirect to the current one.
+    Attributes:
+        model (CharField): The label of the model of the object, e.g. `rb_books.book`.
+        old_slug (SlugField): The former slug.
+        object_id (PositiveBigIntegerField): The primary key of the object.
+        created_at (datetime): The date and time when the slug was replaced.
+    Meta:
+        verbose_name (str): The verbose name of the slug redirect.
+        constraints: A former slug redirects to a single object of a model, and is looked up by the unique index.
+    Note: The redirects are recorded by `rb_books.signals` and followed by `rb_books.views`, see `resolve_slug()`.
+    """
+    model = models.CharField(
+        verbose_name='Modèle',
+        max_length=100
+    )
+    old_slug = models.SlugField(
+        verbose_name='Ancien slug',
+        max_length=150
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name='Objet',
+        db_index=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Date création',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Redirection de slug'
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'old_slug'], name='unique_slug_redirect'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}: {self.old_slug}'
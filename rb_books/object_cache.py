@@ -0,0 +1,164 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_CACHE_ALIAS = 'default'
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+KEY_PREFIX = 'rb_books:object'
+
+
+def get_cache():
+    """
+    Returns the cache of the objects, `settings.OBJECT_CACHE_ALIAS`. The settings of the object cache are read on every
+    call, so that they can be overridden.
+    """
+    return caches[getattr(settings, 'OBJECT_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+
+def get_cache_timeout() -> int:
+    """
+    Returns the lifetime of the cached objects, in seconds, `settings.OBJECT_CACHE_TIMEOUT`.
+    """
+    return getattr(settings, 'OBJECT_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+def _get_version_key(model) -> str:
+    return f'{KEY_PREFIX}:{model._meta.label_lower}:version'
+
+
+def get_version(model) -> str:
+    """
+    Returns the current version of the namespace of a model, creating it if needed.
+    Notes:
+    Versions are random rather than incremented, so that a version evicted from the cache and created again can never
+    bring back the entries stored under the previous one.
+    """
+    cache = get_cache()
+    key = _get_version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(model) -> str:
+    """
+    Asynchronous version of `get_version()`.
+    """
+    cache = get_cache()
+    key = _get_version_key(model)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(model):
+    """
+    Invalidates all the cached objects of a model at once, by moving its namespace to a new version. The entries of
+    the previous version are left to expire.
+    Parameters:
+    - model: The model class, `Book` or `Series`.
+    Returns:
+    - None
+    """
+    get_cache().set(_get_version_key(model), uuid.uuid4().hex, None)
+
+
+def _get_object_key(model, version, pk) -> str:
+    return f'{KEY_PREFIX}:{model._meta.label_lower}:{version}:{pk}'
+
+
+def get_validators(obj) -> tuple[str, object]:
+    """
+    Returns the validators of an object hydrated with its related objects, derived from the data only, so that they
+    are the same in every process and whenever the object is cached again while unchanged.
+    Parameters:
+    - obj: The object, with its related objects joined or prefetched.
+    Returns:
+    - tuple[str, datetime | None]: The `ETag`, a hash of the primary key and `modified_at` of the object and of its
+    related objects, and the `Last-Modified`, the latest of these `modified_at`.
+    Notes:
+    A related object added, removed or deleted changes the `ETag`, since its primary key is part of it.
+    """
+    related = [value for value in obj._state.fields_cache.values() if value is not None]
+    for prefetched in getattr(obj, '_prefetched_objects_cache', {}).values():
+        related.extend(prefetched)
+    stamps = sorted(
+        (value._meta.label_lower, value.pk, getattr(value, 'modified_at', None)) for value in related
+    )
+    stamps.insert(0, (obj._meta.label_lower, obj.pk, obj.modified_at))
+    etag = hashlib.md5(repr(stamps).encode(), usedforsecurity=False).hexdigest()
+    return etag, max((stamp for _, _, stamp in stamps if stamp is not None), default=None)
+
+
+def _build_entry(obj) -> dict:
+    etag, last_modified = get_validators(obj)
+    return {'object': obj, 'token': uuid.uuid4().hex, 'etag': etag, 'last_modified': last_modified}
+
+
+def get_cached_entry(queryset, pk) -> dict:
+    """
+    Returns the cache entry of an object, loading it from the database and storing it when it is not cached yet
+    (read-through).
+    Parameters:
+    - queryset: The queryset loading the object with its related objects joined and prefetched. The entries being
+    keyed by model and primary key only, a model must always be cached through the same queryset, see
+    `rb_books.views.get_cached_book()`.
+    - pk: The primary key of the object.
+    Returns:
+    - dict: The hydrated instance (`object`), a `token` identifying this entry, which changes each time the entry is
+    stored again, and the `etag` and `last_modified` validators of the object, see `get_validators()`.
+    Raises:
+        DoesNotExist: If the object does not exist in the queryset. Missing objects are not cached.
+    """
+    model = queryset.model
+    key = _get_object_key(model, get_version(model), pk)
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is None:
+        entry = _build_entry(queryset.get(pk=pk))
+        cache.set(key, entry, get_cache_timeout())
+    return entry
+
+
+async def aget_cached_entry(queryset, pk) -> dict:
+    """
+    Asynchronous version of `get_cached_entry()`, for the async views: the cache is read and written with the async
+    cache methods, and the object loaded with the async ORM.
+    """
+    model = queryset.model
+    key = _get_object_key(model, await aget_version(model), pk)
+    cache = get_cache()
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = _build_entry(await queryset.aget(pk=pk))
+        await cache.aset(key, entry, get_cache_timeout())
+    return entry
+
+
+def get_cached_object(queryset, pk):
+    """
+    Returns an object from the cache, loading it from the database when it is not cached yet. See
+    `get_cached_entry()`.
+    """
+    return get_cached_entry(queryset, pk)['object']
+
+
+def invalidate_objects(model, pks):
+    """
+    Removes the cached entries of some objects.
+    Parameters:
+    - model: The model class, `Book` or `Series`.
+    - pks: The primary keys of the objects.
+    Returns:
+    - None
+    """
+    version = get_version(model)
+    get_cache().delete_many([_get_object_key(model, version, pk) for pk in pks])
@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _encode_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class RowValue(models.Func):
+    """
+    SQL row value constructor, e.g. `(published_at, id)`, used to compare several columns at once:
+    `(published_at, id) < (a, b)` can start an index range scan, unlike the equivalent OR conditions.
+    """
+    template = '(%(expressions)s)'
+    output_field = models.Field()
+
+
+class InvalidCursor(Exception):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset on a unique ordering with a cursor holding the ordering values of the last row of the previous
+    page, instead of an OFFSET: a deep page costs the same as the first one, as long as an index covers the ordering.
+    Attributes:
+        ordering (list[str]): The ordering fields, e.g. `['-published_at', '-id']`. The last one must be unique.
+        page_size (int): The default number of rows per page.
+    Methods:
+        encode_cursor(obj): Returns the cursor pointing after an object.
+        decode_cursor(cursor): Returns the ordering values held by a cursor.
+        paginate(queryset, cursor, page_size): Returns a page of objects and the cursor of the next page.
+        apaginate(queryset, cursor, page_size): Asynchronous version of `paginate()`, for the async views.
+    Usage:
+        paginator = KeysetPaginator(['-published_at', '-id'])
+        books, next_cursor = paginator.paginate(Book.objects.all(), request.GET.get('cursor'))
+    """
+
+    def __init__(self, ordering, page_size=DEFAULT_PAGE_SIZE):
+        self.ordering = ordering
+        self.page_size = page_size
+
+    @property
+    def fields(self) -> list[str]:
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj) -> str:
+        """
+        Returns the cursor pointing after an object, i.e. its ordering values encoded in URL-safe base64 JSON. Dates
+        keep their microseconds, which `DjangoJSONEncoder` would truncate.
+        """
+        values = [getattr(obj, field) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values, default=_encode_value).encode()).decode()
+
+    def decode_cursor(self, model, cursor: str) -> list:
+        """
+        Returns the ordering values held by a cursor, converted to the types of the fields of `model`.
+        Raises:
+            InvalidCursor: If the cursor is malformed, e.g. if it holds lists or objects instead of scalar values.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            if any(isinstance(value, (list, dict)) for value in values):
+                raise InvalidCursor(cursor)
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, TypeError, ValueError, ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+
+    def _filter_after(self, queryset, values):
+        """
+        Returns the rows of a queryset after the given ordering values, e.g. for `['-published_at', '-id']`:
+        `(published_at, id) < (a, b)`. When the ordering mixes ascending and descending fields, the equivalent
+        `published_at < a OR (published_at = a AND id > b)` conditions are used.
+        """
+        directions = {ordering_field.startswith('-') for ordering_field in self.ordering}
+        if len(directions) == 1:
+            lookup = 'lt' if directions.pop() else 'gt'
+            return queryset.alias(keyset=RowValue(*self.fields)).filter(**{
+                f'keyset__{lookup}': RowValue(*[models.Value(value) for value in values])
+            })
+        condition = Q()
+        for index, ordering_field in enumerate(self.ordering):
+            field = ordering_field.lstrip('-')
+            lookup = 'lt' if ordering_field.startswith('-') else 'gt'
+            equalities = {previous: value for previous, value in zip(self.fields[:index], values)}
+            condition |= Q(**equalities, **{f'{field}__{lookup}': values[index]})
+        return queryset.filter(condition)
+
+    def paginate(self, queryset, cursor=None, page_size=None):
+        """
+        Returns a page of objects and the cursor of the next page.
+        Parameters:
+        - queryset: The queryset to paginate. Its ordering is replaced by `ordering`.
+        - cursor: The cursor returned with the previous page, None for the first page.
+        - page_size: The number of objects per page, capped to `MAX_PAGE_SIZE`. Defaults to `page_size`.
+        Returns:
+        - tuple[list, str | None]: The objects of the page, and the cursor of the next page or None for the last page.
+        Raises:
+            InvalidCursor: If the cursor is malformed.
+        """
+        page_size = min(page_size or self.page_size, MAX_PAGE_SIZE)
+        objects = list(self._get_page_queryset(queryset, cursor, page_size))
+        return self._split_page(objects, page_size)
+
+    async def apaginate(self, queryset, cursor=None, page_size=None):
+        """
+        Asynchronous version of `paginate()`, fetching the page with the async ORM.
+        """
+        page_size = min(page_size or self.page_size, MAX_PAGE_SIZE)
+        objects = [obj async for obj in self._get_page_queryset(queryset, cursor, page_size)]
+        return self._split_page(objects, page_size)
+
+    def _get_page_queryset(self, queryset, cursor, page_size):
+        """
+        Returns the queryset of a page, with one more row than the page size, telling whether there is a next page.
+        """
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = self._filter_after(queryset, self.decode_cursor(queryset.model, cursor))
+        return queryset[:page_size + 1]
+
+    def _split_page(self, objects, page_size):
+        if len(objects) > page_size:
+            objects = objects[:page_size]
+            return objects, self.encode_cursor(objects[-1])
+        return objects, None
@@ -0,0 +1,233 @@
+import logging
+import os
+import re
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = getattr(settings, 'QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 5)
+
+PROFILE_HEADER = 'X-Query-Profile'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Returns a statement with its literals and parameters replaced by `?` and its `IN` lists collapsed, so that the
+    statements only differing by their values are grouped together.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def get_caller() -> str:
+    """
+    Returns the innermost frame of the project code in the current stack, e.g. `rb_books/admin.py:120 in get_authors`,
+    skipping the frames of Django, of the installed packages and of this module.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if (
+            filename.startswith(_PROJECT_DIR)
+            and 'site-packages' not in filename
+            and filename != __file__
+        ):
+            return f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryProfiler:
+    """
+    Records the SQL queries run on every database connection while it is active.
+    Attributes:
+        queries (list[dict]): The recorded queries: their `sql`, normalized SQL (`statement`), `duration` in
+        milliseconds and the frame of the project code which issued them (`caller`).
+        n_plus_one_threshold (int): The number of identical statements issued from the same frame from which they are
+        reported as an N+1 pattern.
+    Methods:
+        summary(): Returns the count, the total time, the duplicated statements and the N+1 suspects.
+    Usage:
+        with QueryProfiler() as profiler:
+            list(Book.objects.all())
+        print(profiler.summary())
+    """
+
+    def __init__(self, n_plus_one_threshold=QUERY_PROFILER_N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = []
+        self._exit_stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'statement': normalize_sql(sql),
+                'duration': (time.perf_counter() - start) * 1000,
+                'caller': get_caller(),
+            })
+
+    def __enter__(self):
+        self._exit_stack = ExitStack()
+        for connection in connections.all():
+            self._exit_stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._exit_stack.close()
+
+    def summary(self) -> dict:
+        """
+        Returns the summary of the recorded queries.
+        Returns:
+        - dict: The number of queries (`count`), their total duration in milliseconds (`total_ms`), the statements run
+        more than once (`duplicates`) and the statements run at least `n_plus_one_threshold` times from the same frame
+        (`n_plus_one`), each with its `count`, `total_ms` and `callers`, by descending count.
+        """
+        by_statement = defaultdict(list)
+        for query in self.queries:
+            by_statement[query['statement']].append(query)
+
+        duplicates, n_plus_one = [], []
+        for statement, queries in by_statement.items():
+            if len(queries) < 2:
+                continue
+            callers = defaultdict(int)
+            for query in queries:
+                callers[query['caller']] += 1
+            group = {
+                'statement': statement,
+                'count': len(queries),
+                'total_ms': round(sum(query['duration'] for query in queries), 3),
+                'callers': dict(callers),
+            }
+            duplicates.append(group)
+            if max(callers.values()) >= self.n_plus_one_threshold:
+                n_plus_one.append(group)
+
+        return {
+            'count': len(self.queries),
+            'total_ms': round(sum(query['duration'] for query in self.queries), 3),
+            'duplicates': sorted(duplicates, key=lambda group: -group['count']),
+            'n_plus_one': sorted(n_plus_one, key=lambda group: -group['count']),
+        }
+
+
+def format_summary(summary) -> str:
+    """
+    Returns a human-readable report of a `QueryProfiler.summary()`.
+    """
+    lines = [f"{summary['count']} queries in {summary['total_ms']} ms"]
+    for group in summary['duplicates']:
+        flag = 'N+1 ' if group in summary['n_plus_one'] else ''
+        callers = ', '.join(f'{caller} (x{count})' for caller, count in group['callers'].items())
+        lines.append(f"  {flag}x{group['count']} {group['total_ms']} ms: {group['statement'][:200]} <- {callers}")
+    return '\n'.join(lines)
+
+
+class QueryProfilerMiddleware:
+    """
+    Opt-in middleware profiling the SQL queries of a request, enabled for every request by the
+    `QUERY_PROFILER_ENABLED` setting, or for a single request by the `X-Query-Profile` header when the
+    `QUERY_PROFILER_ALLOW_HEADER` setting, which defaults to `DEBUG`, allows it.
+    The summary is exposed by the `X-Query-Count`, `X-Query-Time-Ms`, `X-Query-Duplicates` and `X-Query-N-Plus-One`
+    response headers, and logged by the `rb_books.profiling` logger: at the INFO level, or WARNING if an N+1 pattern
+    is detected.
+    The middleware supports both the sync and the async modes, so that the ASGI handler does not have to adapt it,
+    and every request going through it, with a thread switch.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def is_enabled(self, request) -> bool:
+        """
+        Checks if the request must be profiled. The settings are read on every request, so that they can be
+        overridden by the tests.
+        """
+        if getattr(settings, 'QUERY_PROFILER_ENABLED', False):
+            return True
+        return getattr(settings, 'QUERY_PROFILER_ALLOW_HEADER', settings.DEBUG) and PROFILE_HEADER in request.headers
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.is_enabled(request):
+            return self.get_response(request)
+
+        with QueryProfiler() as profiler:
+            response = self.get_response(request)
+        return self.add_summary(request, response, profiler)
+
+    async def __acall__(self, request):
+        """
+        Async version of `__call__()`. The database connections being local to a thread, the profiler is installed on
+        the connections of the thread the queries of the request are run in: the async ORM, like the sync views and
+        middlewares, runs them with `sync_to_async(thread_sensitive=True)`, i.e. in the single thread of the request.
+        """
+        if not self.is_enabled(request):
+            return await self.get_response(request)
+
+        profiler = QueryProfiler()
+        await sync_to_async(profiler.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(profiler.__exit__)(None, None, None)
+        return self.add_summary(request, response, profiler)
+
+    def add_summary(self, request, response, profiler):
+        """
+        Exposes the summary of the profiled queries in the response headers and logs it.
+        """
+        summary = profiler.summary()
+        response['X-Query-Count'] = summary['count']
+        response['X-Query-Time-Ms'] = summary['total_ms']
+        response['X-Query-Duplicates'] = len(summary['duplicates'])
+        response['X-Query-N-Plus-One'] = len(summary['n_plus_one'])
+        logger.log(
+            logging.WARNING if summary['n_plus_one'] else logging.INFO,
+            '%s %s: %s', request.method, request.get_full_path(), format_summary(summary)
+        )
+        return response
+
+
+@contextmanager
+def assert_query_budget(max_queries, allow_n_plus_one=False):
+    """
+    Test helper asserting that a block of code runs at most `max_queries` queries and, unless `allow_n_plus_one` is
+    True, no N+1 pattern. The failure message holds the report of the queries.
+    Usage:
+        with assert_query_budget(5):
+            self.client.get(reverse('admin:rb_books_book_changelist'))
+    """
+    with QueryProfiler() as profiler:
+        yield profiler
+    summary = profiler.summary()
+    if summary['count'] > max_queries:
+        raise AssertionError(f'Query budget of {max_queries} exceeded: {format_summary(summary)}')
+    if summary['n_plus_one'] and not allow_n_plus_one:
+        raise AssertionError(f'N+1 queries detected: {format_summary(summary)}')
@@ -0,0 +1,204 @@
+import operator
+from functools import partial, reduce
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from .feeds import invalidate_feeds
+from .models import Book, Series
+from .object_cache import invalidate_objects
+from .search import refresh_search_document
+
+
+PROPAGATED_FIELDS = ['illustrator', 'editor', 'audience', 'category']
+PROPAGATED_RELATIONS = ['author', 'genres']
+SEARCH_DOCUMENT_FIELDS = {'illustrator', 'editor', 'author'}
+
+
+def refresh_books(book_ids, search_document=False):
+    """
+    Applies the side effects of the `save()` of books changed by the propagation engine, whose UPDATEs and bulk
+    inserts send no signal: their change stamp is bumped, their search document refreshed if needed, and they are
+    removed from the object cache and the feeds.
+    Parameters:
+    - book_ids: The primary keys of the changed books.
+    - search_document: Whether a field of their search document changed.
+    Returns:
+    - None
+    """
+    book_ids = list(book_ids)
+    if not book_ids:
+        return
+    books = Book.objects.filter(pk__in=book_ids)
+    if search_document:
+        refresh_search_document(books)
+    books.update(modified_at=timezone.now())
+    invalidate_objects(Book, book_ids)
+    transaction.on_commit(partial(invalidate_objects, Book, book_ids))
+    invalidate_feeds()
+    transaction.on_commit(invalidate_feeds)
+
+
+def inherit_series_fields(book):
+    """
+    Fills the empty illustrator, editor, audience and category of a book of a series with those of its series.
+    Parameters:
+    - book: The `Book` instance, not saved yet.
+    Returns:
+    - None
+    """
+    if book.series is None:
+        return
+    for field in PROPAGATED_FIELDS:
+        attname = f'{field}_id'
+        if getattr(book, attname) is None:
+            setattr(book, attname, getattr(book.series, attname))
+
+
+def inherit_series_relations(book, relations=PROPAGATED_RELATIONS):
+    """
+    Gives a book of a series the authors and genres of its series, with a single bulk insert per relation.
+    Parameters:
+    - book: The saved `Book` instance.
+    - relations: The relations to inherit, e.g. those left empty in the form the book was saved with.
+    Returns:
+    - None
+    """
+    if book.series_id is None:
+        return
+    for relation in relations:
+        related_ids = getattr(Series, relation).through.objects.filter(
+            series_id=book.series_id
+        ).values_list(f'{getattr(Series, relation).field.m2m_reverse_field_name()}_id', flat=True)
+        getattr(book, relation).add(*related_ids)
+
+
+def propagate_fields(series, previous_values) -> list:
+    """
+    Applies the new values of changed foreign keys of a series to its books with a single UPDATE. A book whose value
+    is neither empty nor the previous value of its series overrides it, and is left untouched.
+    Parameters:
+    - series: The saved `Series` instance.
+    - previous_values: The previous value of each changed foreign key, by field name, e.g. `{'editor': 3}`.
+    Returns:
+    - list: The primary keys of the books updated.
+    """
+    conditions = {
+        field: Q(**{f'{field}__isnull': True}) | Q(**{f'{field}_id': previous})
+        for field, previous in previous_values.items()
+    }
+    books = Book.objects.filter(series=series).filter(reduce(operator.or_, conditions.values()))
+    book_ids = list(books.values_list('pk', flat=True))
+    if book_ids:
+        Book.objects.filter(pk__in=book_ids).update(**{
+            f'{field}_id': Case(
+                When(condition, then=Value(getattr(series, f'{field}_id'))), default=F(f'{field}_id'),
+                output_field=BigIntegerField()
+            )
+            for field, condition in conditions.items()
+        })
+        refresh_books(book_ids, search_document=bool(SEARCH_DOCUMENT_FIELDS & set(previous_values)))
+    return book_ids
+
+
+def get_inheriting_book_ids(series, relation) -> list:
+    """
+    Returns the books of a series which inherit one of its many-to-many relations: those for which the relation is
+    empty or holds the same objects as for the series.
+    Parameters:
+    - series: The `Series` instance.
+    - relation: `author` or `genres`.
+    Returns:
+    - list: The primary keys of the books.
+    """
+    series_ids = list(getattr(series, relation).values_list('pk', flat=True))
+    return list(Book.objects.filter(series=series).annotate(
+        related_count=Count(relation),
+        matching_count=Count(relation, filter=Q(**{f'{relation}__in': series_ids})),
+    ).filter(
+        Q(related_count=0) | Q(related_count=len(series_ids), matching_count=len(series_ids))
+    ).values_list('pk', flat=True))
+
+
+def propagate_relation_change(series, relation, book_ids, action, pk_set):
+    """
+    Applies a change of a many-to-many relation of a series to its inheriting books, with a bulk insert or a single
+    DELETE on the intermediate table. An addition gives the books all the objects of the series, so that a book whose
+    relation was empty inherits them all.
+    Parameters:
+    - series: The `Series` instance.
+    - relation: `author` or `genres`.
+    - book_ids: The primary keys of the inheriting books, see `get_inheriting_book_ids()`.
+    - action: `post_add`, `post_remove` or `post_clear`, see the `m2m_changed` signal.
+    - pk_set: The primary keys of the objects added or removed, None for `post_clear`.
+    Returns:
+    - None
+    """
+    if not book_ids:
+        return
+    field = getattr(Book, relation).field
+    through = field.remote_field.through
+    related_attname = f'{field.m2m_reverse_field_name()}_id'
+    if action == 'post_add':
+        related_ids = list(getattr(series, relation).values_list('pk', flat=True))
+        through.objects.bulk_create(
+            [through(book_id=book_id, **{related_attname: pk}) for book_id in book_ids for pk in related_ids],
+            ignore_conflicts=True
+        )
+    else:
+        rows = through.objects.filter(book_id__in=book_ids)
+        if action == 'post_remove':
+            rows = rows.filter(**{f'{related_attname}__in': pk_set})
+        rows.delete()
+    refresh_books(book_ids, search_document=relation in SEARCH_DOCUMENT_FIELDS)
+
+
+def propagate_to_books(queryset) -> dict:
+    """
+    Fills the empty attributes of the books of series with those of their series: one UPDATE per foreign key for all
+    the books, and one bulk insert per many-to-many relation for the books without authors or genres.
+    Parameters:
+    - queryset: The queryset of the series to propagate.
+    Returns:
+    - dict: The number of books updated by each propagated field or relation.
+    """
+    counts = {}
+    book_ids = set()
+    for field in PROPAGATED_FIELDS:
+        attname = f'{field}_id'
+        books = Book.objects.filter(
+            series__in=queryset, **{f'{field}__isnull': True, f'series__{field}__isnull': False}
+        )
+        ids = list(books.values_list('pk', flat=True))
+        if ids:
+            Book.objects.filter(pk__in=ids).update(**{
+                attname: Subquery(Series.objects.filter(pk=OuterRef('series_id')).values(attname)[:1])
+            })
+        counts[field] = len(ids)
+        book_ids.update(ids)
+
+    for relation in PROPAGATED_RELATIONS:
+        field = getattr(Book, relation).field
+        through = field.remote_field.through
+        related_attname = f'{field.m2m_reverse_field_name()}_id'
+        empty_books = dict(Book.objects.filter(
+            series__in=queryset, **{f'{relation}__isnull': True}
+        ).values_list('pk', 'series_id'))
+        series_related = {}
+        for series_id, related_id in getattr(Series, relation).through.objects.filter(
+            series_id__in=set(empty_books.values())
+        ).values_list('series_id', related_attname):
+            series_related.setdefault(series_id, []).append(related_id)
+        rows = [
+            through(book_id=book_id, **{related_attname: related_id})
+            for book_id, series_id in empty_books.items()
+            for related_id in series_related.get(series_id, [])
+        ]
+        through.objects.bulk_create(rows, ignore_conflicts=True)
+        ids = {row.book_id for row in rows}
+        counts[relation] = len(ids)
+        book_ids.update(ids)
+
+    refresh_books(book_ids, search_document=True)
+    return counts
@@ -0,0 +1,126 @@
+import json
+
+from django.db import connection, transaction
+
+from .aggregates import series_aggregate_expressions
+from .feeds import LatestReviewsFeed
+from .models import Audience, Author, Book, Rating, Series, Volume
+from .views import get_books_queryset
+
+
+QUERY_PLANS = {}
+
+# The tables which must never be scanned sequentially: those growing with the catalog.
+INDEXED_TABLES = [Book._meta.db_table, Book.author.through._meta.db_table, Book.genres.through._meta.db_table]
+
+
+def query_plan(name):
+    """
+    Decorator registering a key query whose plan is checked. The decorated function returns the queryset of the query.
+    Parameters:
+    - name: The name of the query in the results.
+    Returns:
+    - function: The decorator.
+    """
+    def decorator(get_queryset):
+        QUERY_PLANS[name] = get_queryset
+        return get_queryset
+    return decorator
+
+
+def _first_pk(model):
+    return model.objects.order_by('pk').values_list('pk', flat=True).first() or 0
+
+
+@query_plan('published_books')
+def published_books():
+    return get_books_queryset().order_by('-published_at', '-id')[:20]
+
+
+@query_plan('published_books_stamp')
+def published_books_stamp():
+    return Book.objects.filter(published=True).order_by('-modified_at').values('modified_at')[:1]
+
+
+@query_plan('reviews_feed')
+def reviews_feed():
+    return LatestReviewsFeed().items()
+
+
+@query_plan('author_books')
+def author_books():
+    return get_books_queryset().filter(author=_first_pk(Author)).order_by('-published_at', '-id')
+
+
+@query_plan('current_reading')
+def current_reading():
+    return Book.objects.filter(current_reading=True)
+
+
+@query_plan('incoming_reading')
+def incoming_reading():
+    return Book.objects.filter(incoming_reading=True).order_by('created_at', 'id')[:20]
+
+
+@query_plan('series_volume')
+def series_volume():
+    return Book.objects.filter(series=_first_pk(Series), volume=_first_pk(Volume))
+
+
+@query_plan('series_aggregates')
+def series_aggregates():
+    return Series.objects.filter(pk=_first_pk(Series)).annotate(**{
+        f'computed_{name}': expression for name, expression in series_aggregate_expressions().items()
+    })
+
+
+@query_plan('audience_filter')
+def audience_filter():
+    return Book.objects.filter(audience=_first_pk(Audience)).order_by('-id')[:100]
+
+
+@query_plan('rating_filter')
+def rating_filter():
+    return Book.objects.filter(rating=_first_pk(Rating)).order_by('-id')[:100]
+
+
+def explain(queryset, force_index=False) -> dict:
+    """
+    Returns the plan of a query, as returned by `EXPLAIN (FORMAT JSON)`.
+    Parameters:
+    - queryset: The queryset of the query.
+    - force_index: Whether to disable the sequential scans wherever an index can be used instead, e.g. on a small
+    test database, where a sequential scan is cheaper than any index: a sequential scan then only remains on the
+    tables whose filters or ordering no index can serve.
+    Returns:
+    - dict: The root node of the plan.
+    """
+    with transaction.atomic():
+        if force_index:
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return json.loads(queryset.explain(format='json'))[0]['Plan']
+
+
+def get_seq_scans(plan, tables=INDEXED_TABLES) -> list:
+    """
+    Returns the tables of a plan scanned sequentially among `tables`, including in its subqueries.
+    """
+    scans = []
+    if plan['Node Type'] == 'Seq Scan' and plan['Relation Name'] in tables:
+        scans.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        scans.extend(get_seq_scans(child, tables))
+    return scans
+
+
+def check_query_plans(names=None, force_index=False) -> dict:
+    """
+    Checks that the key queries use indexes on the tables growing with the catalog.
+    Parameters:
+    - names: The names of the queries to check, all of them by default.
+    - force_index: See `explain()`.
+    Returns:
+    - dict: The tables scanned sequentially by each query, by name, empty lists meaning the plan is fine.
+    """
+    return {name: get_seq_scans(explain(QUERY_PLANS[name](), force_index)) for name in names or QUERY_PLANS}
@@ -0,0 +1,171 @@
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure', 'h2', 'h3', 'h4', 'hr', 'i', 'img', 'li', 'ol',
+    'p', 'pre', 's', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'hr', 'img'}
+DROPPED_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template'}
+BLOCK_TAGS = {
+    'blockquote', 'br', 'figcaption', 'figure', 'h2', 'h3', 'h4', 'hr', 'li', 'ol', 'p', 'pre', 'table', 'tr', 'ul',
+}
+
+EXCERPT_LENGTH = 300
+WORDS_PER_MINUTE = 200
+
+_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+_CONTROL_RE = re.compile(r'[\x00-\x20]')
+_WORD_RE = re.compile(r'\w+')
+_SPACES_RE = re.compile(r'[ \t\r\f\v]+')
+_NEWLINES_RE = re.compile(r'\s*\n\s*')
+
+
+def _is_safe_url(url: str) -> bool:
+    match = _SCHEME_RE.match(_CONTROL_RE.sub('', url))
+    return match is None or match.group(1).lower() in ALLOWED_URL_SCHEMES
+
+
+class _RichTextParser(HTMLParser):
+    """
+    Parses CKEditor HTML into a sanitized HTML and a plain text version in a single pass: the tags and attributes out
+    of the allow lists are dropped, keeping their text, except for the tags whose content is dropped as well, such as
+    `<script>`.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = [
+            (name, value) for name, value in attrs
+            if name in allowed and value is not None and (name not in URL_ATTRIBUTES or _is_safe_url(value))
+        ]
+        if tag == 'a' and any(name == 'href' for name, _ in kept):
+            kept.append(('rel', 'noopener nofollow'))
+        attributes = ''.join(f' {name}="{escape(value, quote=True)}"' for name, value in kept)
+        self.html.append(f'<{tag}{attributes}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+
+
+def render_rich_text(value) -> tuple[str, str]:
+    """
+    Returns the sanitized HTML and the plain text of a CKEditor HTML field.
+    Parameters:
+    - value: The HTML, or None.
+    Returns:
+    - tuple[str, str]: The sanitized HTML, whose tags are balanced and whose tags, attributes and URL schemes are
+    limited to the allow lists, and the plain text, with a line per block.
+    """
+    if not value:
+        return '', ''
+    parser = _RichTextParser()
+    parser.feed(value)
+    parser.close()
+    text = _SPACES_RE.sub(' ', ''.join(parser.text))
+    return ''.join(parser.html), _NEWLINES_RE.sub('\n', text).strip()
+
+
+def get_excerpt(text: str, length=EXCERPT_LENGTH) -> str:
+    """
+    Returns the first `length` characters of a plain text on a single line, cut at a word boundary with an ellipsis.
+    """
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if text[length - 1] != ' ':
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:.') + '…'
+
+
+def count_words(text: str) -> int:
+    return len(_WORD_RE.findall(text))
+
+
+def get_reading_time(word_count: int) -> int:
+    """
+    Returns the reading time of a number of words, in minutes, rounded up.
+    """
+    return math.ceil(word_count / WORDS_PER_MINUTE)
+
+
+def render_text_fields(obj, rich_text_fields, excerpt_source_fields):
+    """
+    Computes the derived columns of the CKEditor fields of a book or a series: the sanitized HTML of each field,
+    stored in `<field>_html`, the `plain_text` of all of them, the `excerpt` of the first non-empty field of
+    `excerpt_source_fields`, the `word_count` and the `reading_time` in minutes.
+    Parameters:
+    - obj: The `Book` or `Series` instance, updated in place.
+    - rich_text_fields: The names of the CKEditor fields.
+    - excerpt_source_fields: The names of the fields the excerpt is taken from, by order of preference.
+    Returns:
+    - None
+    Note: The fields are given as parameters so that migrations can use this function on their historical models.
+    """
+    texts = {}
+    for field in rich_text_fields:
+        html, texts[field] = render_rich_text(getattr(obj, field))
+        setattr(obj, f'{field}_html', html)
+    obj.plain_text = '\n\n'.join(text for text in texts.values() if text)
+    obj.excerpt = get_excerpt(next((texts[field] for field in excerpt_source_fields if texts[field]), ''))
+    obj.word_count = count_words(obj.plain_text)
+    obj.reading_time = get_reading_time(obj.word_count)
@@ -0,0 +1,55 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .expressions import SEARCH_CONFIG, search_document_expression
+
+
+def refresh_search_document(queryset):
+    """
+    Refreshes the stored search document of books or series with a single UPDATE.
+    Parameters:
+    - queryset: The queryset of the `Book` or `Series` instances to refresh.
+    Returns:
+    - int: The number of rows updated.
+    """
+    model = queryset.model
+    return queryset.update(search_document=search_document_expression(model, model.SEARCH_TITLE_FIELD))
+
+
+def search_documents(queryset, query: str):
+    """
+    Searches books or series by full-text on their search document, with a trigram similarity fallback on their title
+    so that typos still match.
+    Parameters:
+    - queryset: The queryset of `Book` or `Series` to search in.
+    - query: The searched text, in the web search syntax (`"quoted phrase"`, `or`, `-excluded`).
+    Returns:
+    - QuerySet: The matching rows, annotated with a `rank` and sorted by descending rank.
+    Notes:
+    Both conditions are served by GIN indexes, so that the search does not scan the table nor join the authors,
+    illustrators and editors.
+    """
+    title_field = queryset.model.SEARCH_TITLE_FIELD
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(
+        Q(search_document=search_query) | Q(**{f'{title_field}__trigram_similar': query})
+    ).annotate(
+        rank=SearchRank(F('search_document'), search_query) + TrigramSimilarity(title_field, query)
+    ).order_by('-rank')
+
+
+def search_people(queryset, query: str):
+    """
+    Searches authors or illustrators by trigram similarity on their first and last names.
+    Parameters:
+    - queryset: The queryset of `Author` or `Illustrator` to search in.
+    - query: The searched text.
+    Returns:
+    - QuerySet: The matching people, annotated with a `rank` and sorted by descending rank.
+    """
+    return queryset.filter(
+        Q(first_name__trigram_similar=query) | Q(last_name__trigram_similar=query)
+    ).annotate(
+        rank=Greatest(TrigramSimilarity('first_name', query), TrigramSimilarity('last_name', query))
+    ).order_by('-rank')
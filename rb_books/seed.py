@@ -0,0 +1,255 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .aggregates import rebuild_series_aggregates
+from .feeds import invalidate_feeds
+from .models import Audience, Author, Book, Category, Editor, Genre, Illustrator, Rating, Series, Volume
+from .object_cache import bump_version
+from .search import refresh_search_document
+from .slugs import cached_slugify
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+WORDS = (
+    'ombre lumière royaume épée dragon forêt rivière château prince reine assassin magie sorcier chemin étoile nuit '
+    'tempête loup océan montagne secret héritier guerre paix promesse sang cendre couronne exil mémoire voyage '
+    'silence flamme glace pierre vent lune soleil aube crépuscule légende prophétie serment trahison destin cité '
+    'désert île navire marchand voleur chevalier dieu démon ange miroir livre porte clé jardin tour ruine empire'
+).split()
+FIRST_NAMES = (
+    'Robin Pierre Jean Anne Marie Claire Louis Camille Lucie Hugo Emma Léa Nathan Alice Paul Julie Thomas Sarah '
+    'Victor Laura Gabriel Manon Arthur Chloé Jules Inès Adam Zoé Raphaël Lina'
+).split()
+LAST_NAMES = (
+    'Martin Bernard Dubois Thomas Robert Richard Petit Durand Leroy Moreau Simon Laurent Lefebvre Michel Garcia '
+    'David Bertrand Roux Vincent Fournier Morel Girard André Mercier Dupont Lambert Bonnet François Martinez Hobb'
+).split()
+
+
+class CatalogSeeder:
+    """
+    Generates a large synthetic catalog for load testing: reference objects, series made of consecutive volumes,
+    standalone books, authors and genres relations, and CKEditor-sized HTML bodies.
+    Attributes:
+        seed (int): The seed of the random generator: the same seed generates the same catalog.
+        batch_size (int): The number of rows inserted per `bulk_create`.
+        stdout: An optional stream the progress is written to.
+    Methods:
+        seed_catalog(books_count, series_count): Generates the catalog.
+    Notes:
+    The rows are inserted with `bulk_create`, which calls neither `save()` nor the signals: the slugs and the full
+    titles are computed in Python, the search documents are refreshed by one UPDATE per batch, and the object cache
+    and the feeds are invalidated once at the end. The slugs end with the index of the row in its table, so that
+    seeding the same catalog twice does not collide.
+    """
+
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE, stdout=None):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def words(self, count) -> str:
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def title(self) -> str:
+        return self.words(self.random.randint(1, 4)).capitalize()
+
+    def html(self, min_paragraphs, max_paragraphs) -> str:
+        """
+        Returns an HTML body like the ones written with CKEditor: paragraphs of sentences, with some emphasis.
+        """
+        paragraphs = []
+        for _ in range(self.random.randint(min_paragraphs, max_paragraphs)):
+            sentences = [
+                f'{self.words(self.random.randint(6, 18)).capitalize()}.'
+                for _ in range(self.random.randint(3, 8))
+            ]
+            if self.random.random() < 0.3:
+                sentences[0] = f'<strong>{sentences[0]}</strong>'
+            paragraphs.append(f"<p>{' '.join(sentences)}</p>")
+        return ''.join(paragraphs)
+
+    def slug(self, text, index) -> str:
+        return f'{cached_slugify(text)[:130]}-{index}'
+
+    def bulk_create(self, model, objects):
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            created += model.objects.bulk_create(objects[start:start + self.batch_size])
+        return created
+
+    def create_people(self, model, count):
+        start = model.objects.count()
+        people = []
+        for index in range(start, start + count):
+            first_name, last_name = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+            people.append(model(
+                first_name=first_name, last_name=last_name, slug=self.slug(f'{first_name} {last_name}', index)
+            ))
+        return self.bulk_create(model, people)
+
+    def create_labels(self, model, count, label_field='label', **fields):
+        start = model.objects.count()
+        objects = []
+        for index in range(start, start + count):
+            label = f'{self.title()} {index}'
+            objects.append(model(**{label_field: label}, slug=self.slug(label, index), **fields))
+        return self.bulk_create(model, objects)
+
+    def get_ratings(self):
+        existing = set(Rating.objects.values_list('rating', flat=True))
+        labels = [self.title() for _ in range(6)]
+        missing = [
+            Rating(label=labels[rating], rating=rating, slug=self.slug('note', rating))
+            for rating in range(6) if rating not in existing
+        ]
+        self.bulk_create(Rating, missing)
+        return list(Rating.objects.all())
+
+    def create_relations(self, field, objects, targets, min_count, max_count):
+        """
+        Inserts the rows of a many-to-many relation in batches, through its intermediate model.
+        """
+        through = field.remote_field.through
+        source_name, target_name = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+        rows = [
+            through(**{source_name: obj.pk, target_name: target.pk})
+            for obj in objects
+            for target in self.random.sample(targets, self.random.randint(min_count, min(max_count, len(targets))))
+        ]
+        self.bulk_create(through, rows)
+
+    def seed_references(self, books_count):
+        self.authors = self.create_people(Author, max(books_count // 20, 50))
+        self.illustrators = self.create_people(Illustrator, max(books_count // 100, 20))
+        self.editors = self.create_labels(Editor, 30, label_field='name')
+        self.genres = self.create_labels(Genre, 25, description=self.words(20))
+        self.categories = self.create_labels(Category, 8)
+        self.audiences = self.create_labels(Audience, 5)
+        self.ratings = self.get_ratings()
+        self.volumes = {volume.index: volume for volume in Volume.objects.filter(index__in=range(1, 151))}
+
+    def seed_series(self, count):
+        start = Series.objects.count()
+        series = []
+        for index in range(start, start + count):
+            title = self.title()
+            series.append(Series(
+                title=title,
+                slug=self.slug(title, index),
+                summary=self.html(1, 3),
+                illustrator=self.random.choice(self.illustrators),
+                editor=self.random.choice(self.editors),
+                audience=self.random.choice(self.audiences),
+                category=self.random.choice(self.categories),
+                volumes_count=self.random.randint(2, 12),
+                complete=self.random.random() < 0.5,
+            ))
+            series[-1].render_text_fields()
+        series = self.bulk_create(Series, series)
+        self.create_relations(Series._meta.get_field('author'), series, self.authors, 1, 2)
+        self.create_relations(Series._meta.get_field('genres'), series, self.genres, 1, 3)
+        refresh_search_document(Series.objects.filter(pk__in=[obj.pk for obj in series]))
+        self.log(f'{len(series)} series created')
+        return series
+
+    def iter_book_slots(self, count, series):
+        """
+        Yields the series and volume of each book to create: the volumes of each series in order, then standalone
+        books once about 70% of the books belong to a series.
+        """
+        in_series = int(count * 0.7) if series else 0
+        slots = [
+            (obj, self.volumes[number])
+            for obj in series
+            for number in range(1, obj.volumes_count + 1)
+            if number in self.volumes
+        ][:in_series]
+        yield from slots
+        for _ in range(count - len(slots)):
+            yield None, None
+
+    def build_book(self, index, series, volume, now):
+        published = self.random.random() < 0.6
+        book = Book(
+            title=self.title(),
+            series=series,
+            volume=volume,
+            show_series_title=series is not None,
+            illustrator=series.illustrator if series else self.random.choice(self.illustrators),
+            editor=series.editor if series else self.random.choice(self.editors),
+            audience=series.audience if series else self.random.choice(self.audiences),
+            category=series.category if series else self.random.choice(self.categories),
+            summary=self.html(1, 3),
+            quotation=self.html(1, 1),
+            opinion=self.html(5, 15),
+            short_opinion=self.html(1, 2),
+            about=self.html(0, 2),
+            pages=self.random.randint(90, 1200),
+            rating=self.random.choice(self.ratings) if published else None,
+            published=published,
+            published_at=now - timedelta(minutes=self.random.randint(0, 10 * 365 * 24 * 60)) if published else None,
+            incoming_reading=not published and self.random.random() < 0.1,
+        )
+        book.full_title = book.get_full_title()[:350]
+        book.slug = self.slug(book.full_title, index)
+        book.render_text_fields()
+        return book
+
+    def seed_books(self, count, series):
+        start = Book.objects.count()
+        now = timezone.now()
+        has_current_reading = Book.objects.filter(current_reading=True).exists()
+        batch = []
+        created = 0
+        for index, (obj, volume) in enumerate(self.iter_book_slots(count, series), start=start):
+            book = self.build_book(index, obj, volume, now)
+            if not has_current_reading and not book.published:
+                book.current_reading, book.incoming_reading = True, False
+                has_current_reading = True
+            batch.append(book)
+            if len(batch) == self.batch_size:
+                created += self.insert_books(batch)
+                batch = []
+        if batch:
+            created += self.insert_books(batch)
+        return created
+
+    def insert_books(self, books):
+        """
+        Inserts a batch of books with their authors and genres, and refreshes their search documents.
+        """
+        with transaction.atomic():
+            books = Book.objects.bulk_create(books)
+            self.create_relations(Book._meta.get_field('author'), books, self.authors, 1, 2)
+            self.create_relations(Book._meta.get_field('genres'), books, self.genres, 1, 3)
+            refresh_search_document(Book.objects.filter(pk__in=[book.pk for book in books]))
+        self.log(f'{len(books)} books created')
+        return len(books)
+
+    def seed_catalog(self, books_count, series_count) -> dict:
+        """
+        Generates the catalog.
+        Parameters:
+        - books_count: The number of books to create.
+        - series_count: The number of series to create. About 70% of the books are volumes of these series, as long
+        as they have enough volumes, the others are standalone books.
+        Returns:
+        - dict: The number of `books` and `series` created.
+        """
+        self.seed_references(books_count)
+        series = self.seed_series(series_count)
+        books = self.seed_books(books_count, series)
+        rebuild_series_aggregates(Series.objects.filter(pk__in=[obj.pk for obj in series]))
+        bump_version(Book)
+        bump_version(Series)
+        invalidate_feeds()
+        return {'books': books, 'series': len(series)}
@@ -0,0 +1,134 @@
+from .thumbnails import get_srcset, get_thumbnail_url
+
+
+def serialize_cover(obj) -> dict | None:
+    """
+    Returns the renditions of the cover of a book or a series (see `rb_books.thumbnails`), or only its original upload
+    while they are not generated, or None if there is no cover.
+    """
+    image = obj.image
+    if not image:
+        return None
+    if not obj.has_renditions:
+        return {'src': image.url, 'srcset': None, 'srcset_webp': None}
+    return {
+        'src': get_thumbnail_url(image, 300),
+        'srcset': get_srcset(image, 'jpg'),
+        'srcset_webp': get_srcset(image, 'webp'),
+    }
+
+
+def serialize_person(person) -> dict | None:
+    """
+    Returns the payload of an author or an illustrator.
+    """
+    if person is None:
+        return None
+    return {
+        'id': person.pk,
+        'slug': person.slug,
+        'first_name': person.first_name,
+        'last_name': person.last_name,
+    }
+
+
+def serialize_label(obj, label_field='label') -> dict | None:
+    """
+    Returns the payload of a reference object: editor, audience, category or genre.
+    """
+    if obj is None:
+        return None
+    return {
+        'id': obj.pk,
+        'slug': obj.slug,
+        'label': getattr(obj, label_field),
+    }
+
+
+def serialize_genre(genre) -> dict:
+    """
+    Returns the payload of a genre.
+    """
+    return {**serialize_label(genre), 'description': genre.description}
+
+
+def serialize_series(series, detailed=False) -> dict:
+    """
+    Returns the payload of a series. The related objects must have been joined or prefetched, see
+    `rb_books.views.get_series_queryset()`.
+    Parameters:
+    - series: The `Series` instance.
+    - detailed: Whether to include the HTML summary, sanitized when the series was saved (see `rb_books.richtext`).
+    Returns:
+    - dict: The payload of the series.
+    """
+    payload = {
+        'id': series.pk,
+        'slug': series.slug,
+        'title': series.title,
+        'cover': serialize_cover(series),
+        'authors': [serialize_person(author) for author in series.author.all()],
+        'illustrator': serialize_person(series.illustrator),
+        'editor': serialize_label(series.editor, 'name'),
+        'audience': serialize_label(series.audience),
+        'category': serialize_label(series.category),
+        'genres': [serialize_label(genre) for genre in series.genres.all()],
+        'volumes_count': series.volumes_count,
+        'complete': series.complete,
+        'excerpt': series.excerpt,
+        'word_count': series.word_count,
+        'reading_time': series.reading_time,
+        'books_count': series.books_count,
+        'published_count': series.published_count,
+        'current_reading_count': series.current_reading_count,
+        'incoming_reading_count': series.incoming_reading_count,
+        'average_rating': round(series.average_rating, 2) if series.average_rating is not None else None,
+        'last_published_at': series.last_published_at,
+        'next_unread_volume': series.next_unread_volume.label if series.next_unread_volume else None,
+    }
+    if detailed:
+        payload['summary'] = series.summary_html
+    return payload
+
+
+def serialize_book(book, detailed=False) -> dict:
+    """
+    Returns the payload of a book. The related objects must have been joined or prefetched, see
+    `rb_books.views.get_books_queryset()`.
+    Parameters:
+    - book: The `Book` instance.
+    - detailed: Whether to include the HTML summary, opinions, quotation and about fields, sanitized when the book was
+    saved (see `rb_books.richtext`).
+    Returns:
+    - dict: The payload of the book.
+    """
+    payload = {
+        'id': book.pk,
+        'slug': book.slug,
+        'title': book.title,
+        'full_title': book.full_title,
+        'series': {'id': book.series.pk, 'slug': book.series.slug, 'title': book.series.title} if book.series else None,
+        'volume': book.volume.label if book.volume else None,
+        'cover': serialize_cover(book),
+        'authors': [serialize_person(author) for author in book.author.all()],
+        'illustrator': serialize_person(book.illustrator),
+        'editor': serialize_label(book.editor, 'name'),
+        'audience': serialize_label(book.audience),
+        'category': serialize_label(book.category),
+        'genres': [serialize_label(genre) for genre in book.genres.all()],
+        'rating': book.rating.rating if book.rating else None,
+        'pages': book.pages,
+        'published_at': book.published_at,
+        'excerpt': book.excerpt,
+        'word_count': book.word_count,
+        'reading_time': book.reading_time,
+    }
+    if detailed:
+        payload.update({
+            'summary': book.summary_html,
+            'quotation': book.quotation_html,
+            'opinion': book.opinion_html,
+            'short_opinion': book.short_opinion_html,
+            'about': book.about_html,
+        })
+    return payload
@@ -0,0 +1,150 @@
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .thumbnails import generate_thumbnails
+
+
+# Sent once by the set-based changes of books below, whose UPDATEs send no `pre_save` nor `post_save` signal, with
+# the primary keys of the changed books (`pks`) and the names of the changed fields (`fields`).
+books_changed = Signal()
+
+
+def apply_reading_state_rules(book):
+    """
+    Normalizes the reading state flags of a book before it is saved.
+    Parameters:
+    - book: The `Book` instance about to be saved.
+    Return Type:
+    - None
+    Rules:
+    - A published book is neither currently read nor incoming, and gets a `published_at` date if it has none.
+    - A book currently read is no longer an incoming reading.
+    """
+    if book.published:
+        book.current_reading = False
+        book.incoming_reading = False
+        if book.published_at is None:
+            book.published_at = timezone.now()
+
+    if book.current_reading and book.incoming_reading:
+        book.incoming_reading = False
+
+
+def release_current_reading(book, on_release=None) -> int:
+    """
+    Clears the `current_reading` flag of the book(s) currently read, except the given one, with a single conditional
+    UPDATE.
+    Parameters:
+    - book: The `Book` instance becoming the current reading. It is excluded from the UPDATE.
+    - on_release: An optional function called with the queryset of the locked books just before they are released,
+    e.g. to update the aggregates of their series.
+    Returns:
+    - int: The number of books released.
+    Notes:
+    The previous current reading is locked with `SELECT ... FOR UPDATE` first: a concurrent transition blocks until the
+    first one commits, and the UPDATE, a new statement, then sees and releases the book it flagged. When there is no
+    previous current reading there is nothing to lock, and the partial unique index `unique_current_reading` rejects
+    the second of two concurrent transitions, which `Book.save` retries. It must therefore run in the same transaction
+    as the save of `book`.
+    `QuerySet.update()` sends no signal, so the released books do not go through the whole save pipeline again.
+    """
+    queryset = type(book).objects.filter(current_reading=True)
+    if book.pk is not None:
+        queryset = queryset.exclude(pk=book.pk)
+    locked = list(queryset.select_for_update().values_list('pk', flat=True))
+    if not locked:
+        return 0
+    if on_release is not None:
+        on_release(type(book).objects.filter(pk__in=locked))
+    return queryset.update(current_reading=False, modified_at=timezone.now())
+
+
+def is_current_reading_conflict(error) -> bool:
+    """
+    Checks if an `IntegrityError` is a violation of the `unique_current_reading` index, i.e. a lost race between two
+    concurrent current reading transitions.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None) == 'unique_current_reading' or 'unique_current_reading' in str(error)
+
+
+def touch(queryset) -> int:
+    """
+    Bumps the `modified_at` change stamp of rows whose public payload changed without them being saved, e.g. when
+    their many-to-many relations or a stored column computed by an UPDATE change.
+    Parameters:
+    - queryset: The queryset of the rows to touch.
+    Returns:
+    - int: The number of rows updated.
+    """
+    return queryset.update(modified_at=timezone.now())
+
+
+def generate_cover_renditions(model, pk, storage, name) -> bool:
+    """
+    Generates the renditions of a cover (see `rb_books.thumbnails`), then records on its object that they can be
+    served instead of the original upload.
+    Parameters:
+    - model: The model class, `Book` or `Series`.
+    - pk: The primary key of the object.
+    - storage: The storage of the cover.
+    - name: The name of the cover in its storage.
+    Returns:
+    - bool: True if the object still has this cover and was updated, False otherwise. The caller invalidates the
+    caches of the updated object.
+    Note: If the generation fails, the object keeps serving its original upload until `manage.py generate_thumbnails`
+    succeeds.
+    """
+    generate_thumbnails(storage, name)
+    return bool(model.objects.filter(pk=pk, image=name).update(has_renditions=True, modified_at=timezone.now()))
+
+
+def bulk_update_books(queryset, **values) -> list:
+    """
+    Applies values to books with a single UPDATE, bumps their change stamp and sends a single `books_changed` signal.
+    Parameters:
+    - queryset: The queryset of the books to update.
+    - **values: The values or expressions of the updated fields.
+    Returns:
+    - list: The primary keys of the books updated.
+    """
+    model = queryset.model
+    pks = list(queryset.values_list('pk', flat=True))
+    if pks:
+        model.objects.filter(pk__in=pks).update(**values, modified_at=timezone.now())
+        books_changed.send(sender=model, pks=pks, fields=list(values))
+    return pks
+
+
+def publish_books(queryset) -> list:
+    """
+    Publishes books with a single UPDATE, following the rules of `apply_reading_state_rules()`: the published books
+    are neither currently read nor incoming, and keep their publication date if they already have one.
+    Parameters:
+    - queryset: The queryset of the books to publish. The books already published are left untouched.
+    Returns:
+    - list: The primary keys of the books published.
+    """
+    return bulk_update_books(
+        queryset.filter(published=False),
+        published=True,
+        current_reading=False,
+        incoming_reading=False,
+        published_at=Coalesce('published_at', Value(timezone.now())),
+    )
+
+
+def mark_books_incoming(queryset) -> list:
+    """
+    Adds books to the reading list with a single UPDATE. Following the rules of `apply_reading_state_rules()`, the
+    published books and the book currently read are left untouched.
+    Parameters:
+    - queryset: The queryset of the books to mark.
+    Returns:
+    - list: The primary keys of the books marked.
+    """
+    return bulk_update_books(
+        queryset.filter(published=False, current_reading=False, incoming_reading=False), incoming_reading=True
+    )
@@ -1,10 +1,24 @@
-import os
+from functools import partial
 
-from django.db.models.signals import pre_delete, pre_save, post_migrate
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, pre_delete, pre_save, post_migrate, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Book, Series, Volume
+from .aggregates import (
+    BOOK_STATE_FIELDS, get_book_state, rebuild_series_aggregates, release_series_current_reading,
+    update_series_aggregates,
+)
+from .expressions import full_title_expression
+from .feeds import invalidate_feeds
+from .files import schedule_file_deletion
+from .models import Audience, Author, Book, Category, Editor, Genre, Illustrator, Rating, Series, SlugRedirect, Volume
+from .object_cache import bump_version, invalidate_objects
+from .propagation import PROPAGATED_FIELDS, get_inheriting_book_ids, propagate_fields, propagate_relation_change
+from .search import refresh_search_document
+from .services import books_changed, generate_cover_renditions, release_current_reading, touch
+from .slugs import forget_slug
+from .thumbnails import get_thumbnail_names
 
 
 @receiver(post_migrate)
@@ -29,10 +43,23 @@ def populate_volumes(sender, **kwargs):
             print(f'{new_volume.label} saved into Volume database table')
 
 
+def delete_img_files(storage, name):
+    """
+    Schedules the deletion of an image file and of its renditions.
+    Parameters:
+    - storage: The storage of the image.
+    - name: The name of the image in its storage.
+    Returns:
+    - None
+    """
+    for file_name in [name, *get_thumbnail_names(name)]:
+        schedule_file_deletion(file_name, storage)
+
+
 @receiver(pre_delete, sender=Book)
 def delete_book_img_file(sender, instance, **kwargs):
     """
-    Delete the image file associated with a book before the book is deleted.
+    Schedule the deletion of the image file associated with a book, once the deletion of the book is committed.
     @param sender: The sender object.
     @param instance: The book instance being deleted.
     @param kwargs: Additional keyword arguments.
@@ -40,14 +67,14 @@ def delete_book_img_file(sender, instance, **kwargs):
     @receiver(pre_delete, sender=Book)
     """
     if instance.image:
-        if os.path.isfile(instance.image.path):
-            os.remove(instance.image.path)
+        delete_img_files(instance.image.storage, instance.image.name)
 
 
 @receiver(pre_delete, sender=Series)
 def delete_collection_img_file(sender, instance, **kwargs):
     """
-    Deletes the collection image file associated with the given instance of a Series model.
+    Schedules the deletion of the collection image file associated with the given instance of a Series model, once the
+    deletion of the series is committed.
     Parameters:
     - sender: The sender of the pre_delete signal. It should be a Series model.
     - instance: The instance of the Series model about to be deleted.
@@ -55,32 +82,30 @@ def delete_collection_img_file(sender, instance, **kwargs):
     None
     """
     if instance.image:
-        if os.path.isfile(instance.image.path):
-            os.remove(instance.image.path)
+        delete_img_files(instance.image.storage, instance.image.name)
 
 
 def auto_delete_img_on_change(model, instance, **kwargs):
     """
-    Automatically deletes the old image file when the image field is changed on a model instance.
+    Automatically schedules the deletion of the old image file and of its renditions when the image field is changed on
+    a model instance.
     Parameters:
     - model: The model class to identify the model instance.
     - instance: The model instance to check for changes and delete the old image file.
     - kwargs: Additional keyword arguments (if any).
     Returns:
     - None
+    Notes:
+    The old image is read from the values snapshotted when the instance was loaded (see
+    `SlugifiedModel.has_changed`), so no query is run to fetch it. The file is deleted by `rb_books.files` after the
+    transaction is committed.
     Example Usage:
     auto_delete_img_on_change(MyModel, my_instance)
     """
-    if instance.pk:
-        try:
-            old_instance = model.objects.get(pk=instance.pk)
-        except model.DoesNotExist:
-            return
-        old_file = old_instance.image
-        new_file = instance.image
-        if bool(old_file) and old_file != new_file:
-            if os.path.isfile(old_file.path):
-                os.remove(old_file.path)
+    if instance.pk and instance.has_changed('image'):
+        old_name = instance.get_initial_value('image')
+        if old_name:
+            delete_img_files(instance.image.storage, old_name)
 
 
 @receiver(pre_save, sender=Book)
@@ -121,6 +146,45 @@ def auto_delete_collection_img_on_change(sender, instance, **kwargs):
     auto_delete_img_on_change(sender, instance, **kwargs)
 
 
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Series)
+def generate_img_thumbnails(sender, instance, **kwargs):
+    """
+    Generates the renditions of a newly uploaded cover once the transaction is committed.
+    Parameters:
+    - sender: The model class that is sending the signal, `Book` or `Series`.
+    - instance: The instance being saved.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    Note: `post_save` is sent before `SlugifiedModel.save` refreshes the snapshot of the loaded values, so
+    `has_changed('image')` still tells if a new cover was uploaded.
+    """
+    if instance.image and instance.has_changed('image'):
+        transaction.on_commit(
+            partial(generate_renditions, sender, instance.pk, instance.image.storage, instance.image.name),
+            robust=True
+        )
+
+
+def generate_renditions(model, pk, storage, name):
+    """
+    Generates the renditions of a cover and serves them from then on, see
+    `rb_books.services.generate_cover_renditions()`.
+    Parameters:
+    - model: The model class, `Book` or `Series`.
+    - pk: The primary key of the object.
+    - storage: The storage of the cover.
+    - name: The name of the cover in its storage.
+    Returns:
+    - None
+    """
+    if generate_cover_renditions(model, pk, storage, name):
+        invalidate_objects(model, [pk])
+        if model is Book:
+            invalidate_feeds()
+
+
 @receiver(pre_save, sender=Book)
 def auto_set_data_on_save(sender, instance, **kwargs):
     """
@@ -132,27 +196,553 @@ def auto_set_data_on_save(sender, instance, **kwargs):
     - `instance`: The instance of the `Book` model that is being saved.
     - `**kwargs`: Additional keyword arguments passed to the receiver.
     Return Type: None
-    When the `instance` has the `published` field set to True:
-    - The `current_reading` field of the `instance` is set to False.
-    - The `incoming_reading` field of the `instance` is set to False.
-    - If the `published_at` field of the `instance` is None, it is set to the current time using `timezone.now()`.
-    When the `instance` has the `current_reading` field set to True:
-    - If the `incoming_reading` field of the `instance` is also True, it is set to False.
-    - All other `Book` instances with `current_reading` set to True are iterated over and their `current_reading`
-    field is set to False, and each instance is saved.
+    The reading state rules are applied by `Book.save` with `rb_books.services.apply_reading_state_rules`, before the
+    changed fields are computed. When the `instance` becomes the current reading, `release_current_reading` locks and
+    clears the previous current reading with a single UPDATE, run in the transaction opened by `Book.save`, after
+    decrementing the current reading counter of its series (see `rb_books.aggregates.release_series_current_reading`).
     Note: This method should be connected as a receiver to the `pre_save` signal for the `Book` model in order for it
     to be automatically triggered before saving a `Book` instance
     """
-    if instance.published:
-        instance.current_reading = False
-        instance.incoming_reading = False
-        if instance.published_at is None:
-            instance.published_at = timezone.now()
-
-    if instance.current_reading:
-        if instance.incoming_reading:
-            instance.incoming_reading = False
-        current_books = Book.objects.filter(current_reading=True)
-        for book in current_books:
-            book.current_reading = False
-            book.save()
+    if instance.current_reading and instance.has_changed('current_reading'):
+        if release_current_reading(
+            instance, lambda released: invalidate_cached_objects(Series, release_series_current_reading(released))
+        ):
+            invalidate_cached_models(Book)
+
+
+def refresh_books_full_title(books):
+    """
+    Refreshes the stored full title of books, and their search document which contains it, with two UPDATEs. The full
+    title being part of the public payload of a book, its change stamp is bumped as well.
+    Parameters:
+    - books: The queryset of the `Book` instances to refresh.
+    Returns:
+    - int: The number of books updated.
+    """
+    updated = books.update(full_title=full_title_expression(Series, Volume), modified_at=timezone.now())
+    refresh_search_document(books)
+    return updated
+
+
+@receiver(post_save, sender=Series)
+def refresh_series_books_full_title(sender, instance, created, **kwargs):
+    """
+    Refreshes the stored full title of the books of a series when the title or the slug of the series changes, which
+    also bumps their change stamp since both are part of their public payload.
+    Parameters:
+    - sender: The model class that is sending the signal (Series in this case).
+    - instance: The series being saved.
+    - created: Whether the series has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if not created and (instance.has_changed('title') or instance.has_changed('slug')):
+        refresh_books_full_title(Book.objects.filter(series=instance))
+
+
+@receiver(post_save, sender=Volume)
+def refresh_volume_books_full_title(sender, instance, created, **kwargs):
+    """
+    Refreshes the stored full title of the books of a volume when the label of the volume changes.
+    Parameters:
+    - sender: The model class that is sending the signal (Volume in this case).
+    - instance: The volume being saved.
+    - created: Whether the volume has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if not created and instance.has_changed('label'):
+        refresh_books_full_title(Book.objects.filter(volume=instance))
+
+
+@receiver(pre_delete, sender=Series)
+@receiver(pre_delete, sender=Volume)
+@receiver(pre_delete, sender=Rating)
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Illustrator)
+@receiver(pre_delete, sender=Editor)
+def remember_books_before_delete(sender, instance, **kwargs):
+    """
+    Remembers the books and series related to an instance about to be deleted, whose foreign keys will be set to NULL
+    or whose many-to-many relations will be deleted without sending any signal.
+    Parameters:
+    - sender: The model class that is sending the signal, `Series`, `Volume`, `Rating`, `Author`, `Illustrator` or
+    `Editor`.
+    - instance: The instance about to be deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    instance._book_ids = list(instance.book_set.values_list('pk', flat=True))
+    if hasattr(instance, 'series_set'):
+        instance._series_ids = list(instance.series_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Series)
+@receiver(post_delete, sender=Volume)
+def refresh_books_full_title_after_delete(sender, instance, **kwargs):
+    """
+    Refreshes the stored full title of the books of a deleted series or volume.
+    Parameters:
+    - sender: The model class that is sending the signal, `Series` or `Volume`.
+    - instance: The deleted instance.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if getattr(instance, '_book_ids', None):
+        refresh_books_full_title(Book.objects.filter(pk__in=instance._book_ids))
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Illustrator)
+@receiver(post_delete, sender=Editor)
+def refresh_search_document_after_delete(sender, instance, **kwargs):
+    """
+    Refreshes the search document of the books and series of a deleted author, illustrator or editor.
+    Parameters:
+    - sender: The model class that is sending the signal, `Author`, `Illustrator` or `Editor`.
+    - instance: The deleted instance.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if getattr(instance, '_book_ids', None):
+        refresh_search_document(Book.objects.filter(pk__in=instance._book_ids))
+    if getattr(instance, '_series_ids', None):
+        refresh_search_document(Series.objects.filter(pk__in=instance._series_ids))
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Series)
+def refresh_own_search_document(sender, instance, created, **kwargs):
+    """
+    Refreshes the search document of a book or a series when it is created or when one of the fields it contains
+    changes. The authors are handled by `refresh_search_document_on_authors_change`.
+    Parameters:
+    - sender: The model class that is sending the signal, `Book` or `Series`.
+    - instance: The instance being saved.
+    - created: Whether the instance has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if created or any(
+        instance.has_changed(field) for field in [sender.SEARCH_TITLE_FIELD, 'illustrator', 'editor']
+    ):
+        refresh_search_document(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+@receiver(m2m_changed, sender=Series.author.through)
+def refresh_search_document_on_authors_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Refreshes the search document of books or series when their authors change.
+    Parameters:
+    - sender: The intermediate model of the `author` relation of `Book` or `Series`.
+    - instance: The instance whose relation changes: a book or a series, or an author when `reverse` is True.
+    - action: The kind of change, only `post_add`, `post_remove` and `post_clear` are handled.
+    - reverse: Whether the relation is changed from the author side.
+    - model: The class of the objects added to or removed from the relation.
+    - pk_set: The primary keys of the objects added or removed, None for `post_clear`.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+    if not reverse:
+        refresh_search_document(type(instance).objects.filter(pk=instance.pk))
+    elif pk_set:
+        refresh_search_document(model.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Illustrator)
+@receiver(post_save, sender=Editor)
+def refresh_search_document_on_name_change(sender, instance, created, **kwargs):
+    """
+    Refreshes the search document of the books and series of an author, illustrator or editor whose name changes.
+    Parameters:
+    - sender: The model class that is sending the signal, `Author`, `Illustrator` or `Editor`.
+    - instance: The instance being saved.
+    - created: Whether the instance has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    name_fields = ['name'] if sender is Editor else ['first_name', 'last_name']
+    if not created and any(instance.has_changed(field) for field in name_fields):
+        refresh_search_document(instance.book_set.all())
+        refresh_search_document(instance.series_set.all())
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+@receiver(m2m_changed, sender=Book.genres.through)
+@receiver(m2m_changed, sender=Series.author.through)
+@receiver(m2m_changed, sender=Series.genres.through)
+def touch_on_relation_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Bumps the change stamp of books or series when their authors or genres change, since `QuerySet.update()` and the
+    many-to-many managers do not save them, so that the conditional GET of the API does not serve a stale payload.
+    Parameters:
+    - sender: The intermediate model of the `author` or `genres` relation of `Book` or `Series`.
+    - instance: The instance whose relation changes: a book or a series, or an author or a genre when `reverse` is
+    True.
+    - action: The kind of change, only `post_add`, `post_remove` and `post_clear` are handled.
+    - reverse: Whether the relation is changed from the author or genre side.
+    - model: The class of the objects added to or removed from the relation.
+    - pk_set: The primary keys of the objects added or removed, None for `post_clear`.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+    if not reverse:
+        touch(type(instance).objects.filter(pk=instance.pk))
+    elif pk_set:
+        touch(model.objects.filter(pk__in=pk_set))
+
+
+def invalidate_cached_objects(model, pks):
+    """
+    Removes objects from the object cache (see `rb_books.object_cache`) right away, and again once the transaction is
+    committed, so that a concurrent request cannot cache the old version of the rows in between.
+    Parameters:
+    - model: The model class, `Book` or `Series`.
+    - pks: The primary keys of the objects.
+    Returns:
+    - None
+    """
+    pks = list(pks)
+    if pks:
+        invalidate_objects(model, pks)
+        transaction.on_commit(partial(invalidate_objects, model, pks))
+
+
+def invalidate_cached_models(*models):
+    """
+    Invalidates all the cached objects of some models, right away and again once the transaction is committed.
+    Parameters:
+    - models: The model classes, `Book` and/or `Series`.
+    Returns:
+    - None
+    """
+    for model in models:
+        bump_version(model)
+        transaction.on_commit(partial(bump_version, model))
+
+
+@receiver(pre_save, sender=Book)
+@receiver(pre_delete, sender=Book)
+def invalidate_cached_book(sender, instance, **kwargs):
+    """
+    Removes a book being changed or deleted from the object cache.
+    Parameters:
+    - sender: The model class that is sending the signal (Book in this case).
+    - instance: The book being saved or deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if instance.pk is not None:
+        invalidate_cached_objects(Book, [instance.pk])
+
+
+@receiver(pre_save, sender=Series)
+@receiver(pre_delete, sender=Series)
+def invalidate_cached_series(sender, instance, **kwargs):
+    """
+    Removes a series being changed or deleted from the object cache, along with its books when the title or the slug
+    they are cached with changes.
+    Parameters:
+    - sender: The model class that is sending the signal (Series in this case).
+    - instance: The series being saved or deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if instance.pk is None:
+        return
+    invalidate_cached_objects(Series, [instance.pk])
+    if kwargs['signal'] is pre_delete or instance.has_changed('title') or instance.has_changed('slug'):
+        invalidate_cached_objects(Book, Book.objects.filter(series=instance).values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=Volume)
+@receiver(pre_save, sender=Author)
+@receiver(pre_save, sender=Illustrator)
+@receiver(pre_save, sender=Editor)
+@receiver(pre_save, sender=Audience)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Genre)
+@receiver(pre_save, sender=Rating)
+@receiver(pre_delete, sender=Volume)
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Illustrator)
+@receiver(pre_delete, sender=Editor)
+@receiver(pre_delete, sender=Audience)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Rating)
+def invalidate_cached_models_on_reference_change(sender, instance, **kwargs):
+    """
+    Invalidates all the cached books and series when a reference object they are cached with changes or is deleted.
+    These objects rarely change and may be shared by many books, so the whole namespaces are invalidated rather than
+    looking the related books up.
+    Parameters:
+    - sender: The model class that is sending the signal.
+    - instance: The instance being saved or deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if instance.pk is not None:
+        invalidate_cached_models(Book, Series)
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+@receiver(m2m_changed, sender=Book.genres.through)
+@receiver(m2m_changed, sender=Series.author.through)
+@receiver(m2m_changed, sender=Series.genres.through)
+def invalidate_cached_objects_on_relation_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Removes books or series from the object cache when their authors or genres change.
+    Parameters:
+    - sender: The intermediate model of the `author` or `genres` relation of `Book` or `Series`.
+    - instance: The instance whose relation changes: a book or a series, or an author or a genre when `reverse` is
+    True.
+    - action: The kind of change, only `post_add`, `post_remove` and `post_clear` are handled.
+    - reverse: Whether the relation is changed from the author or genre side.
+    - model: The class of the objects added to or removed from the relation.
+    - pk_set: The primary keys of the objects added or removed, None for `post_clear`.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+    if not reverse:
+        invalidate_cached_objects(type(instance), [instance.pk])
+    elif pk_set:
+        invalidate_cached_objects(model, pk_set)
+    elif action == 'post_clear':
+        invalidate_cached_models(model)
+
+
+@receiver(pre_save, sender=Book)
+@receiver(pre_delete, sender=Book)
+def invalidate_feeds_on_review_change(sender, instance, **kwargs):
+    """
+    Invalidates the cached reviews feeds (see `rb_books.feeds`) when a book is published, edited while published,
+    unpublished or deleted while published. The changes of draft books leave the feeds untouched.
+    Parameters:
+    - sender: The model class that is sending the signal (Book in this case).
+    - instance: The book being saved or deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if instance.published or instance.get_initial_value('published'):
+        invalidate_feeds()
+        transaction.on_commit(invalidate_feeds)
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+def invalidate_feeds_on_authors_change(sender, action, **kwargs):
+    """
+    Invalidates the cached reviews feeds when the authors of books change, since they are part of the feed entries.
+    Parameters:
+    - sender: The intermediate model of the `author` relation of `Book`.
+    - action: The kind of change, only `post_add`, `post_remove` and `post_clear` are handled.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if action in ['post_add', 'post_remove', 'post_clear']:
+        invalidate_feeds()
+        transaction.on_commit(invalidate_feeds)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Series)
+@receiver(post_save, sender=Author)
+def record_slug_change(sender, instance, created, **kwargs):
+    """
+    Records the former slug of a book, a series or an author whose slug changes, so that its old URL redirects to the
+    new one, and removes it from the slug cache of the process (see `rb_books.slugs`).
+    Parameters:
+    - sender: The model class that is sending the signal, `Book`, `Series` or `Author`.
+    - instance: The instance being saved.
+    - created: Whether the instance has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if created or not instance.has_changed('slug'):
+        return
+    old_slug = instance.get_initial_value('slug')
+    forget_slug(sender, old_slug)
+    if old_slug:
+        SlugRedirect.objects.update_or_create(
+            model=sender._meta.label_lower, old_slug=old_slug, defaults={'object_id': instance.pk}
+        )
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Series)
+@receiver(post_delete, sender=Author)
+def forget_deleted_slugs(sender, instance, **kwargs):
+    """
+    Removes the slug of a deleted book, series or author from the slug cache, and deletes its former slugs.
+    Parameters:
+    - sender: The model class that is sending the signal, `Book`, `Series` or `Author`.
+    - instance: The deleted instance.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    forget_slug(sender, instance.slug)
+    SlugRedirect.objects.filter(model=sender._meta.label_lower, object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def update_series_aggregates_on_book_change(sender, instance, **kwargs):
+    """
+    Applies the creation, the change or the deletion of a book to the aggregates of its series, former series and new
+    series, with a delta UPDATE per series (see `rb_books.aggregates`), and removes these series from the object
+    cache.
+    Parameters:
+    - sender: The model class that is sending the signal (Book in this case).
+    - instance: The book saved or deleted.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if kwargs.get('raw'):
+        return
+    if kwargs['signal'] is post_delete:
+        before, after = get_book_state(instance, initial=True), None
+    else:
+        before = None if kwargs['created'] else get_book_state(instance, initial=True)
+        after = get_book_state(instance)
+    invalidate_cached_objects(Series, update_series_aggregates(before, after))
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_save, sender=Volume)
+def rebuild_series_aggregates_on_reference_change(sender, instance, created, **kwargs):
+    """
+    Rebuilds the aggregates of the series whose books have a rating whose value changed, or a volume whose index
+    changed. The cached series are invalidated by `invalidate_cached_models_on_reference_change`.
+    Parameters:
+    - sender: The model class that is sending the signal, `Rating` or `Volume`.
+    - instance: The rating or volume saved.
+    - created: Whether the instance has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if created:
+        return
+    if sender is Rating and instance.has_changed('rating'):
+        rebuild_series_aggregates(Series.objects.filter(book__rating=instance), ['ratings_sum', 'average_rating'])
+    elif sender is Volume and instance.has_changed('index'):
+        rebuild_series_aggregates(Series.objects.filter(book__volume=instance), ['next_unread_volume'])
+
+
+@receiver(post_delete, sender=Rating)
+@receiver(post_delete, sender=Volume)
+def rebuild_series_aggregates_after_delete(sender, instance, **kwargs):
+    """
+    Rebuilds the aggregates of the series of the books of a deleted rating or volume, whose foreign keys were set to
+    NULL without sending any signal.
+    Parameters:
+    - sender: The model class that is sending the signal, `Rating` or `Volume`.
+    - instance: The deleted instance.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if getattr(instance, '_book_ids', None):
+        rebuild_series_aggregates(Series.objects.filter(book__in=instance._book_ids))
+
+
+@receiver(post_save, sender=Series)
+def propagate_series_fields(sender, instance, created, **kwargs):
+    """
+    Applies the changed illustrator, editor, audience or category of a series to its books which do not override it
+    (see `rb_books.propagation.propagate_fields`).
+    Parameters:
+    - sender: The model class that is sending the signal (Series in this case).
+    - instance: The series being saved.
+    - created: Whether the series has just been created.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if created or kwargs.get('raw'):
+        return
+    previous_values = {
+        field: instance.get_initial_value(field) for field in PROPAGATED_FIELDS if instance.has_changed(field)
+    }
+    if previous_values:
+        propagate_fields(instance, previous_values)
+
+
+@receiver(m2m_changed, sender=Series.author.through)
+@receiver(m2m_changed, sender=Series.genres.through)
+def propagate_series_relation_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Applies a change of the authors or genres of a series to its books which inherit them, i.e. whose authors or
+    genres are empty or the same as those of the series before the change.
+    Parameters:
+    - sender: The intermediate model of the `author` or `genres` relation of `Series`.
+    - instance: The series whose relation changes, or an author or a genre when `reverse` is True.
+    - action: The kind of change: the inheriting books are looked up by the `pre_*` actions, and changed by the
+    `post_*` ones.
+    - reverse: Whether the relation is changed from the author or genre side, which is not propagated.
+    - pk_set: The primary keys of the objects added or removed, None for `post_clear`.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    if reverse:
+        return
+    relation = 'author' if sender is Series.author.through else 'genres'
+    if action in ['pre_add', 'pre_remove', 'pre_clear']:
+        instance._inheriting_book_ids = get_inheriting_book_ids(instance, relation)
+    elif action in ['post_add', 'post_remove', 'post_clear']:
+        propagate_relation_change(instance, relation, getattr(instance, '_inheriting_book_ids', []), action, pk_set)
+        instance._inheriting_book_ids = []
+
+
+@receiver(books_changed, sender=Book)
+def refresh_on_bulk_books_change(sender, pks, fields, **kwargs):
+    """
+    Applies the side effects of the `save()` of books changed by a set-based update (see
+    `rb_books.services.bulk_update_books`), once for all of them: the books are removed from the object cache and the
+    feeds, their search document is refreshed if it contains a changed field, and the aggregates of their series are
+    rebuilt if they depend on a changed field.
+    Parameters:
+    - sender: The model class that is sending the signal (Book in this case).
+    - pks: The primary keys of the changed books.
+    - fields: The names of the changed fields.
+    - kwargs: Additional keyword arguments.
+    Returns:
+    - None
+    """
+    books = Book.objects.filter(pk__in=pks)
+    invalidate_cached_objects(Book, pks)
+    invalidate_feeds()
+    transaction.on_commit(invalidate_feeds)
+    if {'illustrator', 'editor'} & set(fields):
+        refresh_search_document(books)
+    if {Book._meta.get_field(field).attname for field in fields} & set(BOOK_STATE_FIELDS):
+        series_ids = list(books.filter(series__isnull=False).values_list('series_id', flat=True).distinct())
+        rebuild_series_aggregates(Series.objects.filter(pk__in=series_ids))
+        invalidate_cached_objects(Series, series_ids)
@@ -0,0 +1,145 @@
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+
+from slugify import slugify
+
+
+SLUGIFY_CACHE_SIZE = 4096
+SLUG_CACHE_SIZE = getattr(settings, 'SLUG_CACHE_SIZE', 10000)
+SUFFIX_MAX_LENGTH = 8
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def cached_slugify(text: str) -> str:
+    """
+    Memoized `slugify()`: the transliteration of the accented characters is costly, and the same names and labels are
+    slugified again and again by bulk imports.
+    """
+    return slugify(text)
+
+
+def get_base_slug(model, text: str) -> str:
+    """
+    Returns the slug of a text, truncated so that a numeric suffix still fits in the slug field of `model`. Falls back
+    to the name of the model when the text has no sluggable character.
+    """
+    max_length = model._meta.get_field('slug').max_length - SUFFIX_MAX_LENGTH
+    return cached_slugify(text)[:max_length].strip('-') or model._meta.model_name
+
+
+def allocate_slug(model, text: str, current_slug=None, exclude_pk=None) -> str:
+    """
+    Returns a free slug for a text: its slug if nobody uses it, otherwise the slug followed by the first free numeric
+    suffix, e.g. `robin-hobb`, `robin-hobb-2`, `robin-hobb-3`.
+    Parameters:
+    - model: The model class of the slug field.
+    - text: The text to slugify.
+    - current_slug: The current slug of the instance, kept when it is already derived from the same text, without
+    any query.
+    - exclude_pk: The primary key of the instance, whose own slug does not count as taken.
+    Returns:
+    - str: The allocated slug.
+    Notes:
+    The taken slugs are fetched with a single query: `slug LIKE 'base%'`, served by the `varchar_pattern_ops` index
+    PostgreSQL creates along with the unique index of the slug field, narrowed by the `^base(-[0-9]+)?$` regular
+    expression so that the slugs of longer texts, e.g. `robin-hobbs` or `robin-hobb-lindholm`, are not fetched. Two
+    concurrent transactions may still allocate the same slug, in which case the unique constraint rejects the second
+    one.
+    """
+    base = get_base_slug(model, text)
+    pattern = re.compile(rf'{re.escape(base)}-(\d+)')
+    if current_slug and (current_slug == base or pattern.fullmatch(current_slug)):
+        return current_slug
+
+    queryset = model._default_manager.filter(slug__startswith=base)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    taken = set(queryset.filter(slug__regex=rf'^{re.escape(base)}(-[0-9]+)?$').values_list('slug', flat=True))
+    if base not in taken:
+        return base
+    suffix = 2
+    while f'{base}-{suffix}' in taken:
+        suffix += 1
+    return f'{base}-{suffix}'
+
+
+class SlugCache:
+    """
+    Bounded, thread-safe LRU map of the slugs of a model to the primary keys of their objects, local to the process.
+    Attributes:
+        maxsize (int): The maximum number of slugs kept. The least recently used ones are evicted first.
+    Methods:
+        get(slug): Returns the primary key of a slug, or None if it is not cached.
+        set(slug, pk): Caches the primary key of a slug.
+        discard(slug): Removes a slug from the cache.
+    Note: Each process has its own cache, only invalidated by the saves it runs itself: a resolved object must be
+    checked to still have the requested slug, see `rb_books.views.get_by_slug()`.
+    """
+
+    def __init__(self, maxsize=SLUG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug):
+        with self._lock:
+            pk = self._items.get(slug)
+            if pk is not None:
+                self._items.move_to_end(slug)
+            return pk
+
+    def set(self, slug, pk):
+        with self._lock:
+            self._items[slug] = pk
+            self._items.move_to_end(slug)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, slug):
+        with self._lock:
+            self._items.pop(slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_slug_caches = {}
+
+
+def get_slug_cache(model) -> SlugCache:
+    """
+    Returns the slug cache of a model, creating it if needed.
+    """
+    return _slug_caches.setdefault(model._meta.label_lower, SlugCache())
+
+
+def resolve_slug(model, slug):
+    """
+    Returns the primary key of the object of a model having a slug, from the slug cache or with a single indexed
+    query on the slug.
+    Parameters:
+    - model: The model class.
+    - slug: The slug.
+    Returns:
+    - int | None: The primary key, or None if no object has this slug.
+    """
+    cache = get_slug_cache(model)
+    pk = cache.get(slug)
+    if pk is None:
+        pk = model._default_manager.filter(slug=slug).values_list('pk', flat=True).first()
+        if pk is not None:
+            cache.set(slug, pk)
+    return pk
+
+
+def forget_slug(model, slug):
+    """
+    Removes a slug from the slug cache of a model, e.g. when it changes or when its object is deleted.
+    """
+    if slug:
+        get_slug_cache(model).discard(slug)
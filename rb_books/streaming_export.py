@@ -0,0 +1,177 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Book
+
+
+DEFAULT_CHUNK_SIZE = 500
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# The columns are named after the fields of `rb_books.imports`, so that an export can be imported again.
+CATALOG_COLUMNS = [
+    'slug', 'full_title', 'title', 'authors', 'series', 'volume', 'editor', 'genres', 'pages', 'rating', 'status',
+    'read_at', 'summary', 'opinion', 'short_opinion', 'quotation',
+]
+
+
+CATALOG_VALUES = [
+    'pk', 'slug', 'full_title', 'title', 'series__title', 'volume__index', 'editor__name', 'pages', 'rating__rating',
+    'published', 'published_at', 'current_reading', 'incoming_reading', 'summary', 'opinion', 'short_opinion',
+    'quotation',
+]
+
+
+def get_status(values):
+    if values['published']:
+        return 'published'
+    if values['current_reading']:
+        return 'current_reading'
+    if values['incoming_reading']:
+        return 'incoming_reading'
+    return None
+
+
+def get_related_names(relation, book_ids, *fields) -> dict:
+    """
+    Returns the names of the objects of a many-to-many relation of books, with a single query on its intermediate
+    table.
+    Parameters:
+    - relation: `author` or `genres`.
+    - book_ids: The primary keys of the books.
+    - fields: The fields of the related objects making up their names, joined with a space.
+    Returns:
+    - dict: The names of the objects of each book, joined with a comma, by book primary key.
+    """
+    field = Book._meta.get_field(relation)
+    target = field.m2m_reverse_field_name()
+    names = {}
+    for book_id, *values in field.remote_field.through.objects.filter(book_id__in=book_ids).order_by(
+        f'{target}_id'
+    ).values_list('book_id', *(f'{target}__{name}' for name in fields)):
+        names.setdefault(book_id, []).append(' '.join(value for value in values if value))
+    return {book_id: ', '.join(book_names) for book_id, book_names in names.items()}
+
+
+def get_catalog_row(values, authors, genres) -> dict:
+    """
+    Returns the exported values of a book, by column.
+    Parameters:
+    - values: The values of the book, see `CATALOG_VALUES`.
+    - authors: The names of the authors of the books, see `get_related_names()`.
+    - genres: The labels of the genres of the books.
+    """
+    index = values['volume__index']
+    return {
+        'slug': values['slug'],
+        'full_title': values['full_title'],
+        'title': values['title'],
+        'authors': authors.get(values['pk'], ''),
+        'series': values['series__title'],
+        'volume': int(index) if index is not None and index.is_integer() else index,
+        'editor': values['editor__name'],
+        'genres': genres.get(values['pk'], ''),
+        'pages': values['pages'],
+        'rating': values['rating__rating'],
+        'status': get_status(values),
+        'read_at': values['published_at'],
+        'summary': values['summary'],
+        'opinion': values['opinion'],
+        'short_opinion': values['short_opinion'],
+        'quotation': values['quotation'],
+    }
+
+
+def iter_catalog_rows(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the exported values of books one at a time, see `get_catalog_row()`.
+    Parameters:
+    - queryset: The queryset of the exported books, all of them by default.
+    - chunk_size: The number of books fetched from the database cursor at a time.
+    Notes:
+    The books are read as values through a server-side cursor (`QuerySet.iterator()`), with their series, volume,
+    editor and rating joined, and the names of their authors and genres are fetched chunk by chunk, so that the memory
+    used does not depend on the size of the catalog. Exporting books costs one query, and two per chunk.
+    No model instance is built, which would cost more than the queries themselves.
+    """
+    if queryset is None:
+        queryset = Book.objects.all()
+    rows = queryset.order_by('pk').values(*CATALOG_VALUES).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        book_ids = [values['pk'] for values in chunk]
+        authors = get_related_names('author', book_ids, 'first_name', 'last_name')
+        genres = get_related_names('genres', book_ids, 'label')
+        for values in chunk:
+            yield get_catalog_row(values, authors, genres)
+
+
+class _Echo:
+    """
+    A file-like object returning what is written to it, so that `csv.writer` formats a single line at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_export_lines(rows, export_format):
+    """
+    Yields the lines of an export, the header first for a CSV export.
+    Parameters:
+    - rows: The iterable of the exported values, see `iter_catalog_rows()`.
+    - export_format: `csv` or `jsonl`, one JSON object per line.
+    """
+    if export_format == 'csv':
+        writer = csv.DictWriter(_Echo(), CATALOG_COLUMNS)
+        yield writer.writeheader()
+        for row in rows:
+            if row['read_at'] is not None:
+                row['read_at'] = row['read_at'].isoformat()
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+async def aiter_lines(lines, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the lines of a synchronous iterator from the event loop, pulling them `chunk_size` at a time in a worker
+    thread, so that the database cursor behind them is only read outside of the event loop.
+    Parameters:
+    - lines: The iterator of the lines, see `iter_export_lines()`.
+    - chunk_size: The number of lines pulled at a time.
+    """
+    next_chunk = sync_to_async(lambda: list(islice(lines, chunk_size)))
+    while chunk := await next_chunk():
+        for line in chunk:
+            yield line
+
+
+def streaming_export_response(request, queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns a response streaming the export of books, whose first bytes are sent before the whole catalog is read.
+    Parameters:
+    - request: The HTTP request. Under ASGI, the response streams an asynchronous iterator, which the ASGI handler
+    would otherwise buffer entirely before sending anything.
+    - queryset: The queryset of the exported books.
+    - export_format: `csv` or `jsonl`.
+    - chunk_size: The number of books fetched from the database cursor at a time.
+    Returns:
+    - StreamingHttpResponse: The response, downloaded as `catalogue-<date>.<format>`.
+    """
+    lines = iter_export_lines(iter_catalog_rows(queryset, chunk_size), export_format)
+    if isinstance(request, ASGIRequest):
+        lines = aiter_lines(lines, chunk_size)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    filename = f'catalogue-{timezone.localdate():%Y%m%d}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,110 @@
+import os
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from PIL import Image, ImageOps
+
+
+DEFAULT_THUMBNAIL_WIDTHS = [100, 300, 600]
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def get_thumbnail_widths() -> list[int]:
+    """
+    Returns the widths of the renditions, `settings.THUMBNAIL_WIDTHS`, read on every call so that it can be overridden.
+    """
+    return getattr(settings, 'THUMBNAIL_WIDTHS', DEFAULT_THUMBNAIL_WIDTHS)
+
+
+def get_thumbnail_name(name: str, width: int, extension: str) -> str:
+    """
+    Returns the name of a rendition of an image, stored next to the original.
+    Parameters:
+    - name: The name of the original image in its storage.
+    - width: The width of the rendition, in pixels.
+    - extension: The extension of the rendition format, a key of `THUMBNAIL_FORMATS`.
+    Returns:
+    - str: The name of the rendition, e.g. `covers/2024/03/21/my-book_300w.webp`.
+    """
+    base_name, _ = os.path.splitext(name)
+    return f'{base_name}_{width}w.{extension}'
+
+
+def get_thumbnail_names(name: str) -> list[str]:
+    """
+    Returns the names of all the renditions of an image.
+    Parameters:
+    - name: The name of the original image in its storage.
+    Returns:
+    - list[str]: The names of the renditions, for every width and format.
+    """
+    return [
+        get_thumbnail_name(name, width, extension)
+        for width in get_thumbnail_widths()
+        for extension in THUMBNAIL_FORMATS
+    ]
+
+
+def get_srcset(image, extension: str) -> str:
+    """
+    Returns the `srcset` attribute value listing the renditions of an image in a given format.
+    Parameters:
+    - image: The `FieldFile` of the original image.
+    - extension: The extension of the rendition format, a key of `THUMBNAIL_FORMATS`.
+    Returns:
+    - str: The `srcset` value, e.g. `/media/a_100w.webp 100w, /media/a_300w.webp 300w`.
+    """
+    return ', '.join(
+        f'{image.storage.url(get_thumbnail_name(image.name, width, extension))} {width}w'
+        for width in get_thumbnail_widths()
+    )
+
+
+def get_thumbnail_url(image, width: int, extension: str = 'jpg') -> str:
+    """
+    Returns the URL of a rendition of an image.
+    Parameters:
+    - image: The `FieldFile` of the original image.
+    - width: The width of the rendition, one of `get_thumbnail_widths()`.
+    - extension: The extension of the rendition format, a key of `THUMBNAIL_FORMATS`.
+    Returns:
+    - str: The URL of the rendition.
+    """
+    return image.storage.url(get_thumbnail_name(image.name, width, extension))
+
+
+def generate_thumbnails(storage, name: str):
+    """
+    Generates the renditions of an image, for every width of `get_thumbnail_widths()` and every format of
+    `THUMBNAIL_FORMATS`, and stores them next to the original.
+    Parameters:
+    - storage: The storage of the original image.
+    - name: The name of the original image in its storage.
+    Return Type:
+    - None
+    Notes:
+    Images are never upscaled: a rendition wider than the original keeps the original size. An existing rendition is
+    replaced.
+    """
+    with storage.open(name, 'rb') as original_file:
+        original = ImageOps.exif_transpose(Image.open(original_file))
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+
+    for width in get_thumbnail_widths():
+        rendition = original.copy()
+        rendition.thumbnail((width, width * 10), Image.LANCZOS)
+        for extension, (image_format, options) in THUMBNAIL_FORMATS.items():
+            buffer = BytesIO()
+            rendition.save(buffer, format=image_format, **options)
+            thumbnail_name = get_thumbnail_name(name, width, extension)
+            if storage.exists(thumbnail_name):
+                storage.delete(thumbnail_name)
+            storage.save(thumbnail_name, ContentFile(buffer.getvalue()))
@@ -0,0 +1,24 @@
+from django.urls import path
+
+from . import feeds, views
+
+
+app_name = 'rb_books'
+
+urlpatterns = [
+    path('books/<slug:slug>/', views.book_page, name='book_page'),
+    path('series/<slug:slug>/', views.series_page, name='series_page'),
+    path('authors/<slug:slug>/', views.author_page, name='author_page'),
+    path('search/', views.search, name='search'),
+    path('feeds/reviews/rss/', feeds.latest_reviews_rss, name='reviews_rss'),
+    path('feeds/reviews/atom/', feeds.latest_reviews_atom, name='reviews_atom'),
+    path('api/books/', views.book_list, name='book_list'),
+    path('api/books/<int:pk>/', views.book_detail, name='book_detail'),
+    path('api/reading/', views.reading_widget, name='reading_widget'),
+    path('api/series/', views.series_list, name='series_list'),
+    path('api/series/<int:pk>/', views.series_detail, name='series_detail'),
+    path('api/authors/', views.author_list, name='author_list'),
+    path('api/authors/<int:pk>/', views.author_detail, name='author_detail'),
+    path('api/genres/', views.genre_list, name='genre_list'),
+    path('api/genres/<int:pk>/', views.genre_detail, name='genre_detail'),
+]
@@ -1,3 +1,410 @@
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404, HttpResponsePermanentRedirect, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .conditional import conditional_on, conditional_on_cached_entry
+from .models import Audience, Author, Book, Category, Editor, Genre, Illustrator, Rating, Series, SlugRedirect, Volume
+from .object_cache import aget_cached_entry, get_cached_entry
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_documents, search_people
+from .serializers import serialize_book, serialize_genre, serialize_person, serialize_series
+from .slugs import forget_slug, resolve_slug
+
+
+SEARCH_RESULTS_LIMIT = 20
+READING_WIDGET_SIZE = getattr(settings, 'READING_WIDGET_SIZE', 5)
+
+BOOK_HTML_FIELDS = [f'{field}_html' for field in Book.RICH_TEXT_FIELDS]
+
+books_paginator = KeysetPaginator(['-published_at', '-id'])
+series_paginator = KeysetPaginator(['title', 'id'])
+authors_paginator = KeysetPaginator(['last_name', 'first_name', 'id'])
+genres_paginator = KeysetPaginator(['label', 'id'])
+
+# The reference tables whose rows are serialized with the series, and with the books. The series are not a related
+# model of the books: their aggregates change with every book, while the part of a series a book is serialized with,
+# its title and slug, bumps the change stamp of its books when it changes. Likewise, the label of a volume bumps the
+# change stamp of its books along with their full title, so the volumes are only a related model of the series, for
+# their next unread volume.
+SERIES_RELATED_MODELS = [Volume, Author, Illustrator, Editor, Audience, Category, Genre]
+BOOK_RELATED_MODELS = [Author, Illustrator, Editor, Audience, Category, Genre, Rating]
+
+
+def get_related_querysets(models):
+    return [model.objects.all() for model in models]
+
+
+def get_books_queryset(detailed=False, published=True):
+    """
+    Returns the queryset of the published books, with the related objects joined or prefetched so that a page costs a
+    fixed number of queries: one for the books and one per prefetched relation.
+    Parameters:
+    - detailed: Whether to load the HTML fields, which are only serialized by the detail endpoint.
+    - published: Whether to only return the published books, e.g. not for the reading widget.
+    Returns:
+    - QuerySet: The published books.
+    Note: Only the sanitized HTML columns are loaded, never the raw CKEditor fields nor the plain text.
+    """
+    queryset = Book.objects.filter(**({'published': True} if published else {})).select_related(
+        'series', 'volume', 'illustrator', 'editor', 'audience', 'category', 'rating'
+    ).prefetch_related('author', 'genres').defer(
+        'search_document', 'plain_text', *Book.RICH_TEXT_FIELDS,
+        'series__search_document', 'series__plain_text', 'series__summary', 'series__summary_html',
+    )
+    return queryset if detailed else queryset.defer(*BOOK_HTML_FIELDS)
+
+
+def get_series_queryset(detailed=False):
+    """
+    Returns the queryset of the series, with the related objects joined or prefetched.
+    Parameters:
+    - detailed: Whether to load the HTML summary, which is only serialized by the detail endpoint.
+    Returns:
+    - QuerySet: The series.
+    """
+    queryset = Series.objects.select_related(
+        'illustrator', 'editor', 'audience', 'category', 'next_unread_volume'
+    ).prefetch_related('author', 'genres').defer('search_document', 'plain_text', 'summary')
+    return queryset if detailed else queryset.defer('summary_html')
+
+
+def get_cached_book(pk) -> dict:
+    """
+    Returns the cache entry of a published book, hydrated with all its related objects, see
+    `rb_books.object_cache.get_cached_entry()`.
+    Raises:
+        Book.DoesNotExist: If there is no published book with this primary key.
+    """
+    return get_cached_entry(get_books_queryset(detailed=True), pk)
+
+
+async def aget_cached_book(pk) -> dict:
+    """
+    Asynchronous version of `get_cached_book()`.
+    """
+    return await aget_cached_entry(get_books_queryset(detailed=True), pk)
+
+
+def get_cached_series(pk) -> dict:
+    """
+    Returns the cache entry of a series, hydrated with all its related objects, see
+    `rb_books.object_cache.get_cached_entry()`.
+    Raises:
+        Series.DoesNotExist: If there is no series with this primary key.
+    """
+    return get_cached_entry(get_series_queryset(detailed=True), pk)
+
+
+async def aget_cached_series(pk) -> dict:
+    """
+    Asynchronous version of `get_cached_series()`.
+    """
+    return await aget_cached_entry(get_series_queryset(detailed=True), pk)
+
+
+INVALID_PAGINATION_ERROR = 'Paramètres de pagination invalides.'
+
+
+def paginated_response(request, queryset, paginator, serialize):
+    """
+    Returns a page of serialized objects, with the cursor of the next page.
+    Parameters:
+    - request: The HTTP request. The `cursor` and `limit` query parameters select the page.
+    - queryset: The queryset to paginate.
+    - paginator: The `KeysetPaginator` of the endpoint.
+    - serialize: The function serializing an object.
+    Returns:
+    - JsonResponse: `{"results": [...], "next": cursor}`, or a 400 response if the parameters are invalid.
+    """
+    try:
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+        objects, next_cursor = paginator.paginate(queryset, request.GET.get('cursor'), limit)
+    except (InvalidCursor, ValueError):
+        return JsonResponse({'error': INVALID_PAGINATION_ERROR}, status=400)
+    return JsonResponse({'results': [serialize(obj) for obj in objects], 'next': next_cursor})
+
+
+async def apaginated_response(request, queryset, paginator, serialize):
+    """
+    Asynchronous version of `paginated_response()`.
+    """
+    try:
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+        objects, next_cursor = await paginator.apaginate(queryset, request.GET.get('cursor'), limit)
+    except (InvalidCursor, ValueError):
+        return JsonResponse({'error': INVALID_PAGINATION_ERROR}, status=400)
+    return JsonResponse({'results': [serialize(obj) for obj in objects], 'next': next_cursor})
+
+
+def get_object_or_404(queryset, **kwargs):
+    try:
+        return queryset.get(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+def get_book_list_querysets(request) -> list:
+    return [Book.objects.filter(published=True), *get_related_querysets(BOOK_RELATED_MODELS)]
+
+
+def get_reading_widget_querysets(request) -> list:
+    return [
+        Book.objects.filter(Q(current_reading=True) | Q(incoming_reading=True)),
+        *get_related_querysets(BOOK_RELATED_MODELS),
+    ]
+
+
+def get_reading_books():
+    """
+    Returns the querysets of the reading widget: the book currently read, and the next books to read by date of
+    addition, at most `READING_WIDGET_SIZE`.
+    """
+    queryset = get_books_queryset(published=False)
+    return (
+        queryset.filter(current_reading=True),
+        queryset.filter(incoming_reading=True).order_by('created_at', 'id')[:READING_WIDGET_SIZE],
+    )
+
+
+def serialize_reading_widget(current, incoming) -> dict:
+    return {
+        'current': serialize_book(current) if current else None,
+        'incoming': [serialize_book(book) for book in incoming],
+    }
+
+
+# The public read endpoints polled by the clients are async views, so that an ASGI worker serves many concurrent
+# connections without a thread per connection: their queries use the async ORM and their cache accesses the async
+# cache methods, see `rb_books.asgi_benchmarks` for a comparison with the WSGI path.
+
+@require_GET
+@conditional_on(get_book_list_querysets)
+async def book_list(request):
+    return await apaginated_response(request, get_books_queryset(), books_paginator, serialize_book)
+
+
+@require_GET
+@conditional_on_cached_entry(lambda request, pk: aget_cached_book(pk))
+async def book_detail(request, pk):
+    try:
+        book = (await aget_cached_book(pk))['object']
+    except Book.DoesNotExist:
+        raise Http404
+    return JsonResponse(serialize_book(book, detailed=True))
+
+
+@require_GET
+@conditional_on(get_reading_widget_querysets)
+async def reading_widget(request):
+    """
+    Public endpoint of the reading widget: the book currently read and the next books to read, by date of addition.
+    Returns:
+    - JsonResponse: `{"current": book, "incoming": [...]}`, at most `READING_WIDGET_SIZE` incoming books.
+    """
+    current, incoming = get_reading_books()
+    return JsonResponse(serialize_reading_widget(await current.afirst(), [book async for book in incoming]))
+
+
+@require_GET
+@conditional_on(lambda request: [Series.objects.all(), *get_related_querysets(SERIES_RELATED_MODELS)])
+def series_list(request):
+    return paginated_response(request, get_series_queryset(), series_paginator, serialize_series)
+
+
+@require_GET
+@conditional_on_cached_entry(lambda request, pk: aget_cached_series(pk))
+async def series_detail(request, pk):
+    try:
+        series = (await aget_cached_series(pk))['object']
+    except Series.DoesNotExist:
+        raise Http404
+    return JsonResponse(serialize_series(series, detailed=True))
+
+
+# The synchronous versions of the async read endpoints, sharing their querysets and serializers. They are not routed:
+# `rb_books.asgi_benchmarks` serves them under ASGI, to tell the gain of the async views from the gain of the server.
+
+@require_GET
+@conditional_on(get_book_list_querysets)
+def sync_book_list(request):
+    return paginated_response(request, get_books_queryset(), books_paginator, serialize_book)
+
+
+@require_GET
+@conditional_on_cached_entry(lambda request, pk: get_cached_book(pk))
+def sync_book_detail(request, pk):
+    try:
+        book = get_cached_book(pk)['object']
+    except Book.DoesNotExist:
+        raise Http404
+    return JsonResponse(serialize_book(book, detailed=True))
+
+
+@require_GET
+@conditional_on(get_reading_widget_querysets)
+def sync_reading_widget(request):
+    current, incoming = get_reading_books()
+    return JsonResponse(serialize_reading_widget(current.first(), incoming))
+
+
+@require_GET
+@conditional_on_cached_entry(lambda request, pk: get_cached_series(pk))
+def sync_series_detail(request, pk):
+    try:
+        series = get_cached_series(pk)['object']
+    except Series.DoesNotExist:
+        raise Http404
+    return JsonResponse(serialize_series(series, detailed=True))
+
+
+@require_GET
+def author_list(request):
+    return paginated_response(request, Author.objects.all(), authors_paginator, serialize_person)
+
+
+@require_GET
+def author_detail(request, pk):
+    return JsonResponse(serialize_person(get_object_or_404(Author.objects.all(), pk=pk)))
+
+
+@require_GET
+def genre_list(request):
+    return paginated_response(request, Genre.objects.all(), genres_paginator, serialize_genre)
+
+
+@require_GET
+def genre_detail(request, pk):
+    return JsonResponse(serialize_genre(get_object_or_404(Genre.objects.all(), pk=pk)))
+
+
+@require_GET
+def search(request):
+    """
+    Public search endpoint: searches the published books, the series and the people (authors and illustrators).
+    Parameters:
+    - request: The HTTP request. The searched text is given by the `q` query parameter.
+    Returns:
+    - JsonResponse: The best matches of each kind, at most `SEARCH_RESULTS_LIMIT` each, sorted by descending rank.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'books': [], 'series': [], 'authors': [], 'illustrators': []})
+
+    books = search_documents(Book.objects.filter(published=True), query).values('id', 'slug', 'full_title', 'rank')
+    series = search_documents(Series.objects.all(), query).values('id', 'slug', 'title', 'rank')
+    authors = search_people(Author.objects.all(), query).values('id', 'slug', 'first_name', 'last_name', 'rank')
+    illustrators = search_people(Illustrator.objects.all(), query).values(
+        'id', 'slug', 'first_name', 'last_name', 'rank'
+    )
+    return JsonResponse({
+        'books': list(books[:SEARCH_RESULTS_LIMIT]),
+        'series': list(series[:SEARCH_RESULTS_LIMIT]),
+        'authors': list(authors[:SEARCH_RESULTS_LIMIT]),
+        'illustrators': list(illustrators[:SEARCH_RESULTS_LIMIT]),
+    })
+
+
+class SlugMoved(Exception):
+    """
+    Raised when a slug is a former slug of an object, with the current slug of the object.
+    """
+
+    def __init__(self, slug):
+        super().__init__(slug)
+        self.slug = slug
+
+
+def get_by_slug(model, slug, get_object):
+    """
+    Returns the object of a model having a slug, resolved to its primary key by the slug cache (see
+    `rb_books.slugs.resolve_slug()`) and then loaded by primary key.
+    Parameters:
+    - model: The model class.
+    - slug: The requested slug.
+    - get_object: A function loading an object from its primary key, e.g. from the object cache, and raising
+    `DoesNotExist` if it is not found.
+    Returns:
+    - The object.
+    Raises:
+        SlugMoved: If the slug is a former slug of an object, found by the unique index of `SlugRedirect`.
+        Http404: If no object has, or had, this slug.
+    Notes:
+    The slug cache of another process may be stale: a mapping whose object no longer has the slug is dropped and
+    resolved again from the database.
+    """
+    for _ in range(2):
+        pk = resolve_slug(model, slug)
+        if pk is None:
+            break
+        try:
+            obj = get_object(pk)
+        except model.DoesNotExist:
+            obj = None
+        if obj is not None and obj.slug == slug:
+            return obj
+        forget_slug(model, slug)
+    object_id = SlugRedirect.objects.filter(
+        model=model._meta.label_lower, old_slug=slug
+    ).values_list('object_id', flat=True).first()
+    if object_id is not None:
+        try:
+            raise SlugMoved(get_object(object_id).slug)
+        except model.DoesNotExist:
+            pass
+    raise Http404
+
+
+def slug_page(model, url_name, template_name, get_object, get_context):
+    """
+    Returns a public page view of a model, looked up by slug, which permanently redirects the former slugs of its
+    objects to their current slug.
+    Parameters:
+    - model: The model class.
+    - url_name: The name of the URL pattern of the page, to build the redirects.
+    - template_name: The template of the page.
+    - get_object: A function loading an object from its primary key, see `get_by_slug()`.
+    - get_context: A function returning the context of the template from the object.
+    Returns:
+    - function: The view.
+    """
+    @require_GET
+    def view(request, slug):
+        try:
+            obj = get_by_slug(model, slug, get_object)
+        except SlugMoved as moved:
+            return HttpResponsePermanentRedirect(reverse(url_name, args=[moved.slug]))
+        return render(request, template_name, get_context(obj))
+    return view
+
+
+book_page = slug_page(
+    Book,
+    'rb_books:book_page',
+    'rb_books/pages/book.html',
+    lambda pk: get_cached_book(pk)['object'],
+    lambda book: {'book': serialize_book(book, detailed=True)},
+)
+
+series_page = slug_page(
+    Series,
+    'rb_books:series_page',
+    'rb_books/pages/series.html',
+    lambda pk: get_cached_series(pk)['object'],
+    lambda series: {'series': serialize_series(series, detailed=True)},
+)
+
+author_page = slug_page(
+    Author,
+    'rb_books:author_page',
+    'rb_books/pages/author.html',
+    lambda pk: Author.objects.get(pk=pk),
+    lambda author: {
+        'author': serialize_person(author),
+        'books': get_books_queryset().filter(author=author.pk).order_by('-published_at', '-id').values(
+            'slug', 'full_title'
+        ),
+    },
+)